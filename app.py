@@ -391,28 +391,22 @@ Para empezar a usar el sistema:
 try:
     from src.database import db
     
+    # Conteos calculados en la base de datos (una sola llamada, sin descargar filas)
+    estadisticas = db.obtener_estadisticas_inicio(dias_adelante=30)
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        pacientes = db.listar_pacientes(activos_solo=True)
-        st.metric("👥 Pacientes Activos", len(pacientes))
+        st.metric("👥 Pacientes Activos", estadisticas.get('pacientes_activos', 0))
     
     with col2:
-        # Contar citas pendientes
-        citas_pendientes = db.obtener_citas_pendientes(dias_adelante=30)
-        st.metric("📅 Citas Próximas (30d)", len(citas_pendientes))
+        st.metric("📅 Citas Próximas (30d)", estadisticas.get('citas_proximas', 0))
     
     with col3:
         st.metric("🤖 IAs Integradas", "2")
     
     with col4:
-        # Obtener métricas de IA
-        try:
-            metricas = db.calcular_metricas_ia()
-            total_consultas = metricas.get('total_consultas', 0)
-            st.metric("💬 Consultas IA", total_consultas)
-        except:
-            st.metric("💬 Consultas IA", "0")
+        st.metric("💬 Consultas IA", estadisticas.get('total_consultas_ia', 0))
 
 except Exception as e:
     st.error(f"Error al cargar estadísticas: {e}")
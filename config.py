@@ -122,6 +122,20 @@ class AIConfig:
     # Reintentos en caso de fallo
     MAX_RETRIES = 3
     RETRY_DELAY = 2  # segundos
+    
+    # Pool de conexiones HTTP persistentes (compartido entre consultas y reintentos)
+    HTTP_MAX_CONNECTIONS = 10
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = 5
+    HTTP_KEEPALIVE_EXPIRY = 120  # segundos
+    HTTP2 = True  # Solo se activa si el paquete 'h2' está instalado
+    
+    # Mostrar las respuestas token a token en la página de Consulta IA
+    STREAMING_ENABLED = True
+    
+    # Caché en disco de respuestas (clave: hash de prompt + modelo + temperatura)
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_PATH = "cache/ai_responses.sqlite3"
+    RESPONSE_CACHE_MAX_BYTES = 50 * 1024 * 1024  # 50 MB
 
 # =====================================================
 # CONFIGURACIÓN DE STREAMLIT
@@ -172,6 +186,192 @@ class SystemConstants:
     # Paginación
     ITEMS_PER_PAGE = 20
 
+# =====================================================
+# CONFIGURACIÓN DE CACHÉ DE BASE DE DATOS
+# =====================================================
+
+class CacheConfig:
+    """Configuración de la caché de lecturas de SupabaseClient"""
+    
+    ENABLED = True
+    
+    # Número máximo de consultas almacenadas (se descartan las menos usadas)
+    MAX_ENTRIES = 512
+    
+    # Tiempo de vida por tabla (segundos)
+    TABLE_TTL = {
+        'pacientes': 300,
+        'citas': 60,
+        'indicadores_cita': 120,
+        'diagnosticos_ia': 120,
+        'metricas_ia': 600
+    }
+    DEFAULT_TTL = 60
+    
+    # Lecturas con una ventana relativa a now() (citas próximas, estadísticas de
+    # inicio): su resultado cambia con el reloj aunque nadie escriba
+    RELATIVE_WINDOW_TTL = 30
+
+# =====================================================
+# PROYECCIONES DE COLUMNAS
+# =====================================================
+
+class ProjectionConfig:
+    """
+    Perfiles de columnas para las lecturas de SupabaseClient
+    
+    - selector: lo mínimo para listas y selectboxes (ids, nombres, fechas, estado)
+    - chart: lo necesario para gráficos y tablas de valores
+    - full: todas las columnas (incluye texto libre y JSON)
+    """
+    
+    PROFILES = {
+        'pacientes': {
+            'selector': 'id, nombre_completo, tipo_em, edss_basal',
+            'chart': 'id, nombre_completo, edad, genero, tipo_em, edss_basal, fecha_diagnostico',
+            'full': '*'
+        },
+        'citas': {
+            'selector': 'id, paciente_id, numero_visita, fecha_cita, estado',
+            'chart': 'id, paciente_id, numero_visita, fecha_cita, estado',
+            'full': '*'
+        },
+        'indicadores_cita': {
+            'selector': 'id, cita_id, indicador_tipo, estado',
+            'chart': 'id, cita_id, indicador_tipo, valor_calculado, estado',
+            'full': '*'
+        },
+        'diagnosticos_ia': {
+            'selector': 'id, cita_id, ia_seleccionada',
+            'chart': 'id, cita_id, ia_seleccionada, confianza_deepseek, confianza_copilot, created_at',
+            'full': '*'
+        },
+        'metricas_ia': {
+            'selector': 'id, fecha_calculo',
+            'chart': 'fecha_calculo, total_consultas, selecciones_deepseek, selecciones_copilot, '
+                     'selecciones_medico_override, accuracy_deepseek, accuracy_copilot',
+            'full': '*'
+        }
+    }
+
+# =====================================================
+# BACKEND DE BASE DE DATOS
+# =====================================================
+
+class DatabaseConfig:
+    """
+    Backend del cliente global `db` y conexión directa a Postgres
+    
+    - supabase: PostgREST a través de supabase-py (por defecto)
+    - postgres: psycopg2 contra la base de datos con un pool de conexiones
+      (COPY, cursores y transacciones de varias sentencias)
+    """
+    
+    BACKEND = "supabase"  # se puede sobrescribir con la variable de entorno BACKEND_ENV
+    BACKEND_ENV = "DB_BACKEND"
+    DSN_ENV = "DATABASE_URL"  # cadena de conexión de Postgres (Supabase: Settings > Database)
+    
+    # Pool de conexiones (ThreadedConnectionPool, compartido por todos los hilos)
+    POOL_MIN_CONNECTIONS = 1
+    POOL_MAX_CONNECTIONS = 10
+    STATEMENT_TIMEOUT_MS = 30000
+    
+    # Lectura por bloques de tablas completas (iter_pacientes, iter_citas, iter_indicadores);
+    # PostgREST de Supabase devuelve como máximo 1000 filas por petición
+    STREAM_CHUNK_SIZE = 1000
+    
+    # Filtros in.(...) con muchos ids (obtener_indicadores_citas): ids por petición
+    # (~37 bytes por uuid en la URL) y filas pedidas por página; las lecturas se
+    # paginan con count=exact hasta completar el total, aunque max-rows sea menor
+    IN_CHUNK_SIZE = 150
+    MAX_ROWS_PER_REQUEST = 1000
+    
+    # Sentencias preparadas en el servidor (PREPARE/EXECUTE por conexión);
+    # desactivar con el pooler de Supabase en modo transacción (puerto 6543)
+    PREPARED_STATEMENTS = True
+
+# =====================================================
+# CONFIGURACIÓN DE PROCESOS POR LOTES
+# =====================================================
+
+class JobConfig:
+    """Configuración de los procesos por lotes sobre la cohorte"""
+    
+    # Recálculo de indicadores: citas por bloque (cada bloque es un único upsert)
+    RECOMPUTE_CHUNK_SIZE = 500
+    RECOMPUTE_CHECKPOINT_PATH = "cache/recalculo_indicadores.json"
+    
+    # Cohorte sintética: semilla por defecto, pacientes por bloque y directorio de salida COPY
+    COHORT_SEED = 42
+    COHORT_CHUNK_SIZE = 1000
+    COHORT_MAX_VISITS = 12
+    COHORT_OUTPUT_DIR = "cache/cohorte_sintetica"
+    
+    # Exportación a Parquet: filas por grupo (se acumulan por partición antes de escribir)
+    EXPORT_OUTPUT_DIR = "cache/exportacion_parquet"
+    EXPORT_ROW_GROUP_SIZE = 100_000
+    EXPORT_COMPRESSION = "zstd"
+    EXPORT_PARTITIONS = {
+        'pacientes': 'tipo_em',
+        'citas': 'estado',
+        'indicadores_cita': 'indicador_tipo',
+        'diagnosticos_ia': 'ia_seleccionada'
+    }
+    
+    # Importación masiva de pacientes: filas validadas e insertadas por bloque
+    # (COPY solo con DB_BACKEND=postgres; con Supabase, un INSERT de varias filas por bloque)
+    IMPORT_BATCH_SIZE = 500
+    IMPORT_USE_COPY = True
+    IMPORT_ERRORS_PATH = "cache/importacion_pacientes_errores.csv"
+
+# =====================================================
+# BENCHMARKS DE RUTAS CRÍTICAS
+# =====================================================
+
+class BenchmarkConfig:
+    """Configuración de src/benchmarks (tiempos, línea base y umbrales de regresión)"""
+    
+    REPEAT = 5
+    WARMUP = 1
+    LOG_LEVEL = "WARNING"  # Los logs INFO por operación distorsionan las mediciones
+    
+    # Línea base local (depende de la máquina, por eso no se versiona); sin ella
+    # hot_paths termina con código 2 en lugar de dar la comprobación por buena
+    BASELINE_PATH = "cache/benchmarks/linea_base.json"
+    
+    # Regresión = mediana más lenta que la línea base en más de este porcentaje;
+    # las pruebas que dependen de red toleran más ruido
+    REGRESSION_THRESHOLD = 0.25
+    REGRESSION_THRESHOLDS = {
+        'contexto_sync': 0.50,
+        'consulta_dual': 0.50
+    }
+    
+    # Datos de entrada
+    COHORT_PATIENTS = 200
+    HISTORY_LENGTHS = [0, 5, 20, 100]
+    CONTEXT_SAMPLES = 20
+    DUAL_SAMPLES = 5
+    HTTP_POOL_QUERIES = 50  # consultas de DeepSeekClient.query por ejecución en pool_http
+    VALIDATION_ROWS = 100_000  # filas de indicadores_cita validadas con ClinicalIndicator
+    
+    # contexto_sync y consulta_dual vacían la caché y consultan la base en bucle:
+    # solo se ejecutan contra una base local salvo que se defina ALLOW_REMOTE_DB_ENV=1
+    LOCAL_DB_HOSTS = ["localhost", "127.0.0.1", "::1"]
+    ALLOW_REMOTE_DB_ENV = "BENCHMARK_ALLOW_REMOTE_DB"
+    
+    # Servidor simulado de LLM y n8n (src/benchmarks/mock_server.py)
+    MOCK_HOST = "127.0.0.1"
+    MOCK_PORT = 8099
+    MOCK_LATENCY = 0.5  # segundos por respuesta (n8n: la más lenta de las dos IAs)
+    MOCK_JITTER = 0.1  # variación aleatoria máxima (± segundos)
+    MOCK_TOKEN_LATENCY = 0.02  # segundos entre fragmentos en streaming
+    MOCK_ERROR_RATE = 0.0  # fracción de peticiones que responden MOCK_ERROR_STATUS
+    MOCK_ERROR_STATUS = 500
+    MOCK_TIMEOUT_RATE = 0.0  # fracción de peticiones que tardan MOCK_TIMEOUT_DELAY
+    MOCK_TIMEOUT_DELAY = AIConfig.API_TIMEOUT + 5
+    MOCK_SEED = 42
+
 # =====================================================
 # PROMPT TEMPLATES PARA IAs
 # =====================================================
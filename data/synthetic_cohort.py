@@ -0,0 +1,569 @@
+"""
+Generador de cohortes sintéticas para pruebas de carga y benchmarks
+
+sample_patients.sql y database/sample_data.sql solo tienen una docena de
+pacientes escritos a mano. Este generador produce N pacientes con historias de
+visitas verosímiles de Esclerosis Múltiple (recaídas, lesiones T1 Gd+/T2,
+trayectorias de EDSS y diagnósticos de IA), validados con los modelos de
+src/models/patient.py y con los indicadores calculados por
+BatchIndicatorCalculator, igual que los guarda la página de indicadores.
+
+La salida es reproducible: cada paciente se genera con su propio generador
+aleatorio derivado de (semilla, índice), de modo que el paciente i es el mismo
+con independencia de N y del tamaño de bloque. Las fechas se generan respecto
+a una fecha de referencia (hoy por defecto) que conviene fijar con
+--fecha-referencia para obtener exactamente los mismos ficheros.
+
+Dos modos de salida:
+    - Ficheros COPY (uno por tabla, formato texto de PostgreSQL) más un
+      cargar.sql que los carga en orden con psql.
+    - Inserción directa por COPY en un Postgres local (requiere psycopg2).
+
+Uso:
+    python -m data.synthetic_cohort --pacientes 10000 [--semilla 42] [--salida DIR]
+    python -m data.synthetic_cohort --pacientes 10000 --dsn postgresql://localhost/em
+    psql -d em -f cache/cohorte_sintetica/cargar.sql
+"""
+import argparse
+import io
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import pandas as pd
+from loguru import logger
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from config import JobConfig, SystemConstants
+from src.calculators import BatchIndicatorCalculator
+from src.models import AIDiagnostic, Appointment, ClinicalIndicator, Patient, validar_lote
+
+# =====================================================
+# CATÁLOGOS
+# =====================================================
+
+NOMBRES = {
+    'Femenino': [
+        'María', 'Ana', 'Laura', 'Isabel', 'Carmen', 'Sofía', 'Lucía', 'Elena', 'Marta', 'Paula',
+        'Cristina', 'Raquel', 'Beatriz', 'Silvia', 'Patricia', 'Rosa', 'Alicia', 'Irene', 'Claudia', 'Nuria'
+    ],
+    'Masculino': [
+        'Juan', 'Pedro', 'Carlos', 'Miguel', 'Francisco', 'Diego', 'Javier', 'Antonio', 'Manuel', 'David',
+        'Jorge', 'Alberto', 'Luis', 'Sergio', 'Pablo', 'Andrés', 'Fernando', 'Raúl', 'Rubén', 'Óscar'
+    ]
+}
+
+APELLIDOS = [
+    'García', 'González', 'Rodríguez', 'Fernández', 'López', 'Martínez', 'Sánchez', 'Pérez', 'Gómez', 'Martín',
+    'Jiménez', 'Ruiz', 'Hernández', 'Díaz', 'Moreno', 'Muñoz', 'Álvarez', 'Romero', 'Alonso', 'Gutiérrez',
+    'Navarro', 'Torres', 'Domínguez', 'Vázquez', 'Ramos', 'Gil', 'Ramírez', 'Serrano', 'Blanco', 'Molina',
+    'Morales', 'Suárez', 'Ortega', 'Delgado', 'Castro', 'Ortiz', 'Rubio', 'Marín', 'Sanz', 'Vega'
+]
+
+TRATAMIENTOS = {
+    'EMRR': [
+        'Interferón beta-1a', 'Interferón beta-1b', 'Glatiramer', 'Teriflunomida', 'Dimetilfumarato',
+        'Fingolimod', 'Natalizumab', 'Alemtuzumab', 'Cladribina', 'Ocrelizumab'
+    ],
+    'EMSP': ['Siponimod', 'Cladribina', 'Ocrelizumab', 'Interferón beta-1b'],
+    'EMPP': ['Ocrelizumab', None]
+}
+
+ANTECEDENTES = [
+    'Ninguno', 'Sin comorbilidades previas', 'Hipertensión controlada', 'Diabetes tipo 2',
+    'Dislipidemia', 'Hipotiroidismo', 'Migraña', 'Depresión en tratamiento'
+]
+
+ALERGIAS = ['Ninguna', 'Ninguna', 'Ninguna', 'Penicilina', 'Sulfamidas', 'AINEs']
+
+NOTAS_CITA = [
+    'Paciente estable. Buena adherencia al tratamiento.',
+    'Refiere fatiga ocasional. Sin nuevos síntomas focales.',
+    'Control rutinario. Exploración neurológica sin cambios.',
+    'Refiere parestesias transitorias en extremidades inferiores.',
+    'Revisión de RM de control. Se comentan resultados con el paciente.',
+    'Empeoramiento subjetivo de la marcha. Se solicita fisioterapia.'
+]
+
+# Parámetros clínicos por tipo de EM: proporción en la cohorte, mujeres,
+# edad al diagnóstico (media, desviación), años de evolución, EDSS basal
+# (media, desviación), recaídas/año, nuevas T2/año, T1 Gd+ por RM y
+# probabilidad de empeorar 0.5 puntos de EDSS por visita
+PERFILES_EM = {
+    'EMRR': {
+        'proporcion': 0.70, 'mujeres': 0.72, 'edad_diagnostico': (30, 8), 'evolucion': (0.5, 15),
+        'edss_basal': (2.0, 1.0), 'recaidas_ano': 0.35, 't2_ano': 1.2, 't1_gd': 0.4, 'progresion': 0.06
+    },
+    'EMSP': {
+        'proporcion': 0.20, 'mujeres': 0.65, 'edad_diagnostico': (29, 7), 'evolucion': (10, 25),
+        'edss_basal': (5.0, 1.0), 'recaidas_ano': 0.10, 't2_ano': 0.6, 't1_gd': 0.1, 'progresion': 0.20
+    },
+    'EMPP': {
+        'proporcion': 0.10, 'mujeres': 0.50, 'edad_diagnostico': (40, 8), 'evolucion': (0.5, 12),
+        'edss_basal': (4.5, 1.2), 'recaidas_ano': 0.02, 't2_ano': 0.4, 't1_gd': 0.05, 'progresion': 0.25
+    }
+}
+
+# Selección del médico entre las respuestas de IA
+SELECCION_IA = (['deepseek', 'copilot', 'medico'], [0.45, 0.40, 0.15])
+
+# Columnas emitidas por tabla, en orden de carga (respeta las claves foráneas)
+COLUMNAS = {
+    'pacientes': [
+        'id', 'nombre_completo', 'edad', 'genero', 'tipo_em', 'edss_basal', 'tratamiento_actual',
+        'fecha_diagnostico', 'historial_medico', 'medico_asignado_id', 'activo'
+    ],
+    'citas': ['id', 'paciente_id', 'fecha_cita', 'numero_visita', 'estado', 'notas_medicas'],
+    'indicadores_cita': [
+        'cita_id', 'indicador_tipo', 'valor_calculado', 'estado', 'justificacion_texto', 'variables_entrada'
+    ],
+    'diagnosticos_ia': [
+        'cita_id', 'diagnostico_deepseek', 'confianza_deepseek', 'diagnostico_copilot', 'confianza_copilot',
+        'ia_seleccionada', 'diagnostico_medico_override', 'justificacion_medico'
+    ]
+}
+
+MODELOS = {
+    'pacientes': Patient,
+    'citas': Appointment,
+    'indicadores_cita': ClinicalIndicator,
+    'diagnosticos_ia': AIDiagnostic
+}
+
+# =====================================================
+# FORMATO COPY
+# =====================================================
+
+def copy_value(valor: Any) -> str:
+    """Serializa un valor en el formato de texto de COPY (NULL = \\N)"""
+    if valor is None:
+        return '\\N'
+    if isinstance(valor, bool):
+        return 't' if valor else 'f'
+    if isinstance(valor, (dict, list)):
+        valor = json.dumps(valor, ensure_ascii=False)
+    elif isinstance(valor, (date, datetime)):
+        valor = valor.isoformat()
+    else:
+        valor = str(valor)
+    return (
+        valor.replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def copy_lines(tabla: str, filas: List[Dict[str, Any]]) -> str:
+    """Convierte filas en líneas COPY con las columnas de COLUMNAS[tabla]"""
+    columnas = COLUMNAS[tabla]
+    return ''.join(
+        '\t'.join(copy_value(fila.get(c)) for c in columnas) + '\n'
+        for fila in filas
+    )
+
+
+def copy_statement(tabla: str) -> str:
+    """Sentencia COPY ... FROM STDIN para una tabla"""
+    return f"COPY {tabla} ({', '.join(COLUMNAS[tabla])}) FROM STDIN"
+
+# =====================================================
+# GENERADOR
+# =====================================================
+
+class SyntheticCohortGenerator:
+    """
+    Genera pacientes, citas, indicadores y diagnósticos de IA sintéticos
+    """
+    
+    def __init__(
+        self,
+        seed: int = JobConfig.COHORT_SEED,
+        max_visits: int = JobConfig.COHORT_MAX_VISITS,
+        fecha_referencia: Optional[date] = None,
+        validate: bool = True
+    ):
+        self.seed = seed
+        self.max_visits = max_visits
+        self.fecha_referencia = fecha_referencia or date.today()
+        self.validate = validate
+    
+    # =====================================================
+    # PACIENTE Y VISITAS
+    # =====================================================
+    
+    @staticmethod
+    def _uuid(rng: random.Random) -> str:
+        """UUID v4 determinista a partir del generador del paciente"""
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    
+    @staticmethod
+    def _poisson(rng: random.Random, media: float) -> int:
+        """Muestra de Poisson (método de Knuth; las medias usadas son pequeñas)"""
+        if media <= 0:
+            return 0
+        limite = math.exp(-media)
+        k, p = 0, rng.random()
+        while p > limite:
+            k += 1
+            p *= rng.random()
+        return k
+    
+    @staticmethod
+    def _edss(valor: float) -> float:
+        """Redondea a un EDSS válido (múltiplo de 0.5 entre 0 y 9.5)"""
+        return min(max(round(valor / SystemConstants.EDSS_STEP) * SystemConstants.EDSS_STEP, 0.0), 9.5)
+    
+    def generate_patient(self, indice: int) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Genera un paciente con su historia de visitas
+        
+        Args:
+            indice: Posición del paciente en la cohorte (junto con la semilla
+                determina todo su contenido)
+        
+        Returns:
+            Tupla (paciente, citas, visitas completadas); cada visita lleva las
+            variables de entrada de calculate_all y los datos de su diagnóstico
+        """
+        rng = random.Random(f"{self.seed}:{indice}")
+        
+        tipos = list(PERFILES_EM)
+        tipo_em = rng.choices(tipos, weights=[PERFILES_EM[t]['proporcion'] for t in tipos])[0]
+        perfil = PERFILES_EM[tipo_em]
+        
+        genero = 'Femenino' if rng.random() < perfil['mujeres'] else 'Masculino'
+        nombre = f"{rng.choice(NOMBRES[genero])} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+        
+        edad_diagnostico = min(max(rng.gauss(*perfil['edad_diagnostico']), 16), 65)
+        anos_evolucion = rng.uniform(*perfil['evolucion'])
+        fecha_diagnostico = self.fecha_referencia - timedelta(days=int(anos_evolucion * 365.25))
+        edss_basal = self._edss(rng.gauss(*perfil['edss_basal']))
+        tratamiento = rng.choice(TRATAMIENTOS[tipo_em])
+        
+        paciente = {
+            'id': self._uuid(rng),
+            'nombre_completo': nombre,
+            'edad': int(edad_diagnostico + anos_evolucion),
+            'genero': genero,
+            'tipo_em': tipo_em,
+            'edss_basal': edss_basal,
+            'tratamiento_actual': tratamiento,
+            'fecha_diagnostico': fecha_diagnostico,
+            'historial_medico': {
+                'antecedentes': rng.choice(ANTECEDENTES),
+                'alergias': rng.choice(ALERGIAS)
+            },
+            'medico_asignado_id': None,
+            'activo': rng.random() < 0.95
+        }
+        
+        # Actividad inflamatoria propia del paciente (los tratamientos de alta
+        # eficacia la reducen) alrededor de la media de su tipo de EM
+        actividad = rng.lognormvariate(0, 0.6)
+        if tratamiento in ('Natalizumab', 'Alemtuzumab', 'Ocrelizumab', 'Cladribina'):
+            actividad *= 0.4
+        
+        # Visitas cada ~6 meses hasta la fecha de referencia, como mucho max_visits
+        intervalo = 182
+        n_visitas = min(self.max_visits, max(1, int(anos_evolucion * 365.25 / intervalo)))
+        primera = self.fecha_referencia - timedelta(days=intervalo * n_visitas - rng.randint(0, 60))
+        primera = max(primera, fecha_diagnostico + timedelta(days=30))
+        
+        citas: List[Dict[str, Any]] = []
+        visitas: List[Dict[str, Any]] = []
+        
+        fecha = primera
+        ultima_fecha = fecha_diagnostico
+        t2_previas = 0
+        edss_actual = edss_basal
+        
+        while fecha <= self.fecha_referencia and len(citas) < self.max_visits:
+            hora = dt_time(rng.randint(8, 13), rng.choice((0, 30)), tzinfo=timezone.utc)
+            fecha_cita = datetime.combine(fecha, hora)
+            cancelada = bool(citas) and rng.random() < 0.05
+            
+            cita = {
+                'id': self._uuid(rng),
+                'paciente_id': paciente['id'],
+                'fecha_cita': fecha_cita,
+                'numero_visita': len(citas) + 1,
+                'estado': 'cancelada' if cancelada else 'completada',
+                'notas_medicas': 'Cita cancelada por el paciente.' if cancelada else rng.choice(NOTAS_CITA)
+            }
+            citas.append(cita)
+            
+            if not cancelada:
+                anos_intervalo = (fecha - ultima_fecha).days / 365.25
+                recaidas = self._poisson(rng, perfil['recaidas_ano'] * actividad * anos_intervalo)
+                t1_gd = self._poisson(rng, perfil['t1_gd'] * actividad * (1 + recaidas))
+                if not visitas:
+                    # Carga lesional de la RM del diagnóstico como referencia de la primera visita
+                    t2_previas = self._poisson(rng, 6 + 2 * max(edss_basal - 1, 0))
+                t2_actuales = t2_previas + self._poisson(rng, perfil['t2_ano'] * actividad * anos_intervalo)
+                
+                # Deriva de EDSS: empeora con probabilidad fija por visita (más
+                # tras una recaída) y mejora ocasionalmente
+                azar = rng.random()
+                if azar < perfil['progresion'] + 0.15 * min(recaidas, 2):
+                    edss_actual = self._edss(edss_actual + (1.0 if recaidas and edss_actual < 5.5 else 0.5))
+                elif azar > 0.95:
+                    edss_actual = self._edss(edss_actual - 0.5)
+                
+                visitas.append({
+                    'cita_id': cita['id'],
+                    'recaidas': recaidas,
+                    'fecha_inicio': fecha_diagnostico.isoformat(),
+                    'fecha_fin': fecha_cita.isoformat(),
+                    'lesiones_t1_gd': t1_gd,
+                    'lesiones_t2_actuales': t2_actuales,
+                    'lesiones_t2_previas': t2_previas,
+                    'edss_basal': edss_basal,
+                    'edss_actual': edss_actual,
+                    'tratamiento': tratamiento or 'tratamiento sintomático',
+                    'con_diagnostico': rng.random() < 0.7,
+                    'confianza_deepseek': round(rng.uniform(6.0, 9.8), 1),
+                    'confianza_copilot': round(rng.uniform(6.0, 9.8), 1),
+                    'ia_seleccionada': rng.choices(*SELECCION_IA)[0]
+                })
+                t2_previas = t2_actuales
+                ultima_fecha = fecha
+            
+            fecha += timedelta(days=intervalo + rng.randint(-30, 30))
+        
+        # Próxima cita pendiente para parte de los pacientes activos
+        if paciente['activo'] and rng.random() < 0.6:
+            fecha = self.fecha_referencia + timedelta(days=rng.randint(1, 90))
+            citas.append({
+                'id': self._uuid(rng),
+                'paciente_id': paciente['id'],
+                'fecha_cita': datetime.combine(fecha, dt_time(rng.randint(8, 13), 0, tzinfo=timezone.utc)),
+                'numero_visita': len(citas) + 1,
+                'estado': 'pendiente',
+                'notas_medicas': None
+            })
+        
+        return paciente, citas, visitas
+    
+    @staticmethod
+    def _build_diagnosis(visita: Dict[str, Any], resultado: Any) -> Dict[str, Any]:
+        """Genera el diagnóstico de IA de una visita a partir de sus indicadores"""
+        if resultado.CDP12_progresion:
+            deepseek = (
+                f"Progresión de discapacidad confirmada (EDSS {visita['edss_basal']:.1f} → {visita['edss_actual']:.1f}). "
+                f"Valorar cambio de {visita['tratamiento']} por una terapia de alta eficacia."
+            )
+            copilot = (
+                f"CDP-12 positivo con ΔEDSS {resultado.CDP12_valor:.1f}. "
+                f"Recomendable revisar el plan terapéutico actual ({visita['tratamiento']})."
+            )
+        elif resultado.NEDA3_estado == 'normal':
+            deepseek = f"Sin evidencia de actividad de enfermedad (NEDA-3). Mantener {visita['tratamiento']} y control en 6 meses."
+            copilot = f"Enfermedad estable, cumple NEDA-3. Continuar con {visita['tratamiento']}."
+        else:
+            deepseek = (
+                f"Actividad inflamatoria: {visita['recaidas']} recaída(s), {visita['lesiones_t1_gd']} lesión(es) T1 Gd+ "
+                f"y {int(resultado.T2_nuevas_valor)} nueva(s) T2. Evaluar eficacia de {visita['tratamiento']}."
+            )
+            copilot = (
+                f"NEDA-3 no cumplido (ARR {resultado.ARR_valor:.2f}). "
+                f"Considerar escalada terapéutica desde {visita['tratamiento']}."
+            )
+        
+        medico = visita['ia_seleccionada'] == 'medico'
+        return {
+            'cita_id': visita['cita_id'],
+            'diagnostico_deepseek': deepseek,
+            'confianza_deepseek': visita['confianza_deepseek'],
+            'diagnostico_copilot': copilot,
+            'confianza_copilot': visita['confianza_copilot'],
+            'ia_seleccionada': visita['ia_seleccionada'],
+            'diagnostico_medico_override': f"Revisión clínica: {deepseek}" if medico else None,
+            'justificacion_medico': "Criterio clínico tras la exploración neurológica." if medico else None
+        }
+    
+    def _validate_rows(self, tablas: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Valida cada tabla con su modelo de src/models/patient.py en un solo lote (lanza ValueError si alguna fila falla)"""
+        for tabla, filas in tablas.items():
+            validar_lote(MODELOS[tabla], filas)
+    
+    def generate_chunk(self, inicio: int, cantidad: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Genera un bloque de pacientes con todas sus filas relacionadas
+        
+        Args:
+            inicio: Índice del primer paciente del bloque
+            cantidad: Número de pacientes del bloque
+        
+        Returns:
+            Filas por tabla (claves de COLUMNAS)
+        """
+        tablas: Dict[str, List[Dict[str, Any]]] = {tabla: [] for tabla in COLUMNAS}
+        visitas: List[Dict[str, Any]] = []
+        
+        for indice in range(inicio, inicio + cantidad):
+            paciente, citas, visitas_paciente = self.generate_patient(indice)
+            tablas['pacientes'].append(paciente)
+            tablas['citas'].extend(citas)
+            visitas.extend(visitas_paciente)
+        
+        if visitas:
+            entrada = pd.DataFrame(visitas).set_index('cita_id')
+            resultados = BatchIndicatorCalculator.calculate_all(entrada)
+            tablas['indicadores_cita'] = BatchIndicatorCalculator.to_rows(entrada, resultados)
+            tablas['diagnosticos_ia'] = [
+                self._build_diagnosis(visita, resultado)
+                for visita, resultado in zip(visitas, resultados.itertuples(index=False))
+                if visita['con_diagnostico']
+            ]
+        
+        if self.validate:
+            self._validate_rows(tablas)
+        
+        return tablas
+    
+    def iter_chunks(self, n_pacientes: int, chunk_size: int = JobConfig.COHORT_CHUNK_SIZE) -> Iterator[Dict[str, List[Dict[str, Any]]]]:
+        """Genera la cohorte completa por bloques de chunk_size pacientes"""
+        for inicio in range(0, n_pacientes, chunk_size):
+            yield self.generate_chunk(inicio, min(chunk_size, n_pacientes - inicio))
+
+# =====================================================
+# SALIDA
+# =====================================================
+
+class CopyFileWriter:
+    """
+    Escribe un fichero COPY por tabla y un cargar.sql que los carga con psql
+    """
+    
+    def __init__(self, directorio: str = JobConfig.COHORT_OUTPUT_DIR):
+        self.directorio = Path(directorio)
+        self._ficheros: Dict[str, TextIO] = {}
+    
+    def __enter__(self) -> 'CopyFileWriter':
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        for tabla in COLUMNAS:
+            f = open(self.directorio / f"{tabla}.sql", 'w', encoding='utf-8')
+            f.write(f"{copy_statement(tabla)};\n")
+            self._ficheros[tabla] = f
+        return self
+    
+    def write(self, tablas: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Añade las filas de un bloque a los ficheros de cada tabla"""
+        for tabla, filas in tablas.items():
+            self._ficheros[tabla].write(copy_lines(tabla, filas))
+    
+    def __exit__(self, *exc_info) -> None:
+        for f in self._ficheros.values():
+            f.write("\\.\n")
+            f.close()
+        self._ficheros = {}
+        
+        with open(self.directorio / "cargar.sql", 'w', encoding='utf-8') as f:
+            f.write("-- Carga de la cohorte sintética (psql -f cargar.sql)\n")
+            f.write("\\set ON_ERROR_STOP on\n")
+            f.write("BEGIN;\n")
+            for tabla in COLUMNAS:
+                f.write(f"\\ir {tabla}.sql\n")
+            f.write("COMMIT;\n")
+            for tabla in COLUMNAS:
+                f.write(f"ANALYZE {tabla};\n")
+
+
+class PostgresCopyWriter:
+    """
+    Inserta cada bloque directamente en Postgres con COPY (un commit por bloque)
+    """
+    
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._conexion = None
+    
+    def __enter__(self) -> 'PostgresCopyWriter':
+        try:
+            import psycopg2
+        except ImportError:
+            raise ImportError("La inserción directa requiere psycopg2 (pip install psycopg2-binary)")
+        
+        self._conexion = psycopg2.connect(self.dsn)
+        return self
+    
+    def write(self, tablas: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Carga las filas de un bloque en una transacción"""
+        try:
+            with self._conexion.cursor() as cursor:
+                for tabla, filas in tablas.items():
+                    if filas:
+                        cursor.copy_expert(copy_statement(tabla), io.StringIO(copy_lines(tabla, filas)))
+            self._conexion.commit()
+        except Exception:
+            self._conexion.rollback()
+            raise
+    
+    def __exit__(self, *exc_info) -> None:
+        if self._conexion is not None:
+            if exc_info[0] is None:
+                with self._conexion.cursor() as cursor:
+                    for tabla in COLUMNAS:
+                        cursor.execute(f"ANALYZE {tabla}")
+                self._conexion.commit()
+            self._conexion.close()
+            self._conexion = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Genera una cohorte sintética de pacientes con EM")
+    parser.add_argument('--pacientes', type=int, required=True, help="Número de pacientes")
+    parser.add_argument('--semilla', type=int, default=JobConfig.COHORT_SEED, help="Semilla aleatoria")
+    parser.add_argument('--max-visitas', type=int, default=JobConfig.COHORT_MAX_VISITS, help="Visitas pasadas máximas por paciente")
+    parser.add_argument('--fecha-referencia', type=date.fromisoformat, default=None, help="Fecha 'hoy' de la cohorte (AAAA-MM-DD)")
+    parser.add_argument('--bloque', type=int, default=JobConfig.COHORT_CHUNK_SIZE, help="Pacientes por bloque")
+    parser.add_argument('--salida', default=JobConfig.COHORT_OUTPUT_DIR, help="Directorio de los ficheros COPY")
+    parser.add_argument('--dsn', default=None, help="Insertar directamente en este Postgres en lugar de escribir ficheros")
+    parser.add_argument('--sin-validar', action='store_true', help="No validar las filas con los modelos Pydantic")
+    args = parser.parse_args(argv)
+    
+    generador = SyntheticCohortGenerator(
+        seed=args.semilla,
+        max_visits=args.max_visitas,
+        fecha_referencia=args.fecha_referencia,
+        validate=not args.sin_validar
+    )
+    destino = PostgresCopyWriter(args.dsn) if args.dsn else CopyFileWriter(args.salida)
+    
+    totales = {tabla: 0 for tabla in COLUMNAS}
+    inicio = time.perf_counter()
+    
+    try:
+        with destino:
+            for tablas in generador.iter_chunks(args.pacientes, args.bloque):
+                destino.write(tablas)
+                for tabla, filas in tablas.items():
+                    totales[tabla] += len(filas)
+                logger.info(
+                    f"{totales['pacientes']}/{args.pacientes} pacientes generados "
+                    f"({time.perf_counter() - inicio:.1f}s)"
+                )
+    except Exception as e:
+        logger.error(f"Error al generar la cohorte sintética: {e}")
+        return 1
+    
+    logger.info(
+        f"Cohorte sintética (semilla {args.semilla}, referencia {generador.fecha_referencia}) "
+        f"{'insertada' if args.dsn else f'escrita en {args.salida}'}: "
+        + ", ".join(f"{n} {tabla}" for tabla, n in totales.items())
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -306,6 +306,241 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- =====================================================
+-- FUNCIÓN: buscar_pacientes
+-- Búsqueda de pacientes por nombre (subcadena o similitud trigram),
+-- ordenada por relevancia. Usa el índice idx_pacientes_nombre_trgm
+-- =====================================================
+CREATE OR REPLACE FUNCTION buscar_pacientes(
+    p_texto TEXT,
+    p_limite INTEGER DEFAULT 20,
+    p_activos_solo BOOLEAN DEFAULT TRUE
+)
+RETURNS TABLE(
+    id UUID,
+    nombre_completo VARCHAR,
+    tipo_em VARCHAR,
+    edss_basal DECIMAL,
+    similitud REAL
+) AS $$
+    WITH busqueda AS (
+        -- Escapar comodines de LIKE en el texto introducido
+        SELECT replace(replace(replace(trim(p_texto), '\', '\\'), '%', '\%'), '_', '\_') AS patron
+    )
+    SELECT
+        p.id,
+        p.nombre_completo,
+        p.tipo_em,
+        p.edss_basal,
+        similarity(p.nombre_completo, trim(p_texto)) AS similitud
+    FROM pacientes p, busqueda b
+    WHERE (NOT p_activos_solo OR p.activo = TRUE)
+      AND (p.nombre_completo ILIKE '%' || b.patron || '%'
+           OR p.nombre_completo % trim(p_texto))
+    ORDER BY
+        (p.nombre_completo ILIKE b.patron || '%') DESC,  -- primero los que empiezan por el texto
+        similitud DESC,
+        p.nombre_completo
+    LIMIT p_limite;
+$$ LANGUAGE sql STABLE;
+
+-- =====================================================
+-- FUNCIÓN: obtener_estadisticas_inicio
+-- Estadísticas de la página principal en una sola llamada
+-- =====================================================
+CREATE OR REPLACE FUNCTION obtener_estadisticas_inicio(
+    p_dias_adelante INTEGER DEFAULT 30
+)
+RETURNS TABLE(
+    pacientes_activos BIGINT,
+    citas_proximas BIGINT,
+    total_consultas_ia BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY SELECT
+        (SELECT COUNT(*) FROM pacientes WHERE activo = TRUE),
+        (SELECT COUNT(*) FROM citas
+          WHERE estado = 'pendiente'
+            AND fecha_cita <= NOW() + make_interval(days => p_dias_adelante)),
+        (SELECT COUNT(*) FROM diagnosticos_ia);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- =====================================================
+-- FUNCIÓN: obtener_dashboard_paciente
+-- Datos del dashboard de un paciente en una sola llamada:
+-- citas completadas, series temporales de todos los indicadores
+-- (ordenadas por fecha_cita) y detalle de la última visita
+-- =====================================================
+CREATE OR REPLACE FUNCTION obtener_dashboard_paciente(
+    p_paciente_id UUID
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_citas JSONB;
+    v_series JSONB;
+    v_ultima_cita citas;
+    v_indicadores_ultima JSONB;
+BEGIN
+    -- Citas completadas (solo los campos que usa el dashboard)
+    SELECT COALESCE(
+        jsonb_agg(
+            jsonb_build_object('id', c.id, 'numero_visita', c.numero_visita, 'fecha_cita', c.fecha_cita)
+            ORDER BY c.fecha_cita
+        ),
+        '[]'::JSONB
+    )
+    INTO v_citas
+    FROM citas c
+    WHERE c.paciente_id = p_paciente_id
+      AND c.estado = 'completada';
+    
+    -- Series temporales: {tipo: [{fecha_cita, valor, estado}, ...]}
+    SELECT COALESCE(jsonb_object_agg(s.indicador_tipo, s.puntos), '{}'::JSONB)
+    INTO v_series
+    FROM (
+        SELECT
+            ic.indicador_tipo,
+            jsonb_agg(
+                jsonb_build_object('fecha_cita', c.fecha_cita, 'valor', ic.valor_calculado, 'estado', ic.estado)
+                ORDER BY c.fecha_cita
+            ) AS puntos
+        FROM indicadores_cita ic
+        JOIN citas c ON c.id = ic.cita_id
+        WHERE c.paciente_id = p_paciente_id
+        GROUP BY ic.indicador_tipo
+    ) s;
+    
+    -- Última visita completada y sus indicadores
+    SELECT *
+    INTO v_ultima_cita
+    FROM citas c
+    WHERE c.paciente_id = p_paciente_id
+      AND c.estado = 'completada'
+    ORDER BY c.fecha_cita DESC
+    LIMIT 1;
+    
+    SELECT COALESCE(
+        jsonb_agg(
+            jsonb_build_object(
+                'indicador_tipo', ic.indicador_tipo,
+                'valor_calculado', ic.valor_calculado,
+                'estado', ic.estado,
+                'justificacion_texto', ic.justificacion_texto
+            )
+            ORDER BY ic.indicador_tipo
+        ),
+        '[]'::JSONB
+    )
+    INTO v_indicadores_ultima
+    FROM indicadores_cita ic
+    WHERE ic.cita_id = v_ultima_cita.id;
+    
+    RETURN jsonb_build_object(
+        'citas_completadas', v_citas,
+        'series', v_series,
+        'ultima_visita', jsonb_build_object(
+            'cita_id', v_ultima_cita.id,
+            'numero_visita', v_ultima_cita.numero_visita,
+            'fecha_cita', v_ultima_cita.fecha_cita,
+            'indicadores', v_indicadores_ultima
+        )
+    );
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- =====================================================
+-- FUNCIÓN: crear_cita_numerada
+-- Crea una cita asignando el siguiente número de visita del paciente
+-- de forma atómica (sin duplicados con reservas simultáneas)
+-- =====================================================
+CREATE OR REPLACE FUNCTION crear_cita_numerada(
+    p_datos JSONB
+)
+RETURNS citas AS $$
+DECLARE
+    v_cita citas;
+    v_datos citas;
+    v_numero INTEGER;
+BEGIN
+    v_datos := jsonb_populate_record(NULL::citas, p_datos);
+    
+    -- Bloquear la fila del paciente: serializa la numeración de sus citas
+    PERFORM 1 FROM pacientes WHERE id = v_datos.paciente_id FOR UPDATE;
+    
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Paciente % no encontrado', v_datos.paciente_id;
+    END IF;
+    
+    -- Siguiente número de visita
+    SELECT COALESCE(MAX(numero_visita), 0) + 1
+    INTO v_numero
+    FROM citas
+    WHERE paciente_id = v_datos.paciente_id;
+    
+    INSERT INTO citas (paciente_id, fecha_cita, numero_visita, estado, notas_medicas)
+    VALUES (
+        v_datos.paciente_id,
+        v_datos.fecha_cita,
+        v_numero,
+        COALESCE(v_datos.estado, 'pendiente'),
+        v_datos.notas_medicas
+    )
+    RETURNING * INTO v_cita;
+    
+    RETURN v_cita;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =====================================================
+-- FUNCIÓN: guardar_indicadores_cita
+-- Guarda los indicadores de una cita y la marca como completada
+-- en una sola transacción
+-- =====================================================
+CREATE OR REPLACE FUNCTION guardar_indicadores_cita(
+    p_cita_id UUID,
+    p_indicadores JSONB,
+    p_completar_cita BOOLEAN DEFAULT TRUE
+)
+RETURNS SETOF indicadores_cita AS $$
+BEGIN
+    -- Upsert de todos los indicadores recibidos (array JSON de filas)
+    RETURN QUERY
+    INSERT INTO indicadores_cita (
+        cita_id, indicador_tipo, valor_calculado, estado, justificacion_texto, variables_entrada
+    )
+    SELECT
+        p_cita_id,
+        i.indicador_tipo,
+        i.valor_calculado,
+        i.estado,
+        i.justificacion_texto,
+        COALESCE(i.variables_entrada, '{}'::JSONB)
+    FROM jsonb_to_recordset(p_indicadores) AS i(
+        indicador_tipo indicador_tipo,
+        valor_calculado DECIMAL(10,2),
+        estado estado_indicador,
+        justificacion_texto TEXT,
+        variables_entrada JSONB
+    )
+    ON CONFLICT (cita_id, indicador_tipo) DO UPDATE SET
+        valor_calculado = EXCLUDED.valor_calculado,
+        estado = EXCLUDED.estado,
+        justificacion_texto = EXCLUDED.justificacion_texto,
+        variables_entrada = EXCLUDED.variables_entrada
+    RETURNING *;
+    
+    -- Marcar la cita como completada (si falla, se revierten también los indicadores)
+    IF p_completar_cita THEN
+        UPDATE citas SET estado = 'completada' WHERE id = p_cita_id;
+        
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'Cita % no encontrada', p_cita_id;
+        END IF;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
 -- =====================================================
 -- COMENTARIOS
 -- =====================================================
@@ -315,3 +550,8 @@ COMMENT ON FUNCTION calcular_diferencia_t2 IS 'Calcula diferencia de lesiones T2
 COMMENT ON FUNCTION evaluar_cdp12 IS 'Evalúa Confirmed Disability Progression a 12 semanas';
 COMMENT ON FUNCTION evaluar_neda3 IS 'Evalúa cumplimiento de criterios NEDA-3';
 COMMENT ON FUNCTION obtener_metricas_ia IS 'Calcula métricas de precisión de las IAs en un período';
+COMMENT ON FUNCTION buscar_pacientes IS 'Busca pacientes por nombre (subcadena o similitud trigram) ordenados por relevancia';
+COMMENT ON FUNCTION obtener_estadisticas_inicio IS 'Cuenta pacientes activos, citas próximas y consultas IA para la página principal';
+COMMENT ON FUNCTION obtener_dashboard_paciente IS 'Devuelve en un JSON las series de indicadores y la última visita de un paciente para el dashboard';
+COMMENT ON FUNCTION crear_cita_numerada IS 'Crea una cita con el siguiente número de visita del paciente de forma atómica';
+COMMENT ON FUNCTION guardar_indicadores_cita IS 'Guarda los indicadores de una cita y la marca como completada en una sola transacción';
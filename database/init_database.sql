@@ -68,6 +68,7 @@ DROP TYPE IF EXISTS indicador_tipo CASCADE;
 -- =====================================================
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pgcrypto";
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 
 -- =====================================================
 -- PASO 3: CREAR TIPOS ENUM
@@ -180,17 +181,20 @@ CREATE TABLE auditoria (
 -- =====================================================
 
 -- Índices para pacientes
-CREATE INDEX idx_pacientes_nombre ON pacientes(nombre_completo);
+CREATE INDEX idx_pacientes_nombre_trgm ON pacientes USING GIN (nombre_completo gin_trgm_ops);
+CREATE INDEX idx_pacientes_activos_nombre ON pacientes(nombre_completo, id) WHERE activo = TRUE;
 CREATE INDEX idx_pacientes_medico ON pacientes(medico_asignado_id);
 CREATE INDEX idx_pacientes_activo ON pacientes(activo);
 
 -- Índices para citas
-CREATE INDEX idx_citas_paciente ON citas(paciente_id);
+-- (las búsquedas por paciente_id usan idx_citas_paciente_fecha y UNIQUE(paciente_id, numero_visita))
+CREATE INDEX idx_citas_paciente_fecha ON citas(paciente_id, fecha_cita DESC, id DESC);
+CREATE INDEX idx_citas_pendientes_fecha ON citas(fecha_cita) WHERE estado = 'pendiente';
+CREATE INDEX idx_citas_completadas_id ON citas(id) WHERE estado = 'completada';
 CREATE INDEX idx_citas_fecha ON citas(fecha_cita);
-CREATE INDEX idx_citas_estado ON citas(estado);
 
 -- Índices para indicadores
-CREATE INDEX idx_indicadores_cita ON indicadores_cita(cita_id);
+-- (las búsquedas por cita_id usan el índice de UNIQUE(cita_id, indicador_tipo))
 CREATE INDEX idx_indicadores_tipo ON indicadores_cita(indicador_tipo);
 CREATE INDEX idx_indicadores_estado ON indicadores_cita(estado);
 
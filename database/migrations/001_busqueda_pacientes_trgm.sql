@@ -0,0 +1,12 @@
+-- =====================================================
+-- MIGRACIÓN 001: Búsqueda de pacientes por nombre con pg_trgm
+-- Para bases de datos creadas antes de incluir el índice en init_database.sql.
+-- Es idempotente: puede ejecutarse varias veces.
+-- Después de ejecutarla, volver a ejecutar functions.sql (buscar_pacientes).
+-- =====================================================
+
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+
+-- Índice GIN de trigramas: acelera ILIKE '%texto%' y el operador de similitud %
+CREATE INDEX IF NOT EXISTS idx_pacientes_nombre_trgm
+    ON pacientes USING GIN (nombre_completo gin_trgm_ops);
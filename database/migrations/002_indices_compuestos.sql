@@ -0,0 +1,81 @@
+-- =====================================================
+-- MIGRACIÓN 002: Índices compuestos y parciales según las consultas reales
+-- Para bases de datos existentes (init_database.sql ya los incluye).
+-- Es idempotente: puede ejecutarse varias veces.
+-- =====================================================
+
+-- -----------------------------------------------------
+-- Citas
+-- -----------------------------------------------------
+
+-- listar_citas_paciente: WHERE paciente_id = ? ORDER BY fecha_cita DESC, id DESC
+-- (también la paginación por cursor (fecha_cita, id))
+CREATE INDEX IF NOT EXISTS idx_citas_paciente_fecha
+    ON citas(paciente_id, fecha_cita DESC, id DESC);
+
+-- obtener_citas_pendientes / contar_citas_pendientes / obtener_estadisticas_inicio:
+-- WHERE estado = 'pendiente' AND fecha_cita <= ?
+CREATE INDEX IF NOT EXISTS idx_citas_pendientes_fecha
+    ON citas(fecha_cita)
+    WHERE estado = 'pendiente';
+
+-- Las consultas por estado usan los índices parciales; con el índice simple
+-- sobre estado el planificador lo prefiere para las pendientes (las
+-- estadísticas de fecha_cita las dominan las citas pasadas) y filtra todas
+-- las pendientes en lugar de recorrer solo la ventana de fechas
+DROP INDEX IF EXISTS idx_citas_estado;
+
+-- listar_citas_completadas (recálculo de indicadores): WHERE estado = 'completada' AND id > ? ORDER BY id
+CREATE INDEX IF NOT EXISTS idx_citas_completadas_id
+    ON citas(id)
+    WHERE estado = 'completada';
+
+-- crear_cita_numerada (MAX(numero_visita) por paciente) ya usa el índice de
+-- UNIQUE(paciente_id, numero_visita); el índice simple sobre paciente_id
+-- queda cubierto por los compuestos
+DROP INDEX IF EXISTS idx_citas_paciente;
+
+-- -----------------------------------------------------
+-- Pacientes
+-- -----------------------------------------------------
+
+-- listar_pacientes(activos_solo=True): WHERE activo ORDER BY nombre_completo, id
+-- (también la paginación por cursor (nombre_completo, id) y contar_pacientes)
+CREATE INDEX IF NOT EXISTS idx_pacientes_activos_nombre
+    ON pacientes(nombre_completo, id)
+    WHERE activo = TRUE;
+
+-- El índice simple sobre nombre_completo no lo usa ninguna consulta (el
+-- filtro por prefijo es ILIKE) y con la paginación por cursor el planificador
+-- lo elige y reordena por id en lugar de usar el compuesto
+DROP INDEX IF EXISTS idx_pacientes_nombre;
+
+-- -----------------------------------------------------
+-- Indicadores
+-- -----------------------------------------------------
+
+-- obtener_indicadores_cita / upserts por (cita_id, indicador_tipo) ya usan el
+-- índice de UNIQUE(cita_id, indicador_tipo): el índice simple es redundante
+DROP INDEX IF EXISTS idx_indicadores_cita;
+
+-- -----------------------------------------------------
+-- Estadísticas actualizadas para el planificador
+-- -----------------------------------------------------
+ANALYZE citas;
+ANALYZE pacientes;
+ANALYZE indicadores_cita;
+
+-- =====================================================
+-- VERIFICACIÓN (ejecutar con datos sintéticos; cada plan debe usar el índice indicado)
+-- Automatizada en tests/test_migracion_indices.py (requiere TEST_DATABASE_URL)
+-- =====================================================
+-- EXPLAIN SELECT * FROM citas WHERE paciente_id = '<uuid>' ORDER BY fecha_cita DESC, id DESC LIMIT 20;
+--   -> Index Scan using idx_citas_paciente_fecha
+-- EXPLAIN SELECT * FROM citas WHERE estado = 'pendiente' AND fecha_cita <= NOW() + INTERVAL '30 days';
+--   -> Index Scan / Bitmap Index Scan using idx_citas_pendientes_fecha
+-- EXPLAIN SELECT id FROM citas WHERE estado = 'completada' AND id > '<uuid>' ORDER BY id LIMIT 500;
+--   -> Index Scan using idx_citas_completadas_id
+-- EXPLAIN SELECT id, nombre_completo FROM pacientes WHERE activo = TRUE ORDER BY nombre_completo, id LIMIT 21;
+--   -> Index Scan using idx_pacientes_activos_nombre
+-- EXPLAIN SELECT * FROM indicadores_cita WHERE cita_id = '<uuid>';
+--   -> Index Scan using indicadores_cita_cita_id_indicador_tipo_key
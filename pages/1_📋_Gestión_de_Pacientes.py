@@ -312,7 +312,7 @@ st.markdown('</div>', unsafe_allow_html=True)
 st.markdown('<div class="section-title">📋 Gestión de Pacientes</div>', unsafe_allow_html=True)
 
 # Tabs para organizar la interfaz
-tab1, tab2 = st.tabs(["👤 Seleccionar Paciente", "➕ Nuevo Paciente"])
+tab1, tab2, tab3 = st.tabs(["👤 Seleccionar Paciente", "➕ Nuevo Paciente", "📥 Importación Masiva"])
 
 # =====================================================
 # TAB 1: SELECCIONAR PACIENTE
@@ -321,11 +321,47 @@ with tab1:
     st.markdown("### Seleccionar Paciente Existente")
     
     try:
-        # Obtener lista de pacientes
-        pacientes = db.listar_pacientes(activos_solo=True)
+        busqueda = st.text_input(
+            "Buscar paciente por nombre:",
+            placeholder="Escribe parte del nombre..."
+        ).strip()
+        
+        if busqueda:
+            # Búsqueda por relevancia en el servidor (índice trigram)
+            pacientes = db.buscar_pacientes(busqueda, limite=SystemConstants.ITEMS_PER_PAGE)
+        else:
+            # Paginación por cursor: pila con el cursor de inicio de cada página visitada
+            cursores = st.session_state.setdefault('pacientes_cursores', [None])
+            
+            # Obtener una página de pacientes (solo las columnas del selector;
+            # la ficha completa se carga al elegir)
+            pagina = db.listar_pacientes(
+                activos_solo=True,
+                campos='selector',
+                limite=SystemConstants.ITEMS_PER_PAGE + 1,
+                despues_de=cursores[-1]
+            )
+            hay_mas = len(pagina) > SystemConstants.ITEMS_PER_PAGE
+            pacientes = pagina[:SystemConstants.ITEMS_PER_PAGE]
+            
+            col_prev, col_info, col_next = st.columns([1, 2, 1])
+            with col_prev:
+                if st.button("⬅️ Anterior", disabled=len(cursores) == 1, use_container_width=True):
+                    cursores.pop()
+                    st.rerun()
+            with col_info:
+                st.caption(f"Página {len(cursores)} · {len(pacientes)} pacientes")
+            with col_next:
+                if st.button("Siguiente ➡️", disabled=not hay_mas, use_container_width=True):
+                    ultimo = pacientes[-1]
+                    cursores.append((ultimo['nombre_completo'], ultimo['id']))
+                    st.rerun()
         
         if not pacientes:
-            st.warning("No hay pacientes registrados en el sistema. Crea uno nuevo en la pestaña 'Nuevo Paciente'.")
+            if busqueda:
+                st.info(f"No se encontraron pacientes que coincidan con '{busqueda}'.")
+            else:
+                st.warning("No hay pacientes registrados en el sistema. Crea uno nuevo en la pestaña 'Nuevo Paciente'.")
         else:
             # Crear opciones para el selectbox
             opciones_pacientes = {
@@ -342,7 +378,7 @@ with tab1:
             )
             
             if paciente_seleccionado_key:
-                paciente = opciones_pacientes[paciente_seleccionado_key]
+                paciente = db.obtener_paciente(opciones_pacientes[paciente_seleccionado_key]['id'])
                 
                 # Mostrar información del paciente
                 st.success(f"✅ Paciente seleccionado: **{paciente['nombre_completo']}**")
@@ -564,6 +600,66 @@ with tab2:
                     st.error(f"❌ Error al crear paciente: {e}")
                     logger.error(f"Error al crear paciente: {e}")
 
+# =====================================================
+# TAB 3: IMPORTACIÓN MASIVA
+# =====================================================
+with tab3:
+    st.markdown("### Importar Pacientes desde CSV o Excel")
+    st.caption(
+        "Una fila por paciente con las columnas: nombre_completo, edad, genero, tipo_em, edss_basal, "
+        "fecha_diagnostico (AAAA-MM-DD o DD/MM/AAAA) y, opcionalmente, tratamiento_actual, "
+        "antecedentes y activo. Las filas con errores se omiten y se listan al terminar."
+    )
+    
+    archivo = st.file_uploader("Archivo de pacientes", type=["csv", "xlsx"])
+    simular = st.checkbox("Solo validar (no guardar)", value=False)
+    
+    if archivo and st.button("📥 Importar Pacientes", use_container_width=True):
+        from src.jobs.import_patients import PatientImportJob
+        
+        barra = st.progress(0.0, text="Importando...")
+        tamano = max(archivo.size, 1)
+        
+        def mostrar_progreso(estado):
+            # Aproximación por posición en el fichero (los Excel se leen de una vez)
+            posicion = min(archivo.tell() / tamano, 1.0) if archivo.name.endswith('.csv') else 0.5
+            barra.progress(
+                posicion,
+                text=f"{estado['leidas']} filas leídas · {estado['guardadas']} guardadas · "
+                     f"{estado['errores']} con errores · {estado['filas_s']:.0f} filas/s"
+            )
+        
+        try:
+            job = PatientImportJob(dry_run=simular, progreso=mostrar_progreso)
+            resumen = job.run(archivo, nombre=archivo.name)
+            barra.progress(1.0, text="Importación terminada")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Filas leídas", resumen['leidas'])
+            col2.metric("Válidas", resumen['validas'])
+            col3.metric("Guardadas", resumen['guardadas'])
+            col4.metric("Filas/s", f"{resumen['filas_s']:.0f}")
+            
+            if job.errores:
+                st.warning(f"⚠️ {len(job.errores)} filas con errores")
+                st.dataframe(
+                    [{'fila': e['fila'], 'errores': '; '.join(e['errores'])} for e in job.errores],
+                    use_container_width=True,
+                    hide_index=True
+                )
+                st.download_button(
+                    "⬇️ Descargar errores (CSV)",
+                    data=job.errors_csv(),
+                    file_name="errores_importacion.csv",
+                    mime="text/csv"
+                )
+            elif not simular:
+                st.success(f"✅ {resumen['guardadas']} pacientes importados")
+        
+        except Exception as e:
+            st.error(f"❌ Error al importar pacientes: {e}")
+            logger.error(f"Error al importar pacientes: {e}")
+
 # Información del paciente activo en sidebar
 if st.session_state.get('paciente_seleccionado'):
     st.sidebar.success("✅ Paciente activo establecido")
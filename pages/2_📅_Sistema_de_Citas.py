@@ -407,7 +407,7 @@ with tab2:
     
     try:
         # Obtener última cita para sugerir intervalo
-        citas = db.listar_citas_paciente(paciente['id'])
+        citas = db.listar_citas_paciente(paciente['id'], campos='selector')
         ultima_cita = None
         if citas:
             citas_ordenadas = sorted(citas, key=lambda x: x.get('fecha_cita', ''), reverse=True)
@@ -497,7 +497,7 @@ with tab3:
     try:
         dias_adelante = st.slider("Mostrar citas de los próximos:", 1, 90, 30, help="Días hacia adelante")
         
-        citas_proximas = db.obtener_citas_pendientes(dias_adelante=dias_adelante)
+        citas_proximas = db.obtener_citas_pendientes(dias_adelante=dias_adelante, campos='selector')
         
         if not citas_proximas:
             st.info(f"No hay citas pendientes en los próximos {dias_adelante} días.")
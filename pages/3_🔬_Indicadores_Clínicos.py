@@ -346,7 +346,7 @@ with tab1:
         st.markdown("#### Recaídas desde Última Visita")
         
         # Obtener fecha de última visita
-        citas_anteriores = db.listar_citas_paciente(paciente['id'])
+        citas_anteriores = db.listar_citas_paciente(paciente['id'], campos='selector')
         citas_anteriores = [c for c in citas_anteriores if c['numero_visita'] < cita['numero_visita']]
         
         if citas_anteriores:
@@ -399,7 +399,7 @@ with tab1:
         lesiones_t2_previas = 0
         if citas_anteriores:
             for cita_ant in sorted(citas_anteriores, key=lambda x: x['numero_visita'], reverse=True):
-                indicadores_ant = db.obtener_indicadores_cita(cita_ant['id'])
+                indicadores_ant = db.obtener_indicadores_cita(cita_ant['id'], campos=['indicador_tipo', 'variables_entrada'])
                 for ind in indicadores_ant:
                     if ind['indicador_tipo'] == 'T2_nuevas':
                         vars_entrada = ind.get('variables_entrada', {})
@@ -431,7 +431,7 @@ with tab1:
     # Verificar si ya existen indicadores
     indicadores_existentes = None
     try:
-        indicadores_existentes = db.obtener_indicadores_cita(cita['id'])
+        indicadores_existentes = db.obtener_indicadores_cita(cita['id'], campos='selector')
     except:
         pass
     
@@ -549,17 +549,13 @@ with tab1:
                     'variables_entrada': neda_detalles
                 })
                 
-                # Guardar en base de datos
-                for ind in indicadores_calculados:
-                    db.guardar_indicador(ind)
-                
-                # Actualizar estado de la cita
-                db.actualizar_cita(cita['id'], {'estado': 'completada'})
+                # Guardar los indicadores y marcar la cita como completada (una transacción)
+                db.guardar_indicadores_cita(cita['id'], indicadores_calculados)
                 
                 # Enviar alertas críticas via n8n (si está configurado)
                 try:
                     from src.n8n import n8n_client
-                    import asyncio
+                    from src.utils import run_async
                     
                     # Verificar si hay indicadores críticos
                     indicadores_criticos = [ind for ind in indicadores_calculados if ind['estado'] == 'critico']
@@ -567,7 +563,7 @@ with tab1:
                     if indicadores_criticos and n8n_client.is_configured():
                         for ind_critico in indicadores_criticos:
                             # Enviar alerta de forma asíncrona
-                            alerta_enviada = asyncio.run(
+                            alerta_enviada = run_async(
                                 n8n_client.enviar_alerta_critica(ind_critico, paciente, cita)
                             )
                             if alerta_enviada:
@@ -649,7 +645,7 @@ with tab3:
             options=['ARR', 'T1_Gd', 'T2_nuevas', 'CDP12', 'NEDA3']
         )
         
-        historial = db.obtener_historial_indicadores(paciente['id'], tipo_indicador)
+        historial = db.obtener_historial_indicadores(paciente['id'], tipo_indicador, campos='chart')
         
         if not historial:
             st.info(f"No hay historial de {tipo_indicador} para este paciente.")
@@ -2,7 +2,6 @@
 Página de Consulta Dual a IA
 """
 import streamlit as st
-import asyncio
 import sys
 from pathlib import Path
 
@@ -11,7 +10,8 @@ sys.path.insert(0, str(root_dir))
 
 from src.database import db
 from src.ai import DualAIConsultation
-from config import IASeleccionada
+from src.utils import run_async, iterate_async
+from config import IASeleccionada, AIConfig
 from loguru import logger
 
 st.set_page_config(page_title="Consulta IA", page_icon="🤖", layout="wide", initial_sidebar_state="collapsed")
@@ -376,6 +376,11 @@ with tab1:
     if not diagnostico_existente:
         st.markdown("---")
         
+        forzar_consulta = st.checkbox(
+            "Ignorar respuestas en caché (forzar nueva consulta a las IAs)",
+            help="Si los datos de la cita no han cambiado se reutiliza la respuesta anterior sin volver a consultar a las IAs"
+        )
+        
         # Botón para consultar
         if st.button("🤖 CONSULTAR A LAS IAs", type="primary", use_container_width=True):
             
@@ -400,12 +405,9 @@ with tab1:
                         prompt = consultor._build_prompt(paciente['id'], cita['id'])
                         
                         # Consultar via n8n
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        resultado_n8n = loop.run_until_complete(
-                            n8n_client.consultar_ias(prompt)
+                        resultado_n8n = run_async(
+                            n8n_client.consultar_ias(prompt, usar_cache=not forzar_consulta)
                         )
-                        loop.close()
                         
                         if resultado_n8n:
                             # Verificar si la respuesta tiene el formato esperado del webhook del usuario
@@ -447,13 +449,43 @@ with tab1:
                     if not usar_n8n:
                         consultor = DualAIConsultation()
                         
-                        # Ejecutar consulta dual (asyncio)
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        resultado = loop.run_until_complete(
-                            consultor.query_both_ais(paciente['id'], cita['id'])
-                        )
-                        loop.close()
+                        if AIConfig.STREAMING_ENABLED:
+                            # Mostrar los diagnósticos a medida que se generan
+                            col_ds, col_cp = st.columns(2)
+                            with col_ds:
+                                st.markdown("#### 🔵 DeepSeek")
+                                zona_deepseek = st.empty()
+                            with col_cp:
+                                st.markdown("#### 🟢 Microsoft Copilot")
+                                zona_copilot = st.empty()
+                            
+                            zonas = {'deepseek': zona_deepseek, 'copilot': zona_copilot}
+                            textos = {'deepseek': '', 'copilot': ''}
+                            resultado = None
+                            
+                            for evento in iterate_async(
+                                consultor.stream_both_ais(
+                                    paciente['id'],
+                                    cita['id'],
+                                    usar_cache=not forzar_consulta
+                                )
+                            ):
+                                if evento['tipo'] == 'delta':
+                                    textos[evento['ia']] += evento['texto']
+                                    zonas[evento['ia']].markdown(textos[evento['ia']] + " ▌")
+                                elif evento['tipo'] == 'fin':
+                                    zonas[evento['ia']].markdown(evento['resultado']['diagnostico'])
+                                elif evento['tipo'] == 'completado':
+                                    resultado = evento['resultado']
+                        else:
+                            # Ejecutar consulta dual en el event loop persistente (reutiliza conexiones)
+                            resultado = run_async(
+                                consultor.query_both_ais(
+                                    paciente['id'],
+                                    cita['id'],
+                                    usar_cache=not forzar_consulta
+                                )
+                            )
                         
                         # Guardar en session state
                         st.session_state['resultado_ia'] = resultado
@@ -640,7 +672,7 @@ with tab2:
     
     try:
         # Obtener todas las citas con diagnósticos
-        citas = db.listar_citas_paciente(paciente['id'])
+        citas = db.listar_citas_paciente(paciente['id'], campos='selector')
         
         diagnosticos_encontrados = []
         
@@ -467,7 +467,7 @@ with tab1:
             st.markdown("#### 📈 Evolución Temporal de Accuracy")
             
             try:
-                historial_metricas = db.obtener_historial_metricas_ia(limite=30)
+                historial_metricas = db.obtener_historial_metricas_ia(limite=30, campos='chart')
                 
                 if historial_metricas:
                     df_hist = pd.DataFrame(historial_metricas)
@@ -525,9 +525,10 @@ with tab2:
     st.markdown(f"### Análisis de Evolución: {paciente['nombre_completo']}")
     
     try:
-        # Obtener historial de citas
-        citas = db.listar_citas_paciente(paciente['id'])
-        citas_completadas = [c for c in citas if c.get('estado') == 'completada']
+        # Citas, series de indicadores y última visita en una sola llamada
+        dashboard = db.obtener_dashboard_paciente(paciente['id'])
+        citas_completadas = dashboard.get('citas_completadas', [])
+        series = dashboard.get('series', {})
         
         if not citas_completadas:
             st.info("No hay citas completadas para este paciente. Los gráficos se mostrarán cuando haya datos disponibles.")
@@ -571,7 +572,7 @@ with tab2:
                 fig = go.Figure()
                 
                 for tipo_ind in indicadores_seleccionados:
-                    historial = db.obtener_historial_indicadores(paciente['id'], tipo_ind)
+                    historial = series.get(tipo_ind, [])
                     
                     if historial:
                         fechas = []
@@ -579,9 +580,8 @@ with tab2:
                         estados = []
                         
                         for h in historial:
-                            cita_data = h.get('citas', {})
-                            fechas.append(cita_data.get('fecha_cita', '')[:10])
-                            valores.append(float(h.get('valor_calculado', 0)))
+                            fechas.append(h.get('fecha_cita', '')[:10])
+                            valores.append(float(h.get('valor') or 0))
                             estados.append(h.get('estado', 'normal'))
                         
                         fig.add_trace(go.Scatter(
@@ -608,15 +608,14 @@ with tab2:
             # Gráfico 2: Heatmap NEDA-3
             st.markdown("#### 🔥 Heatmap NEDA-3")
             
-            historial_neda = db.obtener_historial_indicadores(paciente['id'], 'NEDA3')
+            historial_neda = series.get('NEDA3', [])
             
             if historial_neda:
                 data_neda = []
                 for h in historial_neda:
-                    cita_data = h.get('citas', {})
-                    cumple = h.get('valor_calculado', 0) == 1.0
+                    cumple = h.get('valor', 0) == 1.0
                     data_neda.append({
-                        'Fecha': cita_data.get('fecha_cita', '')[:10],
+                        'Fecha': h.get('fecha_cita', '')[:10],
                         'NEDA-3': 'Cumple' if cumple else 'No Cumple',
                         'Valor': 1 if cumple else 0
                     })
@@ -649,8 +648,7 @@ with tab2:
             # Tabla de resumen de última visita
             st.markdown("#### 📋 Resumen de Última Visita")
             
-            ultima_cita = max(citas_completadas, key=lambda x: x['fecha_cita'])
-            indicadores_ultima = db.obtener_indicadores_cita(ultima_cita['id'])
+            indicadores_ultima = dashboard.get('ultima_visita', {}).get('indicadores', [])
             
             if indicadores_ultima:
                 df_data = []
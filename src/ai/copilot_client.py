@@ -3,11 +3,13 @@ Cliente para Microsoft Copilot API
 """
 import os
 import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 from decimal import Decimal
 from loguru import logger
 from tenacity import retry, stop_after_attempt, wait_exponential
 from config import AIConfig
+from .http_pool import http_pool
+from .streaming import iter_chat_deltas
 
 class CopilotClient:
     """Cliente para interactuar con Microsoft Copilot API"""
@@ -75,30 +77,31 @@ class CopilotClient:
             
             logger.info("Enviando consulta a Microsoft Copilot API")
             
-            async with httpx.AsyncClient(timeout=AIConfig.API_TIMEOUT) as client:
-                response = await client.post(
-                    self.api_endpoint,
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Extraer respuesta
-                diagnostico = data['choices'][0]['message']['content']
-                
-                # Extraer nivel de confianza del texto
-                confianza = self._extract_confidence(diagnostico)
-                
-                logger.info(f"Respuesta recibida de Copilot (confianza: {confianza})")
-                
-                return {
-                    'diagnostico': diagnostico,
-                    'confianza': confianza,
-                    'tokens_used': data.get('usage', {}).get('total_tokens', 0)
-                }
-                
+            # Cliente persistente: reutiliza conexiones entre consultas y reintentos
+            client = http_pool.get('copilot', timeout=AIConfig.API_TIMEOUT)
+            response = await client.post(
+                self.api_endpoint,
+                headers=headers,
+                json=payload
+            )
+            response.raise_for_status()
+            
+            data = response.json()
+            
+            # Extraer respuesta
+            diagnostico = data['choices'][0]['message']['content']
+            
+            # Extraer nivel de confianza del texto
+            confianza = self._extract_confidence(diagnostico)
+            
+            logger.info(f"Respuesta recibida de Copilot (confianza: {confianza})")
+            
+            return {
+                'diagnostico': diagnostico,
+                'confianza': confianza,
+                'tokens_used': data.get('usage', {}).get('total_tokens', 0)
+            }
+            
         except httpx.HTTPStatusError as e:
             logger.error(f"Error HTTP en Copilot API: {e.response.status_code} - {e.response.text}")
             raise
@@ -106,6 +109,69 @@ class CopilotClient:
             logger.error(f"Error en consulta a Copilot: {e}")
             raise
     
+    async def stream(
+        self,
+        prompt: str,
+        temperature: float = AIConfig.COPILOT_TEMPERATURE,
+        max_tokens: int = AIConfig.COPILOT_MAX_TOKENS
+    ) -> AsyncIterator[str]:
+        """
+        Realiza una consulta a Microsoft Copilot API en modo streaming (SSE)
+        
+        A diferencia de `query` no se reintenta: los fragmentos ya entregados
+        no pueden deshacerse.
+        
+        Args:
+            prompt: Prompt médico a enviar
+            temperature: Temperatura para generación (0-1)
+            max_tokens: Máximo de tokens en respuesta
+            
+        Yields:
+            Fragmentos de texto del diagnóstico a medida que se generan
+        """
+        if not self.api_key:
+            raise ValueError("COPILOT_API_KEY no configurada")
+        
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream"
+        }
+        
+        payload = {
+            "model": AIConfig.COPILOT_MODEL,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "Eres un neurólogo experto en Esclerosis Múltiple con más de 20 años de experiencia."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+        
+        logger.info("Enviando consulta en streaming a Microsoft Copilot API")
+        
+        try:
+            client = http_pool.get('copilot', timeout=AIConfig.API_TIMEOUT)
+            async with client.stream("POST", self.api_endpoint, headers=headers, json=payload) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+                async for texto in iter_chat_deltas(response):
+                    yield texto
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Error HTTP en Copilot API (streaming): {e.response.status_code} - {e.response.text}")
+            raise
+        except Exception as e:
+            logger.error(f"Error en consulta en streaming a Copilot: {e}")
+            raise
+    
     def _extract_confidence(self, text: str) -> Decimal:
         """
         Extrae el nivel de confianza del texto de diagnóstico
@@ -140,6 +206,10 @@ class CopilotClient:
         logger.warning("No se pudo extraer nivel de confianza, usando valor por defecto: 7.0")
         return Decimal('7.0')
     
+    async def aclose(self) -> None:
+        """Cierra el cliente HTTP persistente asociado al event loop actual"""
+        await http_pool.aclose('copilot')
+    
     async def test_connection(self) -> bool:
         """
         Prueba la conexión con Copilot API
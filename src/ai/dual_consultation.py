@@ -2,14 +2,16 @@
 Orquestador de consulta dual a IAs (DeepSeek + Microsoft Copilot)
 """
 import asyncio
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable, AsyncIterator
 from decimal import Decimal
 from loguru import logger
 
 from .deepseek_client import DeepSeekClient
 from .copilot_client import CopilotClient
 from .prompt_builder import MedicalPromptBuilder
-from src.database import db
+from src.database import db, async_db
+from src.utils import ai_response_cache
+from config import AIConfig
 
 class DualAIConsultation:
     """Orquestador para consultas paralelas a ambas IAs"""
@@ -19,6 +21,60 @@ class DualAIConsultation:
         self.copilot = CopilotClient()
         self.prompt_builder = MedicalPromptBuilder()
     
+    @staticmethod
+    def _select_previous_visits(todas_citas: List[Dict[str, Any]], cita_id: str) -> List[Dict[str, Any]]:
+        """Citas completadas del paciente distintas de la actual"""
+        return [
+            c for c in todas_citas
+            if c['id'] != cita_id and c.get('estado') == 'completada'
+        ]
+    
+    @staticmethod
+    def _assemble_context(
+        paciente: Optional[Dict[str, Any]],
+        cita: Optional[Dict[str, Any]],
+        indicadores_actuales: List[Dict[str, Any]],
+        citas_previas: List[Dict[str, Any]],
+        indicadores_por_cita: Dict[str, List[Dict[str, Any]]],
+        paciente_id: str,
+        cita_id: str
+    ) -> Dict[str, Any]:
+        """
+        Combina los datos obtenidos de la base de datos en el contexto de consulta
+        
+        Returns:
+            Diccionario con todo el contexto necesario
+        """
+        if not paciente:
+            raise ValueError(f"Paciente {paciente_id} no encontrado")
+        if not cita:
+            raise ValueError(f"Cita {cita_id} no encontrada")
+        
+        # Obtener EDSS actual de los indicadores
+        edss_actual = paciente.get('edss_basal')  # Por defecto
+        for ind in indicadores_actuales:
+            if ind.get('indicador_tipo') == 'CDP12':
+                variables = ind.get('variables_entrada', {})
+                if 'edss_actual' in variables:
+                    edss_actual = Decimal(str(variables['edss_actual']))
+                    break
+        
+        historial_citas = [
+            {**c, 'indicadores': indicadores_por_cita.get(c['id'], [])}
+            for c in citas_previas
+        ]
+        
+        # Ordenar por fecha
+        historial_citas.sort(key=lambda x: x.get('fecha_cita', ''))
+        
+        return {
+            'paciente': paciente,
+            'cita': cita,
+            'indicadores_actuales': indicadores_actuales,
+            'edss_actual': edss_actual,
+            'historial_citas': historial_citas
+        }
+    
     def _prepare_context_sync(
         self,
         paciente_id: str,
@@ -37,51 +93,19 @@ class DualAIConsultation:
         try:
             logger.info(f"Preparando contexto para paciente {paciente_id}, cita {cita_id}")
             
-            # Obtener datos del paciente
             paciente = db.obtener_paciente(paciente_id)
-            if not paciente:
-                raise ValueError(f"Paciente {paciente_id} no encontrado")
-            
-            # Obtener cita actual
             cita = db.obtener_cita(cita_id)
-            if not cita:
-                raise ValueError(f"Cita {cita_id} no encontrada")
-            
-            # Obtener indicadores de la cita actual
             indicadores_actuales = db.obtener_indicadores_cita(cita_id)
-            
-            # Obtener EDSS actual de los indicadores
-            edss_actual = paciente.get('edss_basal')  # Por defecto
-            for ind in indicadores_actuales:
-                if ind.get('indicador_tipo') == 'CDP12':
-                    variables = ind.get('variables_entrada', {})
-                    if 'edss_actual' in variables:
-                        edss_actual = Decimal(str(variables['edss_actual']))
-                        break
-            
-            # Obtener historial de citas anteriores
             todas_citas = db.listar_citas_paciente(paciente_id)
             
-            # Filtrar citas anteriores a la actual y obtener sus indicadores
-            historial_citas = []
-            for c in todas_citas:
-                if c['id'] != cita_id and c.get('estado') == 'completada':
-                    indicadores = db.obtener_indicadores_cita(c['id'])
-                    historial_citas.append({
-                        **c,
-                        'indicadores': indicadores
-                    })
-            
-            # Ordenar por fecha
-            historial_citas.sort(key=lambda x: x.get('fecha_cita', ''))
-            
-            context = {
-                'paciente': paciente,
-                'cita': cita,
-                'indicadores_actuales': indicadores_actuales,
-                'edss_actual': edss_actual,
-                'historial_citas': historial_citas
-            }
+            # Indicadores de todas las citas anteriores en una sola consulta
+            citas_previas = self._select_previous_visits(todas_citas, cita_id)
+            indicadores_por_cita = db.obtener_indicadores_citas([c['id'] for c in citas_previas])
+            
+            context = self._assemble_context(
+                paciente, cita, indicadores_actuales, citas_previas,
+                indicadores_por_cita, paciente_id, cita_id
+            )
             
             logger.info("Contexto preparado exitosamente")
             return context
@@ -98,6 +122,10 @@ class DualAIConsultation:
         """
         Prepara el contexto completo para la consulta a las IAs
         
+        Las consultas independientes (paciente, cita, indicadores actuales y
+        citas del paciente) se lanzan en paralelo con el cliente asíncrono del
+        backend configurado (async_db: PostgREST o Postgres según DB_BACKEND).
+        
         Args:
             paciente_id: ID del paciente
             cita_id: ID de la cita actual
@@ -105,7 +133,32 @@ class DualAIConsultation:
         Returns:
             Diccionario con todo el contexto necesario
         """
-        return self._prepare_context_sync(paciente_id, cita_id)
+        try:
+            logger.info(f"Preparando contexto para paciente {paciente_id}, cita {cita_id}")
+            
+            paciente, cita, indicadores_actuales, todas_citas = await asyncio.gather(
+                async_db.obtener_paciente(paciente_id),
+                async_db.obtener_cita(cita_id),
+                async_db.obtener_indicadores_cita(cita_id),
+                async_db.listar_citas_paciente(paciente_id)
+            )
+            
+            citas_previas = self._select_previous_visits(todas_citas, cita_id)
+            indicadores_por_cita = await async_db.obtener_indicadores_citas(
+                [c['id'] for c in citas_previas]
+            )
+            
+            context = self._assemble_context(
+                paciente, cita, indicadores_actuales, citas_previas,
+                indicadores_por_cita, paciente_id, cita_id
+            )
+            
+            logger.info("Contexto preparado exitosamente")
+            return context
+            
+        except Exception as e:
+            logger.error(f"Error al preparar contexto: {e}")
+            raise
 
     def _build_prompt(self, paciente_id: str, cita_id: str) -> str:
         """
@@ -130,7 +183,8 @@ class DualAIConsultation:
     async def query_both_ais(
         self,
         paciente_id: str,
-        cita_id: str
+        cita_id: str,
+        usar_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Realiza consultas paralelas a ambas IAs
@@ -138,6 +192,8 @@ class DualAIConsultation:
         Args:
             paciente_id: ID del paciente
             cita_id: ID de la cita
+            usar_cache: Si es False se ignora la caché de respuestas y se consulta
+                siempre a las IAs (la respuesta nueva reemplaza a la cacheada)
             
         Returns:
             Diccionario con respuestas de ambas IAs
@@ -160,8 +216,8 @@ class DualAIConsultation:
             logger.info("Enviando consultas paralelas a DeepSeek y Copilot")
             
             results = await asyncio.gather(
-                self._query_deepseek_safe(prompt),
-                self._query_copilot_safe(prompt),
+                self._query_deepseek_safe(prompt, usar_cache),
+                self._query_copilot_safe(prompt, usar_cache),
                 return_exceptions=True
             )
             
@@ -183,10 +239,175 @@ class DualAIConsultation:
             logger.error(f"Error en consulta dual: {e}")
             raise
     
-    async def _query_deepseek_safe(self, prompt: str) -> Dict[str, Any]:
+    async def _query_with_cache(
+        self,
+        query: Callable[..., Awaitable[Dict[str, Any]]],
+        prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        usar_cache: bool
+    ) -> Dict[str, Any]:
+        """
+        Consulta una IA pasando por la caché de respuestas en disco
+        
+        Args:
+            query: Método `query` del cliente de IA
+            prompt: Prompt completo
+            model: Modelo usado (forma parte de la clave)
+            temperature: Temperatura de generación
+            max_tokens: Máximo de tokens en respuesta
+            usar_cache: Si es False no se lee de la caché
+            
+        Returns:
+            Respuesta de la IA (con 'desde_cache' = True si no hubo llamada)
+        """
+        clave = ai_response_cache.make_key(prompt, model, temperature, max_tokens=max_tokens)
+        cacheada = self._get_cached_response(clave, model, usar_cache)
+        if cacheada is not None:
+            return cacheada
+        
+        result = await query(prompt, temperature=temperature, max_tokens=max_tokens)
+        if AIConfig.RESPONSE_CACHE_ENABLED and not result.get('error'):
+            ai_response_cache.set(clave, result)
+        return result
+    
+    @staticmethod
+    def _get_cached_response(clave: str, model: str, usar_cache: bool) -> Optional[Dict[str, Any]]:
+        """Lee una respuesta de la caché restaurando los tipos (confianza como Decimal)"""
+        if not (AIConfig.RESPONSE_CACHE_ENABLED and usar_cache):
+            return None
+        cacheada = ai_response_cache.get(clave)
+        if cacheada is None:
+            return None
+        logger.info(f"Respuesta de {model} obtenida de la caché")
+        return {
+            **cacheada,
+            'confianza': Decimal(str(cacheada.get('confianza', '0'))),
+            'desde_cache': True
+        }
+    
+    async def stream_both_ais(
+        self,
+        paciente_id: str,
+        cita_id: str,
+        usar_cache: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Consulta ambas IAs en modo streaming y multiplexa sus fragmentos
+        
+        Args:
+            paciente_id: ID del paciente
+            cita_id: ID de la cita
+            usar_cache: Si es False se ignora la caché de respuestas
+            
+        Yields:
+            Eventos en orden de llegada:
+            - {'tipo': 'delta', 'ia': 'deepseek'|'copilot', 'texto': str}
+            - {'tipo': 'fin', 'ia': ..., 'resultado': respuesta procesada de esa IA}
+            - {'tipo': 'completado', 'resultado': mismo formato que query_both_ais}
+        """
+        logger.info("Iniciando consulta dual en streaming")
+        
+        context = await self.prepare_context(paciente_id, cita_id)
+        prompt = self.prompt_builder.build_complete_prompt(
+            paciente=context['paciente'],
+            indicadores_actuales=context['indicadores_actuales'],
+            edss_actual=context['edss_actual'],
+            historial_citas=context['historial_citas']
+        )
+        
+        cola: asyncio.Queue = asyncio.Queue()
+        tareas = [
+            asyncio.create_task(self._stream_to_queue(
+                'deepseek', self.deepseek, 'DeepSeek', AIConfig.DEEPSEEK_MODEL,
+                AIConfig.DEEPSEEK_TEMPERATURE, AIConfig.DEEPSEEK_MAX_TOKENS,
+                prompt, usar_cache, cola
+            )),
+            asyncio.create_task(self._stream_to_queue(
+                'copilot', self.copilot, 'Copilot', AIConfig.COPILOT_MODEL,
+                AIConfig.COPILOT_TEMPERATURE, AIConfig.COPILOT_MAX_TOKENS,
+                prompt, usar_cache, cola
+            ))
+        ]
+        
+        resultados: Dict[str, Dict[str, Any]] = {}
+        try:
+            while len(resultados) < len(tareas):
+                evento = await cola.get()
+                if evento['tipo'] == 'fin':
+                    resultados[evento['ia']] = evento['resultado']
+                yield evento
+        finally:
+            # Si el consumidor abandona la iteración, no dejar streams abiertos:
+            # cancelar y esperar a que cada tarea cierre su respuesta HTTP
+            for tarea in tareas:
+                if not tarea.done():
+                    tarea.cancel()
+            await asyncio.gather(*tareas, return_exceptions=True)
+        
+        logger.info("Consulta dual en streaming completada")
+        yield {
+            'tipo': 'completado',
+            'resultado': {
+                'cita_id': cita_id,
+                'paciente_id': paciente_id,
+                'deepseek': resultados['deepseek'],
+                'copilot': resultados['copilot'],
+                'prompt_usado': prompt
+            }
+        }
+    
+    async def _stream_to_queue(
+        self,
+        ia: str,
+        cliente: Any,
+        ia_name: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        prompt: str,
+        usar_cache: bool,
+        cola: asyncio.Queue
+    ) -> None:
+        """Vuelca el stream de una IA en la cola compartida, terminando siempre con un evento 'fin'"""
+        clave = ai_response_cache.make_key(prompt, model, temperature, max_tokens=max_tokens)
+        try:
+            resultado = self._get_cached_response(clave, model, usar_cache)
+            if resultado is not None:
+                await cola.put({'tipo': 'delta', 'ia': ia, 'texto': resultado.get('diagnostico', '')})
+            else:
+                partes = []
+                async for texto in cliente.stream(prompt, temperature=temperature, max_tokens=max_tokens):
+                    partes.append(texto)
+                    await cola.put({'tipo': 'delta', 'ia': ia, 'texto': texto})
+                
+                diagnostico = ''.join(partes)
+                resultado = {
+                    'diagnostico': diagnostico,
+                    'confianza': cliente._extract_confidence(diagnostico),
+                    'tokens_used': 0  # El streaming no informa uso de tokens
+                }
+                # Solo llega aquí un stream completo (si no, StreamIncompletoError); uno vacío tampoco se cachea
+                if AIConfig.RESPONSE_CACHE_ENABLED and diagnostico.strip():
+                    ai_response_cache.set(clave, resultado)
+        except Exception as e:
+            logger.error(f"Error en streaming de {ia_name}: {e}")
+            resultado = e
+        
+        await cola.put({'tipo': 'fin', 'ia': ia, 'resultado': self._process_result(resultado, ia_name)})
+    
+    async def _query_deepseek_safe(self, prompt: str, usar_cache: bool = True) -> Dict[str, Any]:
         """Consulta a DeepSeek con manejo de errores"""
         try:
-            return await self.deepseek.query(prompt)
+            return await self._query_with_cache(
+                self.deepseek.query,
+                prompt,
+                AIConfig.DEEPSEEK_MODEL,
+                AIConfig.DEEPSEEK_TEMPERATURE,
+                AIConfig.DEEPSEEK_MAX_TOKENS,
+                usar_cache
+            )
         except Exception as e:
             logger.error(f"Error en consulta a DeepSeek: {e}")
             return {
@@ -195,10 +416,17 @@ class DualAIConsultation:
                 'error': True
             }
     
-    async def _query_copilot_safe(self, prompt: str) -> Dict[str, Any]:
+    async def _query_copilot_safe(self, prompt: str, usar_cache: bool = True) -> Dict[str, Any]:
         """Consulta a Copilot con manejo de errores"""
         try:
-            return await self.copilot.query(prompt)
+            return await self._query_with_cache(
+                self.copilot.query,
+                prompt,
+                AIConfig.COPILOT_MODEL,
+                AIConfig.COPILOT_TEMPERATURE,
+                AIConfig.COPILOT_MAX_TOKENS,
+                usar_cache
+            )
         except Exception as e:
             logger.error(f"Error en consulta a Copilot: {e}")
             return {
@@ -223,6 +451,7 @@ class DualAIConsultation:
                 'diagnostico': result.get('diagnostico', 'Sin respuesta'),
                 'confianza': result.get('confianza', Decimal('0')),
                 'tokens_used': result.get('tokens_used', 0),
+                'desde_cache': result.get('desde_cache', False),
                 'error': False
             }
     
@@ -0,0 +1,86 @@
+"""
+Pool de clientes HTTP persistentes para las APIs de IA
+"""
+import asyncio
+import weakref
+from typing import Optional
+import httpx
+from loguru import logger
+from config import AIConfig
+from src.utils import register_shutdown
+
+def _http2_available() -> bool:
+    """HTTP/2 requiere el paquete opcional 'h2'"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class AsyncHTTPPool:
+    """
+    Clientes httpx.AsyncClient de larga duración con keep-alive
+    
+    Se mantiene un cliente por nombre (p.ej. 'deepseek', 'copilot') y por event
+    loop, ya que las conexiones de httpx quedan ligadas al loop que las creó.
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = AIConfig.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = AIConfig.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = AIConfig.HTTP_KEEPALIVE_EXPIRY,
+        http2: bool = AIConfig.HTTP2
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2 and _http2_available()
+        self._clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]' = \
+            weakref.WeakKeyDictionary()
+    
+    def get(self, name: str, timeout: float = AIConfig.API_TIMEOUT) -> httpx.AsyncClient:
+        """
+        Retorna el cliente compartido `name` para el event loop actual
+        
+        Args:
+            name: Identificador del cliente
+            timeout: Timeout de las peticiones (segundos)
+            
+        Returns:
+            Cliente httpx reutilizable
+        """
+        loop = asyncio.get_running_loop()
+        clients = self._clients.setdefault(loop, {})
+        client = clients.get(name)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=timeout,
+                limits=self.limits,
+                http2=self.http2
+            )
+            clients[name] = client
+            logger.info(f"Cliente HTTP persistente creado para {name} (http2={self.http2})")
+        return client
+    
+    async def aclose(self, name: Optional[str] = None) -> None:
+        """
+        Cierra los clientes del event loop actual
+        
+        Args:
+            name: Cliente a cerrar (None = todos)
+        """
+        loop = asyncio.get_running_loop()
+        clients = self._clients.get(loop, {})
+        names = [name] if name else list(clients.keys())
+        for n in names:
+            client = clients.pop(n, None)
+            if client is not None and not client.is_closed:
+                await client.aclose()
+                logger.info(f"Cliente HTTP persistente cerrado: {n}")
+
+# Pool global
+http_pool = AsyncHTTPPool()
+register_shutdown(http_pool.aclose)
@@ -0,0 +1,53 @@
+"""
+Utilidades para respuestas en streaming (Server-Sent Events) de APIs tipo OpenAI
+"""
+import json
+from typing import AsyncIterator
+import httpx
+from loguru import logger
+
+
+class StreamIncompletoError(RuntimeError):
+    """El stream se cerró sin '[DONE]' ni finish_reason: el texto recibido puede estar truncado"""
+
+async def iter_chat_deltas(response: httpx.Response) -> AsyncIterator[str]:
+    """
+    Itera los fragmentos de texto de una respuesta chat/completions con stream=True
+    
+    Args:
+        response: Respuesta httpx abierta en modo streaming
+        
+    Yields:
+        Fragmentos de texto (delta.content) en orden de llegada
+    
+    Raises:
+        StreamIncompletoError: Si la conexión termina antes del final de la respuesta
+    """
+    completo = False
+    async for line in response.aiter_lines():
+        line = line.strip()
+        if not line.startswith('data:'):
+            # Líneas vacías, comentarios (':') o campos 'event:' no aportan texto
+            continue
+        
+        data = line[len('data:'):].strip()
+        if data == '[DONE]':
+            completo = True
+            break
+        
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            logger.warning(f"Fragmento SSE no válido ignorado: {data[:100]}")
+            continue
+        
+        choices = chunk.get('choices') or []
+        if choices:
+            texto = (choices[0].get('delta') or {}).get('content')
+            if texto:
+                yield texto
+            if choices[0].get('finish_reason'):
+                completo = True
+    
+    if not completo:
+        raise StreamIncompletoError("El stream terminó antes de recibir la respuesta completa")
@@ -0,0 +1,20 @@
+"""
+Benchmarks de rendimiento de las rutas críticas
+
+Los módulos se importan bajo demanda (PEP 562): `python -m src.benchmarks.hot_paths`
+no debe encontrarlos ya cargados al importar el paquete.
+"""
+from importlib import import_module
+
+_EXPORTACIONES = {
+    'HotPathBenchmarks': '.hot_paths',
+    'MockAIServer': '.mock_server',
+}
+
+__all__ = list(_EXPORTACIONES)
+
+
+def __getattr__(nombre: str):
+    if nombre not in _EXPORTACIONES:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    return getattr(import_module(_EXPORTACIONES[nombre], __name__), nombre)
@@ -0,0 +1,597 @@
+"""
+Benchmarks de las rutas críticas de extremo a extremo
+
+Mide, con datos de la cohorte sintética (data/synthetic_cohort.py):
+    - calculadora_escalar / calculadora_lote: visitas/s de IndicatorCalculator
+      (como la página de indicadores) y de BatchIndicatorCalculator.calculate_all
+    - validacion_indicadores_fila / validacion_indicadores_lote: filas/s al
+      validar BenchmarkConfig.VALIDATION_ROWS indicadores con ClinicalIndicator,
+      fila a fila y con validar_lote (TypeAdapter de la lista completa);
+      serializacion_indicadores_lote mide el model_dump(mode='json') del lote
+    - prompt_historial_N: latencia de MedicalPromptBuilder.build_complete_prompt
+      según la longitud del historial de citas
+    - contexto_sync: latencia de DualAIConsultation._prepare_context_sync (sin
+      caché) contra la base configurada (SUPABASE_URL o DATABASE_URL según
+      DB_BACKEND); pensado para un PostgREST/Postgres local cargado con la
+      cohorte sintética
+    - consulta_dual: tiempo total de DualAIConsultation.query_both_ais contra
+      el servidor LLM simulado (src/benchmarks/mock_server.py, latencia
+      BenchmarkConfig.MOCK_LATENCY); nunca se mide contra las APIs reales
+    - pool_http_compartido / pool_http_cliente_nuevo: latencia de
+      BenchmarkConfig.HTTP_POOL_QUERIES llamadas a DeepSeekClient.query contra
+      el servidor simulado sin latencia, con el cliente de src/ai/http_pool.py
+      y con un httpx.AsyncClient nuevo en cada llamada
+
+Una prueba solo se omite cuando falta un recurso externo (RecursoNoDisponible):
+base de datos sin configurar, inaccesible, vacía o no local
+(BenchmarkConfig.LOCAL_DB_HOSTS, salvo con BENCHMARK_ALLOW_REMOTE_DB=1), o
+uvicorn sin instalar; cualquier otro error interrumpe la ejecución.
+
+Los resultados se comparan con la línea base de la máquina
+(BenchmarkConfig.BASELINE_PATH, se crea con --guardar-linea-base). El proceso
+termina con código 1 si alguna prueba supera su umbral de regresión y con
+código 2 si no hay línea base con la que comparar.
+
+Uso:
+    python -m src.benchmarks.hot_paths [--solo calculadora_lote prompt] [--guardar-linea-base]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timezone
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+import pandas as pd
+from loguru import logger
+
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from config import BenchmarkConfig
+from data.synthetic_cohort import SyntheticCohortGenerator
+from src.benchmarks.mock_server import MockAIServer, serve_in_background
+from src.calculators import BatchIndicatorCalculator, IndicatorCalculator
+from src.models import ClinicalIndicator, validar_lote
+from src.models.patient import adaptador_lista
+
+
+class RecursoNoDisponible(RuntimeError):
+    """Falta un recurso externo que necesita la prueba; la prueba se omite"""
+
+
+@contextmanager
+def requires(recurso: str, *errores: type) -> Iterator[None]:
+    """
+    Convierte en RecursoNoDisponible los errores esperados cuando falta un recurso
+    
+    Args:
+        recurso: Descripción del recurso para el mensaje
+        errores: Excepciones que indican que el recurso no está disponible
+    
+    Raises:
+        RecursoNoDisponible: Si el bloque lanza alguna de `errores`
+    """
+    try:
+        yield
+    except errores as e:
+        raise RecursoNoDisponible(f"{recurso}: {e}") from e
+
+
+def database_errors() -> tuple:
+    """Errores de conexión de los dos backends de base de datos"""
+    errores: List[type] = [httpx.TransportError]
+    try:
+        import psycopg2
+        errores.append(psycopg2.OperationalError)
+    except ImportError:
+        pass
+    return tuple(errores)
+
+
+def measure(
+    funcion: Callable[[], Any],
+    operaciones: int = 1,
+    repeticiones: int = BenchmarkConfig.REPEAT,
+    calentamiento: int = BenchmarkConfig.WARMUP
+) -> Dict[str, float]:
+    """
+    Ejecuta una función varias veces y resume sus tiempos
+    
+    Args:
+        funcion: Función a medir (sin argumentos)
+        operaciones: Operaciones que realiza cada ejecución (para ops/s)
+        repeticiones: Ejecuciones medidas
+        calentamiento: Ejecuciones previas descartadas
+    
+    Returns:
+        Mediana, p95 y mínimo en segundos por ejecución, y operaciones/s
+    """
+    for _ in range(calentamiento):
+        funcion()
+    
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    
+    tiempos.sort()
+    mediana = statistics.median(tiempos)
+    return {
+        'mediana_s': mediana,
+        'p95_s': tiempos[min(len(tiempos) - 1, int(round(0.95 * (len(tiempos) - 1))))],
+        'min_s': tiempos[0],
+        'operaciones': operaciones,
+        'ops_s': operaciones / mediana if mediana else 0.0,
+        'repeticiones': repeticiones
+    }
+
+
+def database_host() -> str:
+    """
+    Host de la base contra la que corren las pruebas de base de datos
+    
+    Returns:
+        Host de SUPABASE_URL o de DATABASE_URL según el backend de `db`
+        ('' si la conexión es por socket Unix)
+    """
+    # El paquete crea el cliente al importarse: falla sin credenciales (ValueError)
+    # o, con el backend postgres, si la base no responde
+    with requires("base de datos no disponible", ValueError, *database_errors()):
+        from src.database import db, PostgresClient
+    
+    if isinstance(db, PostgresClient):
+        from psycopg2.extensions import parse_dsn
+        from src.database.postgres_client import load_postgres_dsn
+        host = parse_dsn(load_postgres_dsn()).get('host', '')
+        return '' if host.startswith('/') else host
+    
+    from src.database.supabase_client import load_supabase_credentials
+    url, _ = load_supabase_credentials()
+    return urlparse(url).hostname or ''
+
+
+def require_local_database() -> None:
+    """
+    Impide medir contra una base remota (normalmente la de producción)
+    
+    Raises:
+        RecursoNoDisponible: Si la base no está configurada, o no es local y
+            no se ha definido BenchmarkConfig.ALLOW_REMOTE_DB_ENV=1
+    """
+    if os.getenv(BenchmarkConfig.ALLOW_REMOTE_DB_ENV) == '1':
+        return
+    host = database_host()
+    if host and host not in BenchmarkConfig.LOCAL_DB_HOSTS:
+        raise RecursoNoDisponible(
+            f"la base de datos ({host}) no es local; definir "
+            f"{BenchmarkConfig.ALLOW_REMOTE_DB_ENV}=1 para medir contra ella"
+        )
+
+
+def completed_appointments(limite: int) -> List[Dict[str, Any]]:
+    """
+    Muestra de citas completadas de la base local para las pruebas de base de datos
+    
+    Args:
+        limite: Número máximo de citas
+    
+    Returns:
+        Citas completadas
+    
+    Raises:
+        RecursoNoDisponible: Si la base no está configurada, no es local, no
+            responde o no tiene citas completadas
+    """
+    require_local_database()
+    from src.database import db
+    
+    with requires("base de datos inaccesible", *database_errors()):
+        citas = db.listar_citas_completadas(limite=limite)
+    if not citas:
+        raise RecursoNoDisponible("la base de datos no tiene citas completadas (cargar la cohorte sintética)")
+    return citas
+
+
+def serve_mock(app: MockAIServer):
+    """serve_in_background, con uvicorn ausente como recurso no disponible"""
+    with requires("servidor simulado", ImportError):
+        return serve_in_background(app)
+
+
+class _ClienteNuevoPorLlamada:
+    """
+    Sustituto de AsyncHTTPPool que abre un httpx.AsyncClient en cada llamada,
+    como antes del pool; aclose() cierra todos los abiertos
+    """
+    
+    def __init__(self):
+        self._abiertos: List[httpx.AsyncClient] = []
+    
+    def get(self, name: str, timeout: float) -> httpx.AsyncClient:
+        cliente = httpx.AsyncClient(timeout=timeout)
+        self._abiertos.append(cliente)
+        return cliente
+    
+    async def aclose(self, name: Optional[str] = None) -> None:
+        abiertos, self._abiertos = self._abiertos, []
+        for cliente in abiertos:
+            await cliente.aclose()
+
+
+class HotPathBenchmarks:
+    """
+    Conjunto de benchmarks de rutas críticas
+    """
+    
+    NOMBRES = [
+        'calculadora_escalar', 'calculadora_lote', 'validacion', 'prompt',
+        'contexto_sync', 'consulta_dual', 'pool_http'
+    ]
+    
+    def __init__(
+        self,
+        repeticiones: int = BenchmarkConfig.REPEAT,
+        calentamiento: int = BenchmarkConfig.WARMUP,
+        pacientes: int = BenchmarkConfig.COHORT_PATIENTS
+    ):
+        self.repeticiones = repeticiones
+        self.calentamiento = calentamiento
+        self.pacientes = pacientes
+        self._cohorte: Optional[Dict[str, List[Dict[str, Any]]]] = None
+    
+    def _measure(self, funcion: Callable[[], Any], operaciones: int = 1) -> Dict[str, float]:
+        return measure(funcion, operaciones, self.repeticiones, self.calentamiento)
+    
+    # =====================================================
+    # DATOS DE ENTRADA
+    # =====================================================
+    
+    @property
+    def cohorte(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Cohorte sintética (semilla fija) compartida por todas las pruebas"""
+        if self._cohorte is None:
+            generador = SyntheticCohortGenerator(fecha_referencia=date.today(), validate=False)
+            self._cohorte = generador.generate_chunk(0, self.pacientes)
+        return self._cohorte
+    
+    def _visits(self) -> pd.DataFrame:
+        """Variables de entrada de calculate_all para todas las citas completadas de la cohorte"""
+        pacientes = {p['id']: p for p in self.cohorte['pacientes']}
+        entradas: Dict[str, Dict[str, Any]] = {}
+        for fila in self.cohorte['indicadores_cita']:
+            entradas.setdefault(fila['cita_id'], {}).update(fila['variables_entrada'])
+        
+        filas = []
+        for cita in self.cohorte['citas']:
+            variables = entradas.get(cita['id'])
+            if variables is None:
+                continue
+            filas.append({
+                'cita_id': cita['id'],
+                'recaidas': variables['recaidas'],
+                'fecha_inicio': pacientes[cita['paciente_id']]['fecha_diagnostico'].isoformat(),
+                'fecha_fin': cita['fecha_cita'].isoformat(),
+                'lesiones_t1_gd': variables['lesiones_t1_gd'],
+                'lesiones_t2_actuales': variables['lesiones_t2_actuales'],
+                'lesiones_t2_previas': variables['lesiones_t2_previas'],
+                'edss_basal': variables['edss_basal'],
+                'edss_actual': variables['edss_actual']
+            })
+        return pd.DataFrame(filas).set_index('cita_id')
+    
+    def _history(self, longitud: int) -> List[Dict[str, Any]]:
+        """Historial de `longitud` citas con sus indicadores (formato de _assemble_context)"""
+        indicadores: Dict[str, List[Dict[str, Any]]] = {}
+        for fila in self.cohorte['indicadores_cita']:
+            indicadores.setdefault(fila['cita_id'], []).append(fila)
+        citas = [c for c in self.cohorte['citas'] if c['id'] in indicadores]
+        
+        return [
+            {
+                **citas[i % len(citas)],
+                'numero_visita': i + 1,
+                'fecha_cita': citas[i % len(citas)]['fecha_cita'].isoformat(),
+                'indicadores': indicadores[citas[i % len(citas)]['id']]
+            }
+            for i in range(longitud)
+        ]
+    
+    # =====================================================
+    # PRUEBAS
+    # =====================================================
+    
+    def bench_calculadora_escalar(self) -> Dict[str, Dict[str, float]]:
+        """Cinco indicadores por visita con IndicatorCalculator, como la página de indicadores"""
+        visitas = self._visits()
+        filas = [
+            (
+                int(v.recaidas),
+                datetime.fromisoformat(v.fecha_inicio).replace(tzinfo=timezone.utc),
+                datetime.fromisoformat(v.fecha_fin),
+                int(v.lesiones_t1_gd),
+                int(v.lesiones_t2_actuales),
+                int(v.lesiones_t2_previas),
+                Decimal(str(v.edss_basal)),
+                Decimal(str(v.edss_actual))
+            )
+            for v in visitas.itertuples(index=False)
+        ]
+        
+        def calcular():
+            for recaidas, inicio, fin, t1, t2, t2_prev, basal, actual in filas:
+                IndicatorCalculator.calculate_arr(recaidas, inicio, fin)
+                IndicatorCalculator.classify_t1_gd(t1)
+                t2_diff, _, _ = IndicatorCalculator.calculate_t2_difference(t2, t2_prev)
+                _, progresion, _, _ = IndicatorCalculator.evaluate_cdp12(basal, actual)
+                IndicatorCalculator.evaluate_neda3(recaidas == 0, t1 == 0 and t2_diff <= 0, not progresion)
+        
+        return {'calculadora_escalar': self._measure(calcular, len(filas))}
+    
+    def bench_calculadora_lote(self) -> Dict[str, Dict[str, float]]:
+        """Cinco indicadores para toda la cohorte con BatchIndicatorCalculator.calculate_all"""
+        visitas = self._visits()
+        return {
+            'calculadora_lote': self._measure(lambda: BatchIndicatorCalculator.calculate_all(visitas), len(visitas))
+        }
+    
+    def bench_validacion(self) -> Dict[str, Dict[str, float]]:
+        """Validación de filas de indicadores_cita con ClinicalIndicator, fila a fila y por lotes"""
+        indicadores = self.cohorte['indicadores_cita']
+        filas = [indicadores[i % len(indicadores)] for i in range(BenchmarkConfig.VALIDATION_ROWS)]
+        validados = validar_lote(ClinicalIndicator, filas)
+        adaptador = adaptador_lista(ClinicalIndicator)
+        
+        return {
+            'validacion_indicadores_fila': self._measure(
+                lambda: [ClinicalIndicator(**fila) for fila in filas], len(filas)
+            ),
+            'validacion_indicadores_lote': self._measure(
+                lambda: validar_lote(ClinicalIndicator, filas), len(filas)
+            ),
+            'serializacion_indicadores_lote': self._measure(
+                lambda: adaptador.dump_python(validados, mode='json'), len(filas)
+            )
+        }
+    
+    def bench_prompt(self) -> Dict[str, Dict[str, float]]:
+        """Latencia de build_complete_prompt para cada longitud de historial"""
+        # Importaciones diferidas en las pruebas de src.ai: el paquete crea el
+        # cliente de base de datos al importarse y necesita una base disponible
+        with requires("base de datos no disponible", ValueError, *database_errors()):
+            from src.ai import MedicalPromptBuilder
+        
+        paciente = dict(self.cohorte['pacientes'][0])
+        paciente['fecha_diagnostico'] = paciente['fecha_diagnostico'].isoformat()
+        indicadores = [
+            fila for fila in self.cohorte['indicadores_cita']
+            if fila['cita_id'] == self.cohorte['indicadores_cita'][0]['cita_id']
+        ]
+        
+        resultados = {}
+        for longitud in BenchmarkConfig.HISTORY_LENGTHS:
+            historial = self._history(longitud)
+            resultados[f'prompt_historial_{longitud}'] = self._measure(
+                lambda: MedicalPromptBuilder.build_complete_prompt(
+                    paciente=paciente,
+                    indicadores_actuales=indicadores,
+                    edss_actual=Decimal(str(paciente['edss_basal'])),
+                    historial_citas=historial
+                )
+            )
+        return resultados
+    
+    def bench_contexto_sync(self) -> Dict[str, Dict[str, float]]:
+        """Latencia sin caché de _prepare_context_sync para una muestra de citas completadas"""
+        citas = completed_appointments(BenchmarkConfig.CONTEXT_SAMPLES)
+        from src.ai import DualAIConsultation
+        from src.database import db
+        
+        consulta = DualAIConsultation()
+        
+        def preparar():
+            for cita in citas:
+                db.limpiar_cache()
+                consulta._prepare_context_sync(cita['paciente_id'], cita['id'])
+        
+        return {'contexto_sync': self._measure(preparar, len(citas))}
+    
+    def bench_consulta_dual(self) -> Dict[str, Dict[str, float]]:
+        """Tiempo total de query_both_ais (sin caché de respuestas) contra el servidor LLM simulado"""
+        citas = completed_appointments(BenchmarkConfig.DUAL_SAMPLES)
+        from src.ai import DualAIConsultation
+        from src.utils import run_async
+        
+        servidor, hilo, url = serve_mock(MockAIServer())
+        try:
+            consulta = DualAIConsultation()
+            for cliente in (consulta.deepseek, consulta.copilot):
+                cliente.api_key = 'mock'
+            consulta.deepseek.api_url = f"{url}/v1/chat/completions"
+            consulta.copilot.api_endpoint = f"{url}/v1/chat/completions"
+            
+            def consultar():
+                for cita in citas:
+                    run_async(consulta.query_both_ais(cita['paciente_id'], cita['id'], usar_cache=False))
+            
+            return {'consulta_dual': self._measure(consultar, len(citas))}
+        finally:
+            servidor.should_exit = True
+            hilo.join()
+    
+    def bench_pool_http(self) -> Dict[str, Dict[str, float]]:
+        """DeepSeekClient.query con el pool de clientes HTTP y con un cliente nuevo por llamada"""
+        with requires("base de datos no disponible", ValueError, *database_errors()):
+            import src.ai.deepseek_client as modulo_deepseek
+            from src.ai import DeepSeekClient
+        from src.utils import run_async
+        
+        servidor, hilo, url = serve_mock(MockAIServer(latencia=0.0, variacion=0.0))
+        try:
+            cliente = DeepSeekClient()
+            cliente.api_key = 'mock'
+            cliente.api_url = f"{url}/v1/chat/completions"
+            consultas = BenchmarkConfig.HTTP_POOL_QUERIES
+            
+            def consultar():
+                for _ in range(consultas):
+                    run_async(cliente.query("benchmark"))
+            
+            resultados = {'pool_http_compartido': self._measure(consultar, consultas)}
+            
+            # El cierre de los clientes forma parte del coste de no reutilizarlos
+            sin_pool = _ClienteNuevoPorLlamada()
+            
+            def consultar_sin_pool():
+                consultar()
+                run_async(sin_pool.aclose())
+            
+            pool = modulo_deepseek.http_pool
+            modulo_deepseek.http_pool = sin_pool
+            try:
+                resultados['pool_http_cliente_nuevo'] = self._measure(consultar_sin_pool, consultas)
+            finally:
+                modulo_deepseek.http_pool = pool
+                run_async(sin_pool.aclose())
+            return resultados
+        finally:
+            servidor.should_exit = True
+            hilo.join()
+    
+    # =====================================================
+    # EJECUCIÓN
+    # =====================================================
+    
+    def run(self, nombres: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Ejecuta las pruebas seleccionadas (todas por defecto)
+        
+        Las pruebas que lanzan RecursoNoDisponible se omiten con un aviso;
+        cualquier otro error se propaga
+        
+        Returns:
+            Resultados por nombre de medición
+        """
+        resultados: Dict[str, Dict[str, float]] = {}
+        for nombre in nombres or self.NOMBRES:
+            try:
+                resultados.update(getattr(self, f'bench_{nombre}')())
+            except RecursoNoDisponible as e:
+                logger.warning(f"Benchmark {nombre} omitido: {e}")
+        return resultados
+
+
+# =====================================================
+# LÍNEA BASE
+# =====================================================
+
+def load_baseline(ruta: str = BenchmarkConfig.BASELINE_PATH) -> Dict[str, Dict[str, float]]:
+    """Lee la línea base guardada (vacía si no existe)"""
+    ruta = Path(ruta)
+    if not ruta.exists():
+        return {}
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f).get('resultados', {})
+
+
+def save_baseline(resultados: Dict[str, Dict[str, float]], ruta: str = BenchmarkConfig.BASELINE_PATH) -> None:
+    """Guarda los resultados como línea base (conserva las mediciones no repetidas)"""
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    combinados = {**load_baseline(ruta), **resultados}
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({'actualizado': datetime.now().isoformat(), 'resultados': combinados}, f, indent=2)
+
+
+def find_regressions(
+    resultados: Dict[str, Dict[str, float]],
+    linea_base: Dict[str, Dict[str, float]],
+    umbral: Optional[float] = None
+) -> Dict[str, float]:
+    """
+    Compara las medianas con la línea base
+    
+    Args:
+        resultados: Mediciones actuales
+        linea_base: Mediciones de referencia
+        umbral: Umbral único para todas las pruebas (None = BenchmarkConfig)
+    
+    Returns:
+        Variación relativa de cada prueba que supera su umbral
+    """
+    regresiones = {}
+    for nombre, actual in resultados.items():
+        base = linea_base.get(nombre)
+        if not base or not base.get('mediana_s'):
+            continue
+        limite = umbral if umbral is not None else BenchmarkConfig.REGRESSION_THRESHOLDS.get(
+            nombre, BenchmarkConfig.REGRESSION_THRESHOLD
+        )
+        variacion = actual['mediana_s'] / base['mediana_s'] - 1
+        if variacion > limite:
+            regresiones[nombre] = variacion
+    return regresiones
+
+
+def format_report(resultados: Dict[str, Dict[str, float]], linea_base: Dict[str, Dict[str, float]]) -> str:
+    """Tabla de resultados con la variación respecto a la línea base"""
+    ancho = max([24] + [len(nombre) for nombre in resultados])
+    lineas = [f"{'prueba':<{ancho}} {'mediana ms':>12} {'p95 ms':>10} {'ops/s':>12} {'vs base':>9}"]
+    for nombre, r in resultados.items():
+        base = linea_base.get(nombre, {}).get('mediana_s')
+        variacion = f"{(r['mediana_s'] / base - 1) * 100:+.1f}%" if base else '-'
+        lineas.append(
+            f"{nombre:<{ancho}} {r['mediana_s'] * 1000:>12.3f} {r['p95_s'] * 1000:>10.3f} "
+            f"{r['ops_s']:>12.1f} {variacion:>9}"
+        )
+    return "\n".join(lineas)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmarks de las rutas críticas")
+    parser.add_argument('--solo', nargs='+', choices=HotPathBenchmarks.NOMBRES, help="Pruebas a ejecutar")
+    parser.add_argument('--repeticiones', type=int, default=BenchmarkConfig.REPEAT, help="Ejecuciones medidas por prueba")
+    parser.add_argument('--pacientes', type=int, default=BenchmarkConfig.COHORT_PATIENTS, help="Pacientes de la cohorte sintética")
+    parser.add_argument('--linea-base', default=BenchmarkConfig.BASELINE_PATH, help="Fichero de línea base")
+    parser.add_argument('--guardar-linea-base', action='store_true', help="Guardar los resultados como nueva línea base")
+    parser.add_argument('--umbral', type=float, default=None, help="Umbral de regresión único (0.25 = 25%% más lento)")
+    args = parser.parse_args(argv)
+    
+    logger.remove()
+    logger.add(sys.stderr, level=BenchmarkConfig.LOG_LEVEL)
+    
+    benchmarks = HotPathBenchmarks(repeticiones=args.repeticiones, pacientes=args.pacientes)
+    resultados = benchmarks.run(args.solo)
+    linea_base = load_baseline(args.linea_base)
+    
+    print(format_report(resultados, linea_base))
+    
+    if args.guardar_linea_base:
+        save_baseline(resultados, args.linea_base)
+        print(f"\nLínea base guardada en {args.linea_base}")
+        return 0
+    
+    if not linea_base:
+        logger.error(
+            f"No hay línea base en {args.linea_base}: no se pueden comprobar regresiones "
+            f"(crearla con --guardar-linea-base)"
+        )
+        return 2
+    
+    regresiones = find_regressions(resultados, linea_base, args.umbral)
+    for nombre, variacion in regresiones.items():
+        logger.error(f"Regresión en {nombre}: {variacion * 100:+.1f}% respecto a la línea base")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
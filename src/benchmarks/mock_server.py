@@ -0,0 +1,365 @@
+"""
+Servidor simulado (ASGI) de las APIs de IA y de los webhooks de n8n
+
+Permite probar carga, reintentos y timeouts sin servicios externos:
+    - POST .../chat/completions: API tipo OpenAI usada por DeepSeekClient y
+      CopilotClient, con y sin streaming (SSE)
+    - POST /webhook/ai-consultation: flujo de n8n de N8NClient.consultar_ias
+    - POST /webhook/critical-alert: flujo de n8n de N8NClient.enviar_alerta_critica
+    - GET/POST /_mock/config: consultar o cambiar latencia y errores en caliente
+    - GET /_mock/stats, POST /_mock/reset: peticiones por ruta y código de estado
+
+Las respuestas son deterministas (dependen del prompt) y la latencia, los
+errores y los timeouts se inyectan según BenchmarkConfig.MOCK_* o los
+argumentos de línea de comandos. Es una aplicación ASGI sin dependencias:
+se sirve con uvicorn o se usa en proceso con httpx.ASGITransport.
+
+Uso:
+    python -m src.benchmarks.mock_server [--puerto 8099] [--latencia 0.5] [--tasa-error 0.1]
+
+    DEEPSEEK_API_URL=http://127.0.0.1:8099/v1/chat/completions
+    COPILOT_API_ENDPOINT=http://127.0.0.1:8099/v1/chat/completions
+    N8N_AI_WEBHOOK=http://127.0.0.1:8099/webhook/ai-consultation
+    N8N_ALERT_WEBHOOK=http://127.0.0.1:8099/webhook/critical-alert
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from config import BenchmarkConfig
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+DIAGNOSTICOS = [
+    (
+        "Paciente con Esclerosis Múltiple sin evidencia de actividad de enfermedad (NEDA-3). "
+        "Los indicadores clínicos y de resonancia se mantienen estables respecto a visitas previas. "
+        "Se recomienda mantener el tratamiento modificador actual y control clínico y radiológico en 6 meses."
+    ),
+    (
+        "Se observa actividad inflamatoria subclínica con nuevas lesiones en T2 y captación de gadolinio. "
+        "La respuesta al tratamiento actual es subóptima. Se recomienda valorar escalada a una terapia "
+        "de alta eficacia y repetir la resonancia en 3 meses."
+    ),
+    (
+        "Progresión de discapacidad confirmada a 12 semanas (CDP-12) con EDSS en aumento. "
+        "Se sugiere revisar el plan terapéutico, descartar pseudorrecaída y derivar a rehabilitación "
+        "neurológica."
+    )
+]
+
+
+class MockAIServer:
+    """
+    Aplicación ASGI que emula las APIs de IA y los webhooks de n8n
+    """
+    
+    def __init__(
+        self,
+        latencia: float = BenchmarkConfig.MOCK_LATENCY,
+        variacion: float = BenchmarkConfig.MOCK_JITTER,
+        latencia_token: float = BenchmarkConfig.MOCK_TOKEN_LATENCY,
+        tasa_error: float = BenchmarkConfig.MOCK_ERROR_RATE,
+        codigo_error: int = BenchmarkConfig.MOCK_ERROR_STATUS,
+        tasa_timeout: float = BenchmarkConfig.MOCK_TIMEOUT_RATE,
+        retraso_timeout: float = BenchmarkConfig.MOCK_TIMEOUT_DELAY,
+        semilla: int = BenchmarkConfig.MOCK_SEED
+    ):
+        self.config = {
+            'latencia': latencia,
+            'variacion': variacion,
+            'latencia_token': latencia_token,
+            'tasa_error': tasa_error,
+            'codigo_error': codigo_error,
+            'tasa_timeout': tasa_timeout,
+            'retraso_timeout': retraso_timeout
+        }
+        self._rng = random.Random(semilla)
+        self.stats: Counter = Counter()
+    
+    # =====================================================
+    # ASGI
+    # =====================================================
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'lifespan':
+            while True:
+                mensaje = await receive()
+                if mensaje['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif mensaje['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+        
+        metodo, ruta = scope['method'], scope['path'].rstrip('/')
+        cuerpo = await self._read_body(receive)
+        
+        try:
+            datos = json.loads(cuerpo) if cuerpo else {}
+        except ValueError:
+            await self._respond(send, ruta, 400, {'error': 'JSON no válido'})
+            return
+        
+        if ruta == '/_mock/config':
+            if metodo == 'POST':
+                self.config.update({k: v for k, v in datos.items() if k in self.config})
+                logger.info(f"Configuración del servidor simulado: {self.config}")
+            await self._respond(send, ruta, 200, self.config)
+        elif ruta == '/_mock/stats':
+            await self._respond(send, ruta, 200, self.stats_summary())
+        elif ruta == '/_mock/reset' and metodo == 'POST':
+            self.stats.clear()
+            await self._respond(send, ruta, 200, {'status': 'ok'})
+        elif metodo != 'POST':
+            await self._respond(send, ruta, 405, {'error': f"Método {metodo} no permitido"})
+        elif ruta.endswith('/chat/completions'):
+            await self._chat_completions(send, ruta, datos)
+        elif ruta == '/webhook/ai-consultation':
+            await self._n8n_consultation(send, ruta, datos)
+        elif ruta == '/webhook/critical-alert':
+            await self._n8n_alert(send, ruta, datos)
+        else:
+            await self._respond(send, ruta, 404, {'error': f"Ruta no encontrada: {ruta}"})
+    
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        cuerpo = b''
+        while True:
+            mensaje = await receive()
+            cuerpo += mensaje.get('body', b'')
+            if not mensaje.get('more_body'):
+                return cuerpo
+    
+    async def _respond(self, send: Send, ruta: str, estado: int, datos: Any) -> None:
+        """Envía una respuesta JSON y la contabiliza"""
+        self.stats[(ruta, estado)] += 1
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': estado,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(cuerpo)).encode())]
+        })
+        await send({'type': 'http.response.body', 'body': cuerpo})
+    
+    def stats_summary(self) -> Dict[str, Dict[str, int]]:
+        """Peticiones atendidas por ruta y código de estado"""
+        resumen: Dict[str, Dict[str, int]] = {}
+        for (ruta, estado), n in sorted(self.stats.items()):
+            resumen.setdefault(ruta, {})[str(estado)] = n
+        return resumen
+    
+    # =====================================================
+    # LATENCIA Y ERRORES
+    # =====================================================
+    
+    async def _inject(self, send: Send, ruta: str) -> bool:
+        """
+        Aplica la latencia configurada y, según las tasas, un timeout o un error
+        
+        Returns:
+            True si ya se respondió con un error (la ruta no debe continuar)
+        """
+        c = self.config
+        azar = self._rng.random()
+        
+        if azar < c['tasa_timeout']:
+            await asyncio.sleep(c['retraso_timeout'])
+        else:
+            await asyncio.sleep(max(0.0, c['latencia'] + self._rng.uniform(-c['variacion'], c['variacion'])))
+        
+        if c['tasa_timeout'] <= azar < c['tasa_timeout'] + c['tasa_error']:
+            await self._respond(send, ruta, int(c['codigo_error']), {
+                'error': {'message': 'Error simulado', 'type': 'server_error'}
+            })
+            return True
+        return False
+    
+    # =====================================================
+    # RESPUESTAS
+    # =====================================================
+    
+    @staticmethod
+    def _diagnosis(prompt: str, modelo: str) -> str:
+        """Diagnóstico determinista para un prompt y modelo"""
+        resumen = hashlib.sha256(f"{modelo}\n{prompt}".encode('utf-8')).digest()
+        texto = DIAGNOSTICOS[resumen[0] % len(DIAGNOSTICOS)]
+        confianza = 6 + resumen[1] % 4
+        return f"{texto}\n\nNivel de confianza: {confianza}/10"
+    
+    async def _chat_completions(self, send: Send, ruta: str, datos: Dict[str, Any]) -> None:
+        mensajes = datos.get('messages') or []
+        if not mensajes:
+            await self._respond(send, ruta, 400, {'error': {'message': "Falta 'messages'"}})
+            return
+        if await self._inject(send, ruta):
+            return
+        
+        modelo = datos.get('model', 'mock')
+        prompt = mensajes[-1].get('content', '')
+        texto = self._diagnosis(prompt, modelo)
+        max_tokens = datos.get('max_tokens')
+        palabras = texto.split(' ')
+        if max_tokens:
+            palabras = palabras[:max_tokens]
+            texto = ' '.join(palabras)
+        
+        identificador = f"chatcmpl-mock-{hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]}"
+        creado = int(time.time())
+        
+        if not datos.get('stream'):
+            await self._respond(send, ruta, 200, {
+                'id': identificador,
+                'object': 'chat.completion',
+                'created': creado,
+                'model': modelo,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': texto},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {
+                    'prompt_tokens': len(prompt.split()),
+                    'completion_tokens': len(palabras),
+                    'total_tokens': len(prompt.split()) + len(palabras)
+                }
+            })
+            return
+        
+        self.stats[(ruta, 200)] += 1
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache')]
+        })
+        for i, palabra in enumerate(palabras):
+            fragmento = {
+                'id': identificador,
+                'object': 'chat.completion.chunk',
+                'created': creado,
+                'model': modelo,
+                'choices': [{'index': 0, 'delta': {'content': palabra if i == 0 else f" {palabra}"}, 'finish_reason': None}]
+            }
+            await send({
+                'type': 'http.response.body',
+                'body': f"data: {json.dumps(fragmento, ensure_ascii=False)}\n\n".encode('utf-8'),
+                'more_body': True
+            })
+            await asyncio.sleep(self.config['latencia_token'])
+        await send({'type': 'http.response.body', 'body': b"data: [DONE]\n\n", 'more_body': False})
+    
+    async def _n8n_consultation(self, send: Send, ruta: str, datos: Dict[str, Any]) -> None:
+        prompt = datos.get('prompt')
+        if not prompt:
+            await self._respond(send, ruta, 400, {'error': "Falta 'prompt'"})
+            return
+        if await self._inject(send, ruta):
+            return
+        
+        await self._respond(send, ruta, 200, {
+            'deepseek_response': self._diagnosis(prompt, 'deepseek'),
+            'copilot_response': self._diagnosis(prompt, 'copilot')
+        })
+    
+    async def _n8n_alert(self, send: Send, ruta: str, datos: Dict[str, Any]) -> None:
+        faltantes = [campo for campo in ('indicador', 'paciente', 'cita') if campo not in datos]
+        if faltantes:
+            await self._respond(send, ruta, 422, {'error': f"Faltan campos: {', '.join(faltantes)}"})
+            return
+        if await self._inject(send, ruta):
+            return
+        
+        await self._respond(send, ruta, 200, {'status': 'success', 'message': 'Alerta enviada correctamente'})
+
+
+def serve_in_background(
+    app: MockAIServer,
+    host: str = BenchmarkConfig.MOCK_HOST,
+    port: int = 0
+) -> Tuple[Any, threading.Thread, str]:
+    """
+    Sirve la aplicación con uvicorn en un hilo de fondo
+    
+    Args:
+        app: Aplicación a servir
+        host: Dirección de escucha
+        port: Puerto (0 = uno libre)
+    
+    Returns:
+        Tupla (servidor uvicorn, hilo, URL base); para detenerlo:
+        servidor.should_exit = True y hilo.join()
+    """
+    try:
+        import uvicorn
+    except ImportError:
+        raise ImportError("El servidor simulado requiere uvicorn (pip install uvicorn)")
+    
+    servidor = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level='warning', lifespan='on'))
+    hilo = threading.Thread(target=servidor.run, name="mock-ai-server", daemon=True)
+    hilo.start()
+    
+    limite = time.monotonic() + 10
+    while not servidor.started:
+        if not hilo.is_alive() or time.monotonic() > limite:
+            raise RuntimeError("No se pudo iniciar el servidor simulado")
+        time.sleep(0.01)
+    
+    puerto = servidor.servers[0].sockets[0].getsockname()[1]
+    return servidor, hilo, f"http://{host}:{puerto}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Servidor simulado de APIs de IA y webhooks de n8n")
+    parser.add_argument('--host', default=BenchmarkConfig.MOCK_HOST, help="Dirección de escucha")
+    parser.add_argument('--puerto', type=int, default=BenchmarkConfig.MOCK_PORT, help="Puerto")
+    parser.add_argument('--latencia', type=float, default=BenchmarkConfig.MOCK_LATENCY, help="Segundos por respuesta")
+    parser.add_argument('--variacion', type=float, default=BenchmarkConfig.MOCK_JITTER, help="Variación aleatoria (± segundos)")
+    parser.add_argument('--latencia-token', type=float, default=BenchmarkConfig.MOCK_TOKEN_LATENCY, help="Segundos entre fragmentos en streaming")
+    parser.add_argument('--tasa-error', type=float, default=BenchmarkConfig.MOCK_ERROR_RATE, help="Fracción de respuestas con error")
+    parser.add_argument('--codigo-error', type=int, default=BenchmarkConfig.MOCK_ERROR_STATUS, help="Código HTTP de los errores")
+    parser.add_argument('--tasa-timeout', type=float, default=BenchmarkConfig.MOCK_TIMEOUT_RATE, help="Fracción de respuestas que exceden el timeout")
+    parser.add_argument('--retraso-timeout', type=float, default=BenchmarkConfig.MOCK_TIMEOUT_DELAY, help="Segundos de espera de esas respuestas")
+    parser.add_argument('--semilla', type=int, default=BenchmarkConfig.MOCK_SEED, help="Semilla de la inyección de errores")
+    args = parser.parse_args(argv)
+    
+    app = MockAIServer(
+        latencia=args.latencia,
+        variacion=args.variacion,
+        latencia_token=args.latencia_token,
+        tasa_error=args.tasa_error,
+        codigo_error=args.codigo_error,
+        tasa_timeout=args.tasa_timeout,
+        retraso_timeout=args.retraso_timeout,
+        semilla=args.semilla
+    )
+    
+    try:
+        import uvicorn
+    except ImportError:
+        logger.error("El servidor simulado requiere uvicorn (pip install uvicorn)")
+        return 1
+    
+    logger.info(f"Servidor simulado en http://{args.host}:{args.puerto} ({app.config})")
+    uvicorn.run(app, host=args.host, port=args.puerto, log_level='warning')
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
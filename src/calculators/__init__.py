@@ -1,4 +1,4 @@
 """Archivo __init__.py para el paquete calculators"""
-from .clinical_indicators import IndicatorCalculator
+from .clinical_indicators import IndicatorCalculator, BatchIndicatorCalculator
 
-__all__ = ['IndicatorCalculator']
+__all__ = ['IndicatorCalculator', 'BatchIndicatorCalculator']
@@ -1,9 +1,12 @@
 """
 Motor de cálculo de indicadores clínicos
 """
-from typing import Tuple, Dict, Any
+import itertools
+from typing import Tuple, Dict, Any, List, Sequence
 from decimal import Decimal
 from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
 from config import (
     IndicatorRanges,
     EstadoIndicador,
@@ -195,33 +198,11 @@ class IndicatorCalculator:
             Tupla (cumple_neda3, estado, justificacion, detalles)
         """
         try:
-            cumple = sin_recaidas and sin_lesiones_rm and sin_progresion_edss
-            
-            detalles = {
-                'sin_recaidas': sin_recaidas,
-                'sin_lesiones_rm': sin_lesiones_rm,
-                'sin_progresion_edss': sin_progresion_edss
-            }
-            
-            if cumple:
-                estado = EstadoIndicador.NORMAL
-                justificacion = JustificationMessages.NEDA3['normal']
-            else:
-                estado = EstadoIndicador.CRITICO
-                
-                # Construir detalles de criterios no cumplidos
-                criterios_no_cumplidos = []
-                if not sin_recaidas:
-                    criterios_no_cumplidos.append("(1) Presencia de recaídas")
-                if not sin_lesiones_rm:
-                    criterios_no_cumplidos.append("(2) Nuevas lesiones en RM")
-                if not sin_progresion_edss:
-                    criterios_no_cumplidos.append("(3) Progresión de EDSS")
-                
-                detalles_texto = ", ".join(criterios_no_cumplidos)
-                justificacion = JustificationMessages.NEDA3['critico'].format(
-                    detalles=detalles_texto
-                )
+            cumple, estado, justificacion, detalles = IndicatorCalculator._neda3_result(
+                sin_recaidas,
+                sin_lesiones_rm,
+                sin_progresion_edss
+            )
             
             logger.info(f"NEDA-3 evaluado: Cumple={cumple}")
             return cumple, estado, justificacion, detalles
@@ -230,6 +211,48 @@ class IndicatorCalculator:
             logger.error(f"Error al evaluar NEDA-3: {e}")
             raise
     
+    @staticmethod
+    def _neda3_result(
+        sin_recaidas: bool,
+        sin_lesiones_rm: bool,
+        sin_progresion_edss: bool
+    ) -> Tuple[bool, EstadoIndicador, str, Dict[str, bool]]:
+        """
+        Determina cumplimiento, estado y justificación de NEDA-3 (sin logging)
+        
+        Returns:
+            Tupla (cumple_neda3, estado, justificacion, detalles)
+        """
+        cumple = sin_recaidas and sin_lesiones_rm and sin_progresion_edss
+        
+        detalles = {
+            'sin_recaidas': sin_recaidas,
+            'sin_lesiones_rm': sin_lesiones_rm,
+            'sin_progresion_edss': sin_progresion_edss
+        }
+        
+        if cumple:
+            estado = EstadoIndicador.NORMAL
+            justificacion = JustificationMessages.NEDA3['normal']
+        else:
+            estado = EstadoIndicador.CRITICO
+            
+            # Construir detalles de criterios no cumplidos
+            criterios_no_cumplidos = []
+            if not sin_recaidas:
+                criterios_no_cumplidos.append("(1) Presencia de recaídas")
+            if not sin_lesiones_rm:
+                criterios_no_cumplidos.append("(2) Nuevas lesiones en RM")
+            if not sin_progresion_edss:
+                criterios_no_cumplidos.append("(3) Progresión de EDSS")
+            
+            detalles_texto = ", ".join(criterios_no_cumplidos)
+            justificacion = JustificationMessages.NEDA3['critico'].format(
+                detalles=detalles_texto
+            )
+        
+        return cumple, estado, justificacion, detalles
+    
     @staticmethod
     def _classify_value(
         valor: float,
@@ -251,3 +274,336 @@ class IndicatorCalculator:
             return EstadoIndicador.ALERTA
         else:
             return EstadoIndicador.CRITICO
+
+
+class BatchIndicatorCalculator:
+    """
+    Cálculo vectorizado (NumPy/pandas) de indicadores clínicos para cohortes completas
+    
+    Cada método recibe columnas (arrays, listas o Series) y devuelve arrays con
+    los mismos valores, estados y justificaciones que el método escalar
+    equivalente de IndicatorCalculator. Los estados se devuelven como el valor
+    de EstadoIndicador ('normal', 'alerta', 'critico').
+    """
+    
+    # Tolerancia para detectar valores de ARR cercanos a un empate de redondeo,
+    # que se recalculan con Decimal para reproducir exactamente la ruta escalar
+    _TIE_TOLERANCE = 1e-6
+    
+    @staticmethod
+    def _classify_values(valores: np.ndarray, rangos: Dict[str, Tuple[float, float]]) -> np.ndarray:
+        """Versión vectorizada de IndicatorCalculator._classify_value"""
+        normal = (valores >= rangos['normal'][0]) & (valores <= rangos['normal'][1])
+        alerta = (valores >= rangos['alerta'][0]) & (valores <= rangos['alerta'][1])
+        return np.select(
+            [normal, alerta],
+            [EstadoIndicador.NORMAL.value, EstadoIndicador.ALERTA.value],
+            default=EstadoIndicador.CRITICO.value
+        )
+    
+    @staticmethod
+    def _format_messages(plantillas: Dict[str, str], estados: np.ndarray, **columnas: Sequence[Any]) -> np.ndarray:
+        """Formatea la plantilla correspondiente al estado de cada fila"""
+        nombres = list(columnas.keys())
+        valores = [list(c) for c in columnas.values()]
+        return np.array(
+            [
+                plantillas[estado].format(**dict(zip(nombres, fila)))
+                for estado, *fila in zip(estados.tolist(), *valores)
+            ],
+            dtype=object
+        )
+    
+    @staticmethod
+    def calculate_arr(
+        total_recaidas: Sequence[int],
+        fecha_inicio: Sequence[Any],
+        fecha_fin: Sequence[Any]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calcula ARR para muchas filas
+        
+        Args:
+            total_recaidas: Recaídas por fila
+            fecha_inicio: Fechas de inicio del período (datetime o ISO 8601)
+            fecha_fin: Fechas de fin del período (datetime o ISO 8601)
+            
+        Returns:
+            Tupla (valores_arr, estados, justificaciones); los valores están
+            redondeados a 2 decimales como en la ruta escalar
+        """
+        recaidas = np.asarray(total_recaidas, dtype=np.float64)
+        # ISO8601: isoformat() omite los microsegundos cuando son cero, así que
+        # una misma columna mezcla formatos
+        inicio = pd.to_datetime(pd.Series(fecha_inicio), utc=True, format='ISO8601')
+        fin = pd.to_datetime(pd.Series(fecha_fin), utc=True, format='ISO8601')
+        
+        # Microsegundos enteros / 1e6: mismo redondeo que timedelta.total_seconds()
+        # mientras el período no supere 2**53 µs (~285 años)
+        microsegundos = (fin - inicio).to_numpy().astype('timedelta64[us]').astype(np.int64)
+        anos_paciente = (microsegundos / 1e6) / (365.25 * 24 * 60 * 60)
+        anos_paciente = np.where(anos_paciente == 0, 1.0, anos_paciente)
+        
+        arr_bruto = recaidas / anos_paciente
+        arr = np.round(arr_bruto, 2)
+        
+        # Cerca de un empate (x.xx5) el redondeo binario puede diferir del de Decimal
+        escalado = np.abs(arr_bruto) * 100
+        cerca_empate = np.abs(escalado - np.floor(escalado) - 0.5) < BatchIndicatorCalculator._TIE_TOLERANCE
+        for i in np.flatnonzero(cerca_empate):
+            arr[i] = float(Decimal(str(float(arr_bruto[i]))).quantize(Decimal('0.01')))
+        
+        estados = BatchIndicatorCalculator._classify_values(arr, IndicatorRanges.ARR_RANGES)
+        justificaciones = BatchIndicatorCalculator._format_messages(
+            JustificationMessages.ARR, estados, valor=arr.tolist()
+        )
+        
+        logger.info(f"ARR calculado en lote para {len(arr)} filas")
+        return arr, estados, justificaciones
+    
+    @staticmethod
+    def classify_t1_gd(conteo_lesiones: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Clasifica lesiones T1 Gd+ para muchas filas
+        
+        Args:
+            conteo_lesiones: Lesiones T1 Gd+ por fila
+            
+        Returns:
+            Tupla (estados, justificaciones)
+        """
+        conteos = np.asarray(conteo_lesiones)
+        estados = BatchIndicatorCalculator._classify_values(conteos, IndicatorRanges.T1_GD_RANGES)
+        justificaciones = BatchIndicatorCalculator._format_messages(
+            JustificationMessages.T1_GD, estados, valor=conteos.tolist()
+        )
+        
+        logger.info(f"T1 Gd+ clasificado en lote para {len(conteos)} filas")
+        return estados, justificaciones
+    
+    @staticmethod
+    def calculate_t2_difference(
+        t2_actual: Sequence[int],
+        t2_previo: Sequence[int]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calcula diferencia de lesiones T2 para muchas filas
+        
+        Args:
+            t2_actual: Conteo actual de lesiones T2 por fila
+            t2_previo: Conteo previo de lesiones T2 por fila
+            
+        Returns:
+            Tupla (diferencias, estados, justificaciones)
+        """
+        diferencias = np.asarray(t2_actual) - np.asarray(t2_previo)
+        estados = BatchIndicatorCalculator._classify_values(diferencias, IndicatorRanges.T2_NUEVAS_RANGES)
+        justificaciones = BatchIndicatorCalculator._format_messages(
+            JustificationMessages.T2_NUEVAS, estados, valor=diferencias.tolist()
+        )
+        
+        logger.info(f"T2 diferencia calculada en lote para {len(diferencias)} filas")
+        return diferencias, estados, justificaciones
+    
+    @staticmethod
+    def evaluate_cdp12(
+        edss_basal: Sequence[Any],
+        edss_actual: Sequence[Any]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evalúa CDP-12 para muchas filas
+        
+        Los EDSS son múltiplos de 0.5 y se representan exactamente en float64,
+        por lo que los deltas coinciden con la aritmética Decimal escalar.
+        
+        Args:
+            edss_basal: EDSS basal por fila
+            edss_actual: EDSS actual por fila
+            
+        Returns:
+            Tupla (deltas, progresion_confirmada, estados, justificaciones)
+        """
+        basal = np.asarray(edss_basal, dtype=np.float64)
+        actual = np.asarray(edss_actual, dtype=np.float64)
+        delta = actual - basal
+        
+        umbral = np.where(
+            basal <= SystemConstants.CDP12_EDSS_THRESHOLD,
+            SystemConstants.CDP12_UMBRAL_BAJO,
+            SystemConstants.CDP12_UMBRAL_ALTO
+        )
+        progresion = delta >= umbral
+        
+        estados = np.select(
+            [progresion, delta > 0],
+            [EstadoIndicador.CRITICO.value, EstadoIndicador.ALERTA.value],
+            default=EstadoIndicador.NORMAL.value
+        )
+        justificaciones = BatchIndicatorCalculator._format_messages(
+            JustificationMessages.CDP12, estados,
+            delta=delta.tolist(), umbral=umbral.tolist(), basal=basal.tolist()
+        )
+        
+        logger.info(f"CDP-12 evaluado en lote para {len(delta)} filas")
+        return delta, progresion, estados, justificaciones
+    
+    @staticmethod
+    def evaluate_neda3(
+        sin_recaidas: Sequence[bool],
+        sin_lesiones_rm: Sequence[bool],
+        sin_progresion_edss: Sequence[bool]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evalúa NEDA-3 para muchas filas
+        
+        Args:
+            sin_recaidas: Si no hubo recaídas
+            sin_lesiones_rm: Si no hubo nuevas lesiones en RM
+            sin_progresion_edss: Si no hubo progresión de EDSS
+            
+        Returns:
+            Tupla (cumple_neda3, estados, justificaciones)
+        """
+        r = np.asarray(sin_recaidas, dtype=bool)
+        l = np.asarray(sin_lesiones_rm, dtype=bool)
+        p = np.asarray(sin_progresion_edss, dtype=bool)
+        cumple = r & l & p
+        
+        estados = np.where(cumple, EstadoIndicador.NORMAL.value, EstadoIndicador.CRITICO.value)
+        
+        # Solo hay 8 combinaciones posibles de criterios: se precalculan los textos
+        textos = {}
+        for combinacion in itertools.product((False, True), repeat=3):
+            _, _, justificacion, _ = IndicatorCalculator._neda3_result(*combinacion)
+            textos[combinacion] = justificacion
+        justificaciones = np.array(
+            [textos[c] for c in zip(r.tolist(), l.tolist(), p.tolist())],
+            dtype=object
+        )
+        
+        logger.info(f"NEDA-3 evaluado en lote para {len(cumple)} filas")
+        return cumple, estados, justificaciones
+    
+    @staticmethod
+    def calculate_all(visitas: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcula los cinco indicadores para un DataFrame de visitas
+        
+        Columnas requeridas: recaidas, fecha_inicio, fecha_fin, lesiones_t1_gd,
+        lesiones_t2_actuales, lesiones_t2_previas, edss_basal, edss_actual.
+        Los criterios NEDA-3 se derivan igual que en la página de indicadores:
+        sin recaídas, sin lesiones T1 Gd+ ni nuevas T2, y sin CDP-12.
+        
+        Args:
+            visitas: Una fila por visita
+            
+        Returns:
+            DataFrame con columnas <indicador>_valor, <indicador>_estado y
+            <indicador>_justificacion para ARR, T1_Gd, T2_nuevas, CDP12 y NEDA3,
+            más CDP12_progresion, con el mismo índice que `visitas`
+        """
+        calc = BatchIndicatorCalculator
+        
+        arr, arr_estado, arr_just = calc.calculate_arr(
+            visitas['recaidas'], visitas['fecha_inicio'], visitas['fecha_fin']
+        )
+        t1 = np.asarray(visitas['lesiones_t1_gd'])
+        t1_estado, t1_just = calc.classify_t1_gd(t1)
+        t2, t2_estado, t2_just = calc.calculate_t2_difference(
+            visitas['lesiones_t2_actuales'], visitas['lesiones_t2_previas']
+        )
+        delta, progresion, cdp_estado, cdp_just = calc.evaluate_cdp12(
+            visitas['edss_basal'], visitas['edss_actual']
+        )
+        neda, neda_estado, neda_just = calc.evaluate_neda3(
+            np.asarray(visitas['recaidas']) == 0,
+            (t1 == 0) & (t2 <= 0),
+            ~progresion
+        )
+        
+        return pd.DataFrame({
+            'ARR_valor': arr, 'ARR_estado': arr_estado, 'ARR_justificacion': arr_just,
+            'T1_Gd_valor': t1.astype(np.float64), 'T1_Gd_estado': t1_estado, 'T1_Gd_justificacion': t1_just,
+            'T2_nuevas_valor': t2.astype(np.float64), 'T2_nuevas_estado': t2_estado, 'T2_nuevas_justificacion': t2_just,
+            'CDP12_valor': delta, 'CDP12_progresion': progresion,
+            'CDP12_estado': cdp_estado, 'CDP12_justificacion': cdp_just,
+            'NEDA3_valor': neda.astype(np.float64), 'NEDA3_estado': neda_estado, 'NEDA3_justificacion': neda_just
+        }, index=visitas.index)
+    
+    @staticmethod
+    def to_rows(visitas: pd.DataFrame, resultados: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Convierte los resultados de calculate_all en filas de indicadores_cita
+        
+        Mismo formato que guarda la página de indicadores: una fila por
+        indicador y cita, con las variables de entrada en variables_entrada.
+        
+        Args:
+            visitas: DataFrame de entrada de calculate_all, indexado por cita_id
+            resultados: Salida de calculate_all para esas visitas
+            
+        Returns:
+            Lista de filas listas para guardar_indicadores
+        """
+        filas = []
+        
+        for cita_id, v, r in zip(visitas.index, visitas.itertuples(index=False), resultados.itertuples(index=False)):
+            sin_recaidas = v.recaidas == 0
+            sin_lesiones_rm = v.lesiones_t1_gd == 0 and r.T2_nuevas_valor <= 0
+            sin_progresion = not bool(r.CDP12_progresion)
+            
+            filas.extend([
+                {
+                    'cita_id': cita_id,
+                    'indicador_tipo': 'ARR',
+                    'valor_calculado': float(r.ARR_valor),
+                    'estado': r.ARR_estado,
+                    'justificacion_texto': r.ARR_justificacion,
+                    'variables_entrada': {'recaidas': int(v.recaidas)}
+                },
+                {
+                    'cita_id': cita_id,
+                    'indicador_tipo': 'T1_Gd',
+                    'valor_calculado': float(r.T1_Gd_valor),
+                    'estado': r.T1_Gd_estado,
+                    'justificacion_texto': r.T1_Gd_justificacion,
+                    'variables_entrada': {'lesiones_t1_gd': int(v.lesiones_t1_gd)}
+                },
+                {
+                    'cita_id': cita_id,
+                    'indicador_tipo': 'T2_nuevas',
+                    'valor_calculado': float(r.T2_nuevas_valor),
+                    'estado': r.T2_nuevas_estado,
+                    'justificacion_texto': r.T2_nuevas_justificacion,
+                    'variables_entrada': {
+                        'lesiones_t2_actuales': int(v.lesiones_t2_actuales),
+                        'lesiones_t2_previas': int(v.lesiones_t2_previas)
+                    }
+                },
+                {
+                    'cita_id': cita_id,
+                    'indicador_tipo': 'CDP12',
+                    'valor_calculado': float(r.CDP12_valor),
+                    'estado': r.CDP12_estado,
+                    'justificacion_texto': r.CDP12_justificacion,
+                    'variables_entrada': {
+                        'edss_basal': float(v.edss_basal),
+                        'edss_actual': float(v.edss_actual),
+                        'progresion_confirmada': bool(r.CDP12_progresion)
+                    }
+                },
+                {
+                    'cita_id': cita_id,
+                    'indicador_tipo': 'NEDA3',
+                    'valor_calculado': float(r.NEDA3_valor),
+                    'estado': r.NEDA3_estado,
+                    'justificacion_texto': r.NEDA3_justificacion,
+                    'variables_entrada': {
+                        'sin_recaidas': bool(sin_recaidas),
+                        'sin_lesiones_rm': bool(sin_lesiones_rm),
+                        'sin_progresion_edss': bool(sin_progresion)
+                    }
+                }
+            ])
+        
+        return filas
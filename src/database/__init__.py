@@ -1,4 +1,21 @@
 """Archivo __init__.py para el paquete database"""
-from .supabase_client import db, SupabaseClient
+import os
+from config import DatabaseConfig
+from .supabase_client import SupabaseClient, query_cache
+from .postgres_client import PostgresClient
+from .async_supabase_client import AsyncSupabaseClient
+from .async_postgres_client import AsyncPostgresClient
 
-__all__ = ['db', 'SupabaseClient']
+# Instancias globales de los clientes síncrono y asíncrono: PostgREST (por
+# defecto) o conexión directa a Postgres
+if os.getenv(DatabaseConfig.BACKEND_ENV, DatabaseConfig.BACKEND) == 'postgres':
+    db = PostgresClient()
+    async_db = AsyncPostgresClient(db)
+else:
+    db = SupabaseClient()
+    async_db = AsyncSupabaseClient()
+
+__all__ = [
+    'db', 'SupabaseClient', 'PostgresClient', 'query_cache',
+    'async_db', 'AsyncSupabaseClient', 'AsyncPostgresClient'
+]
@@ -0,0 +1,54 @@
+"""
+Cliente asíncrono para el backend postgres (misma interfaz que AsyncSupabaseClient)
+"""
+import asyncio
+from functools import wraps
+from typing import Any, AsyncIterator, Callable, Optional
+
+from .postgres_client import PostgresClient
+
+# Métodos que se exponen tal cual (no hacen E/S)
+_SINCRONOS = {'cache_stats', 'limpiar_cache', 'cerrar'}
+
+class AsyncPostgresClient:
+    """
+    Adaptador asíncrono de PostgresClient
+
+    Expone los métodos de PostgresClient como corrutinas que se ejecutan en un
+    hilo con asyncio.to_thread: varias consultas lanzadas con asyncio.gather
+    usan conexiones distintas del pool sin bloquear el event loop. Los lectores
+    iter_* se exponen como generadores asíncronos. Comparte la caché de lecturas
+    (y el pool) con el cliente síncrono.
+    """
+
+    def __init__(self, cliente: Optional[PostgresClient] = None):
+        self._cliente = cliente or PostgresClient()
+
+    def __getattr__(self, nombre: str) -> Any:
+        atributo = getattr(self._cliente, nombre)
+        if nombre.startswith('_') or nombre in _SINCRONOS or not callable(atributo):
+            return atributo
+        if nombre.startswith('iter_'):
+            return self._lector_asincrono(atributo)
+
+        @wraps(atributo)
+        async def llamada(*args, **kwargs):
+            return await asyncio.to_thread(atributo, *args, **kwargs)
+        return llamada
+
+    @staticmethod
+    def _lector_asincrono(lector: Callable[..., Any]) -> Callable[..., AsyncIterator[Any]]:
+        """Convierte un lector iter_* en un generador asíncrono (cada bloque se lee en un hilo)"""
+        @wraps(lector)
+        async def recorrer(*args, **kwargs):
+            bloques = lector(*args, **kwargs)
+            try:
+                while True:
+                    bloque = await asyncio.to_thread(next, bloques, None)
+                    if bloque is None:
+                        return
+                    yield bloque
+            finally:
+                # Cerrar el generador devuelve la conexión al pool
+                await asyncio.to_thread(bloques.close)
+        return recorrer
@@ -0,0 +1,663 @@
+"""
+Cliente asíncrono de Supabase (misma interfaz que SupabaseClient)
+"""
+import asyncio
+import weakref
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple, Union
+from datetime import datetime, date
+from supabase import acreate_client, AsyncClient
+from loguru import logger
+from config import CacheConfig, DatabaseConfig
+
+from .supabase_client import (
+    Campos, cached, fecha_iso, invalidates, limite_hasta, load_supabase_credentials, patron_prefijo, proyeccion,
+    query_cache, valor_filtro
+)
+
+class AsyncSupabaseClient:
+    """
+    Cliente singleton asíncrono para Supabase
+
+    Expone los mismos métodos que SupabaseClient como corrutinas, de modo que
+    varias consultas pueden lanzarse en paralelo con asyncio.gather sin bloquear
+    el event loop. Comparte la caché de lecturas con el cliente síncrono.
+    """
+
+    _instance: Optional['AsyncSupabaseClient'] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            # Un cliente por event loop: Streamlit crea un loop nuevo en cada consulta
+            # y las conexiones httpx no pueden reutilizarse entre loops distintos
+            cls._instance._clients = weakref.WeakKeyDictionary()
+        return cls._instance
+
+    async def get_client(self) -> AsyncClient:
+        """Retorna el cliente asíncrono de Supabase asociado al event loop actual"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            try:
+                url, key = load_supabase_credentials()
+                client = await acreate_client(url, key)
+                self._clients[loop] = client
+                logger.info("Cliente asíncrono de Supabase inicializado correctamente")
+            except Exception as e:
+                logger.error(f"Error al inicializar cliente asíncrono de Supabase: {e}")
+                raise
+        return client
+
+    # =====================================================
+    # OPERACIONES CRUD - PACIENTES
+    # =====================================================
+
+    @invalidates('pacientes')
+    async def crear_paciente(self, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """Crea un nuevo paciente"""
+        try:
+            client = await self.get_client()
+            response = await client.table('pacientes').insert(datos).execute()
+            logger.info(f"Paciente creado: {datos.get('nombre_completo')}")
+            return response.data[0] if response.data else {}
+        except Exception as e:
+            logger.error(f"Error al crear paciente: {e}")
+            raise
+
+    @invalidates('pacientes')
+    async def crear_pacientes(self, pacientes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Crea varios pacientes en una sola petición (INSERT de varias filas)"""
+        try:
+            if not pacientes:
+                return []
+
+            client = await self.get_client()
+            response = await client.table('pacientes').insert(pacientes).execute()
+            logger.info(f"{len(pacientes)} pacientes creados en lote")
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al crear pacientes en lote: {e}")
+            raise
+
+    @cached('pacientes')
+    async def obtener_paciente(self, paciente_id: str, campos: Campos = 'full') -> Optional[Dict[str, Any]]:
+        """Obtiene un paciente por ID"""
+        try:
+            client = await self.get_client()
+            response = await client.table('pacientes').select(proyeccion('pacientes', campos)).eq('id', paciente_id).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            logger.error(f"Error al obtener paciente: {e}")
+            raise
+
+    @cached('pacientes')
+    async def listar_pacientes(
+        self,
+        activos_solo: bool = True,
+        campos: Campos = 'full',
+        limite: Optional[int] = None,
+        despues_de: Optional[Tuple[str, str]] = None,
+        prefijo: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Lista pacientes ordenados por (nombre_completo, id), con paginación por cursor opcional"""
+        try:
+            client = await self.get_client()
+            query = client.table('pacientes').select(proyeccion('pacientes', campos))
+            if activos_solo:
+                query = query.eq('activo', True)
+            if prefijo:
+                query = query.ilike('nombre_completo', patron_prefijo(prefijo))
+            if despues_de:
+                nombre, paciente_id = despues_de
+                query = query.or_(
+                    f"nombre_completo.gt.{valor_filtro(nombre)},"
+                    f"and(nombre_completo.eq.{valor_filtro(nombre)},id.gt.{paciente_id})"
+                )
+            query = query.order('nombre_completo').order('id')
+            if limite:
+                query = query.limit(limite)
+            response = await query.execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al listar pacientes: {e}")
+            raise
+
+    @cached('pacientes')
+    async def buscar_pacientes(self, texto: str, limite: int = 20, activos_solo: bool = True) -> List[Dict[str, Any]]:
+        """Busca pacientes por nombre con la función buscar_pacientes (índice trigram)"""
+        try:
+            client = await self.get_client()
+            response = await client.rpc('buscar_pacientes', {
+                'p_texto': texto,
+                'p_limite': limite,
+                'p_activos_solo': activos_solo
+            }).execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al buscar pacientes: {e}")
+            raise
+
+    @cached('pacientes')
+    async def contar_pacientes(self, activos_solo: bool = True) -> int:
+        """Cuenta pacientes sin descargar las filas (count=exact, head)"""
+        try:
+            client = await self.get_client()
+            query = client.table('pacientes').select('id', count='exact', head=True)
+            if activos_solo:
+                query = query.eq('activo', True)
+            response = await query.execute()
+            return response.count or 0
+        except Exception as e:
+            logger.error(f"Error al contar pacientes: {e}")
+            raise
+
+    @invalidates('pacientes')
+    async def actualizar_paciente(self, paciente_id: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """Actualiza un paciente"""
+        try:
+            client = await self.get_client()
+            response = await client.table('pacientes').update(datos).eq('id', paciente_id).execute()
+            logger.info(f"Paciente actualizado: {paciente_id}")
+            return response.data[0] if response.data else {}
+        except Exception as e:
+            logger.error(f"Error al actualizar paciente: {e}")
+            raise
+
+    # =====================================================
+    # OPERACIONES CRUD - CITAS
+    # =====================================================
+
+    @invalidates('citas')
+    async def crear_cita(self, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """Crea una nueva cita (el número de visita lo asigna crear_cita_numerada en la base de datos)"""
+        try:
+            # Numeración y alta en una sola llamada (evita duplicados con reservas simultáneas)
+            client = await self.get_client()
+            response = await client.rpc('crear_cita_numerada', {'p_datos': datos}).execute()
+            cita = response.data if isinstance(response.data, dict) else (response.data[0] if response.data else {})
+            logger.info(f"Cita creada para paciente {datos.get('paciente_id')}, visita #{cita.get('numero_visita')}")
+            return cita
+        except Exception as e:
+            logger.error(f"Error al crear cita: {e}")
+            raise
+
+    @cached('citas')
+    async def obtener_cita(self, cita_id: str, campos: Campos = 'full') -> Optional[Dict[str, Any]]:
+        """Obtiene una cita por ID"""
+        try:
+            client = await self.get_client()
+            response = await client.table('citas').select(proyeccion('citas', campos)).eq('id', cita_id).execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            logger.error(f"Error al obtener cita: {e}")
+            raise
+
+    @cached('citas')
+    async def listar_citas_paciente(
+        self,
+        paciente_id: str,
+        campos: Campos = 'full',
+        limite: Optional[int] = None,
+        despues_de: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Lista las citas de un paciente, de la más reciente a la más antigua, con paginación por cursor opcional"""
+        try:
+            client = await self.get_client()
+            query = client.table('citas')\
+                .select(proyeccion('citas', campos))\
+                .eq('paciente_id', paciente_id)
+            if despues_de:
+                fecha, cita_id = despues_de
+                query = query.or_(
+                    f"fecha_cita.lt.{valor_filtro(fecha)},"
+                    f"and(fecha_cita.eq.{valor_filtro(fecha)},id.lt.{cita_id})"
+                )
+            query = query.order('fecha_cita', desc=True).order('id', desc=True)
+            if limite:
+                query = query.limit(limite)
+            response = await query.execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al listar citas: {e}")
+            raise
+
+    @invalidates('citas')
+    async def actualizar_cita(self, cita_id: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """Actualiza una cita"""
+        try:
+            client = await self.get_client()
+            response = await client.table('citas').update(datos).eq('id', cita_id).execute()
+            logger.info(f"Cita actualizada: {cita_id}")
+            return response.data[0] if response.data else {}
+        except Exception as e:
+            logger.error(f"Error al actualizar cita: {e}")
+            raise
+
+    async def listar_citas_completadas(self, despues_de: Optional[str] = None, limite: int = 500) -> List[Dict[str, Any]]:
+        """Lista citas completadas ordenadas por id, por bloques (paginación por clave)"""
+        try:
+            client = await self.get_client()
+            query = client.table('citas')\
+                .select('id, paciente_id, fecha_cita, numero_visita, pacientes(fecha_diagnostico, edss_basal)')\
+                .eq('estado', 'completada')
+
+            if despues_de:
+                query = query.gt('id', despues_de)
+
+            response = await query.order('id').limit(limite).execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al listar citas completadas: {e}")
+            raise
+
+    @cached('citas', 'pacientes', ttl=CacheConfig.RELATIVE_WINDOW_TTL)
+    async def obtener_citas_pendientes(self, dias_adelante: int = 2, campos: Campos = 'full') -> List[Dict[str, Any]]:
+        """Obtiene citas pendientes en los próximos N días"""
+        try:
+            from datetime import timedelta
+            fecha_limite = (datetime.now() + timedelta(days=dias_adelante)).isoformat()
+
+            client = await self.get_client()
+            response = await client.table('citas')\
+                .select(f"{proyeccion('citas', campos)}, pacientes({proyeccion('pacientes', campos)})")\
+                .eq('estado', 'pendiente')\
+                .lte('fecha_cita', fecha_limite)\
+                .execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al obtener citas pendientes: {e}")
+            raise
+
+    @cached('citas', ttl=CacheConfig.RELATIVE_WINDOW_TTL)
+    async def contar_citas_pendientes(self, dias_adelante: int = 2) -> int:
+        """Cuenta las citas pendientes en los próximos N días sin descargar las filas"""
+        try:
+            from datetime import timedelta
+            fecha_limite = (datetime.now() + timedelta(days=dias_adelante)).isoformat()
+
+            client = await self.get_client()
+            response = await client.table('citas')\
+                .select('id', count='exact', head=True)\
+                .eq('estado', 'pendiente')\
+                .lte('fecha_cita', fecha_limite)\
+                .execute()
+            return response.count or 0
+        except Exception as e:
+            logger.error(f"Error al contar citas pendientes: {e}")
+            raise
+
+    # =====================================================
+    # OPERACIONES CRUD - INDICADORES
+    # =====================================================
+
+    @invalidates('indicadores_cita')
+    async def guardar_indicador(self, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """Guarda un indicador clínico"""
+        try:
+            client = await self.get_client()
+            response = await client.table('indicadores_cita').upsert(
+                datos,
+                on_conflict='cita_id,indicador_tipo'
+            ).execute()
+            logger.info(f"Indicador guardado: {datos.get('indicador_tipo')} para cita {datos.get('cita_id')}")
+            return response.data[0] if response.data else {}
+        except Exception as e:
+            logger.error(f"Error al guardar indicador: {e}")
+            raise
+
+    @invalidates('indicadores_cita')
+    async def guardar_indicadores(self, indicadores: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Guarda varios indicadores en una sola petición (upsert por cita_id, indicador_tipo)"""
+        try:
+            if not indicadores:
+                return []
+
+            client = await self.get_client()
+            response = await client.table('indicadores_cita').upsert(
+                indicadores,
+                on_conflict='cita_id,indicador_tipo'
+            ).execute()
+            logger.info(f"{len(indicadores)} indicadores guardados en lote")
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al guardar indicadores en lote: {e}")
+            raise
+
+    @invalidates('indicadores_cita', 'citas')
+    async def guardar_indicadores_cita(
+        self,
+        cita_id: str,
+        indicadores: List[Dict[str, Any]],
+        completar_cita: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Guarda los indicadores de una cita y la marca como completada en una sola transacción"""
+        try:
+            filas = [
+                {k: v for k, v in ind.items() if k != 'cita_id'}
+                for ind in indicadores
+            ]
+            client = await self.get_client()
+            response = await client.rpc('guardar_indicadores_cita', {
+                'p_cita_id': cita_id,
+                'p_indicadores': filas,
+                'p_completar_cita': completar_cita
+            }).execute()
+            logger.info(f"{len(filas)} indicadores guardados para cita {cita_id}")
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al guardar indicadores de la cita: {e}")
+            raise
+
+    @cached('indicadores_cita')
+    async def obtener_indicadores_cita(self, cita_id: str, campos: Campos = 'full') -> List[Dict[str, Any]]:
+        """Obtiene todos los indicadores de una cita"""
+        try:
+            client = await self.get_client()
+            response = await client.table('indicadores_cita')\
+                .select(proyeccion('indicadores_cita', campos))\
+                .eq('cita_id', cita_id)\
+                .execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al obtener indicadores: {e}")
+            raise
+
+    async def _seleccionar_por_ids(self, tabla: str, columnas: str, campo: str, ids: List[str]) -> List[Dict[str, Any]]:
+        """SELECT ... WHERE campo IN (ids) completo (ver SupabaseClient._seleccionar_por_ids)"""
+        client = await self.get_client()
+        filas: List[Dict[str, Any]] = []
+        for inicio in range(0, len(ids), DatabaseConfig.IN_CHUNK_SIZE):
+            bloque = ids[inicio:inicio + DatabaseConfig.IN_CHUNK_SIZE]
+            leidas = 0
+            while True:
+                response = await client.table(tabla)\
+                    .select(columnas, count='exact')\
+                    .in_(campo, bloque)\
+                    .order('id')\
+                    .range(leidas, leidas + DatabaseConfig.MAX_ROWS_PER_REQUEST - 1)\
+                    .execute()
+                filas.extend(response.data)
+                leidas += len(response.data)
+                if response.count is None or leidas >= response.count:
+                    break
+                if not response.data:
+                    raise RuntimeError(f"Lectura incompleta de {tabla}: {leidas} de {response.count} filas")
+        return filas
+
+    @cached('indicadores_cita')
+    async def obtener_indicadores_citas(self, cita_ids: List[str], campos: Campos = 'full') -> Dict[str, List[Dict[str, Any]]]:
+        """Obtiene los indicadores de varias citas, agrupados por cita_id (en bloques de DatabaseConfig.IN_CHUNK_SIZE citas)"""
+        try:
+            agrupados: Dict[str, List[Dict[str, Any]]] = {cita_id: [] for cita_id in cita_ids}
+
+            filas = await self._seleccionar_por_ids(
+                'indicadores_cita', proyeccion('indicadores_cita', campos), 'cita_id', list(cita_ids)
+            )
+            for ind in filas:
+                agrupados.setdefault(ind['cita_id'], []).append(ind)
+            return agrupados
+        except Exception as e:
+            logger.error(f"Error al obtener indicadores de citas: {e}")
+            raise
+
+    @invalidates('indicadores_cita')
+    async def eliminar_indicadores_cita(self, cita_id: str) -> bool:
+        """Elimina todos los indicadores de una cita (útil para recalcular desde cero)"""
+        try:
+            client = await self.get_client()
+            await client.table('indicadores_cita')\
+                .delete()\
+                .eq('cita_id', cita_id)\
+                .execute()
+            logger.info(f"Indicadores eliminados para cita {cita_id}")
+            return True
+        except Exception as e:
+            logger.error(f"Error al eliminar indicadores: {e}")
+            raise
+
+    @cached('indicadores_cita', 'citas')
+    async def obtener_historial_indicadores(
+        self,
+        paciente_id: str,
+        tipo_indicador: Optional[str] = None,
+        campos: Campos = 'full',
+        desde: Optional[Union[date, datetime, str]] = None,
+        hasta: Optional[Union[date, datetime, str]] = None,
+        limite: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Obtiene historial de indicadores de un paciente, ordenado por fecha_cita ascendente"""
+        try:
+            client = await self.get_client()
+            query = client.table('indicadores_cita')\
+                .select(f"{proyeccion('indicadores_cita', campos)}, citas!inner(fecha_cita, paciente_id, id)")\
+                .eq('citas.paciente_id', paciente_id)
+
+            if tipo_indicador:
+                query = query.eq('indicador_tipo', tipo_indicador)
+            if desde:
+                query = query.gte('citas.fecha_cita', fecha_iso(desde))
+            if hasta:
+                estricto, limite_fecha = limite_hasta(hasta)
+                query = query.lt('citas.fecha_cita', limite_fecha) if estricto \
+                    else query.lte('citas.fecha_cita', limite_fecha)
+
+            # Orden en el servidor; con límite se piden los más recientes
+            query = query.order('citas(fecha_cita)', desc=bool(limite))
+            if limite:
+                query = query.limit(limite)
+
+            response = await query.execute()
+            if limite:
+                response.data.reverse()
+
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al obtener historial de indicadores: {e}")
+            raise
+
+    @cached('indicadores_cita', 'citas')
+    async def obtener_dashboard_paciente(self, paciente_id: str) -> Dict[str, Any]:
+        """Obtiene los datos del dashboard de un paciente en una sola llamada"""
+        try:
+            client = await self.get_client()
+            response = await client.rpc('obtener_dashboard_paciente', {
+                'p_paciente_id': paciente_id
+            }).execute()
+            return response.data or {}
+        except Exception as e:
+            logger.error(f"Error al obtener dashboard del paciente: {e}")
+            raise
+
+    # =====================================================
+    # OPERACIONES CRUD - DIAGNÓSTICOS IA
+    # =====================================================
+
+    @invalidates('diagnosticos_ia')
+    async def guardar_diagnostico_ia(self, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """Guarda un diagnóstico de IA"""
+        try:
+            client = await self.get_client()
+            response = await client.table('diagnosticos_ia').upsert(datos).execute()
+            logger.info(f"Diagnóstico IA guardado para cita {datos.get('cita_id')}")
+            return response.data[0] if response.data else {}
+        except Exception as e:
+            logger.error(f"Error al guardar diagnóstico IA: {e}")
+            raise
+
+    @cached('diagnosticos_ia')
+    async def obtener_diagnostico_ia(self, cita_id: str, campos: Campos = 'full') -> Optional[Dict[str, Any]]:
+        """Obtiene el diagnóstico IA de una cita"""
+        try:
+            client = await self.get_client()
+            response = await client.table('diagnosticos_ia')\
+                .select(proyeccion('diagnosticos_ia', campos))\
+                .eq('cita_id', cita_id)\
+                .execute()
+            return response.data[0] if response.data else None
+        except Exception as e:
+            logger.error(f"Error al obtener diagnóstico IA: {e}")
+            raise
+
+    # =====================================================
+    # OPERACIONES - MÉTRICAS IA
+    # =====================================================
+
+    @cached('diagnosticos_ia')
+    async def calcular_metricas_ia(self, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None) -> Dict[str, Any]:
+        """Calcula métricas de precisión de las IAs"""
+        try:
+            params = {}
+            if fecha_inicio:
+                params['p_fecha_inicio'] = fecha_inicio.isoformat()
+            if fecha_fin:
+                params['p_fecha_fin'] = fecha_fin.isoformat()
+
+            client = await self.get_client()
+            response = await client.rpc('obtener_metricas_ia', params).execute()
+            return response.data[0] if response.data else {}
+        except Exception as e:
+            logger.error(f"Error al calcular métricas IA: {e}")
+            raise
+
+    @cached('pacientes', 'citas', 'diagnosticos_ia', ttl=CacheConfig.RELATIVE_WINDOW_TTL)
+    async def obtener_estadisticas_inicio(self, dias_adelante: int = 30) -> Dict[str, int]:
+        """Obtiene las estadísticas de la página principal en una sola llamada"""
+        try:
+            client = await self.get_client()
+            response = await client.rpc('obtener_estadisticas_inicio', {
+                'p_dias_adelante': dias_adelante
+            }).execute()
+            return response.data[0] if response.data else {}
+        except Exception as e:
+            logger.error(f"Error al obtener estadísticas de inicio: {e}")
+            raise
+
+    @invalidates('metricas_ia')
+    async def guardar_metricas_ia(self, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """Guarda métricas de IA calculadas"""
+        try:
+            client = await self.get_client()
+            response = await client.table('metricas_ia').upsert(datos).execute()
+            logger.info(f"Métricas IA guardadas para fecha {datos.get('fecha_calculo')}")
+            return response.data[0] if response.data else {}
+        except Exception as e:
+            logger.error(f"Error al guardar métricas IA: {e}")
+            raise
+
+    @cached('metricas_ia')
+    async def obtener_historial_metricas_ia(self, limite: int = 30, campos: Campos = 'full') -> List[Dict[str, Any]]:
+        """Obtiene historial de métricas de IA"""
+        try:
+            client = await self.get_client()
+            response = await client.table('metricas_ia')\
+                .select(proyeccion('metricas_ia', campos))\
+                .order('fecha_calculo', desc=True)\
+                .limit(limite)\
+                .execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al obtener historial de métricas IA: {e}")
+            raise
+
+    # =====================================================
+    # LECTURA POR BLOQUES (TABLAS COMPLETAS)
+    # =====================================================
+
+    async def _iter_tabla(
+        self,
+        tabla: str,
+        campos: Campos,
+        filtros: Dict[str, Any],
+        bloque: int
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Recorre una tabla por bloques ordenados por id (paginación por clave, sin caché)"""
+        client = await self.get_client()
+        despues_de = None
+        while True:
+            query = client.table(tabla).select(proyeccion(tabla, campos))
+            for columna, valor in filtros.items():
+                query = query.eq(columna, valor)
+            if despues_de:
+                query = query.gt('id', despues_de)
+
+            filas = (await query.order('id').limit(bloque).execute()).data
+            if not filas:
+                return
+            yield filas
+            despues_de = filas[-1]['id']
+
+    async def iter_pacientes(
+        self,
+        activos_solo: bool = True,
+        campos: Campos = 'full',
+        bloque: int = DatabaseConfig.STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Recorre todos los pacientes por bloques ordenados por id, con memoria acotada"""
+        try:
+            filtros = {'activo': True} if activos_solo else {}
+            async for filas in self._iter_tabla('pacientes', campos, filtros, bloque):
+                yield filas
+        except Exception as e:
+            logger.error(f"Error al recorrer pacientes: {e}")
+            raise
+
+    async def iter_citas(
+        self,
+        estado: Optional[str] = None,
+        paciente_id: Optional[str] = None,
+        campos: Campos = 'full',
+        bloque: int = DatabaseConfig.STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Recorre todas las citas por bloques ordenados por id, con memoria acotada"""
+        try:
+            filtros = {}
+            if estado:
+                filtros['estado'] = estado
+            if paciente_id:
+                filtros['paciente_id'] = paciente_id
+            async for filas in self._iter_tabla('citas', campos, filtros, bloque):
+                yield filas
+        except Exception as e:
+            logger.error(f"Error al recorrer citas: {e}")
+            raise
+
+    async def iter_indicadores(
+        self,
+        indicador_tipo: Optional[str] = None,
+        campos: Campos = 'full',
+        bloque: int = DatabaseConfig.STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Recorre todos los indicadores por bloques ordenados por id, con memoria acotada"""
+        try:
+            filtros = {'indicador_tipo': indicador_tipo} if indicador_tipo else {}
+            async for filas in self._iter_tabla('indicadores_cita', campos, filtros, bloque):
+                yield filas
+        except Exception as e:
+            logger.error(f"Error al recorrer indicadores: {e}")
+            raise
+
+    async def iter_diagnosticos_ia(
+        self,
+        ia_seleccionada: Optional[str] = None,
+        campos: Campos = 'full',
+        bloque: int = DatabaseConfig.STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Recorre todos los diagnósticos de IA por bloques ordenados por id, con memoria acotada"""
+        try:
+            filtros = {'ia_seleccionada': ia_seleccionada} if ia_seleccionada else {}
+            async for filas in self._iter_tabla('diagnosticos_ia', campos, filtros, bloque):
+                yield filas
+        except Exception as e:
+            logger.error(f"Error al recorrer diagnósticos IA: {e}")
+            raise
+
+    # =====================================================
+    # CACHÉ
+    # =====================================================
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Retorna los contadores de la caché de lecturas (hits, misses, evictions...)"""
+        return query_cache.stats()
+
+# Instancia global del cliente asíncrono
+async_db = AsyncSupabaseClient()
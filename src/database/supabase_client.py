@@ -2,16 +2,246 @@
 Cliente de Supabase para gestión de base de datos
 """
 import os
-from typing import Optional, List, Dict, Any
-from datetime import datetime, date
+import copy
+import inspect
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Optional, List, Dict, Any, Tuple, Callable, Iterator, Sequence, Union
+from datetime import datetime, date, timedelta
 from dotenv import load_dotenv
 from supabase import create_client, Client
 from loguru import logger
 import json
+from config import CacheConfig, DatabaseConfig, ProjectionConfig
 
 # Cargar variables de entorno
 load_dotenv()
 
+class QueryCache:
+    """Caché LRU con TTL por tabla para lecturas, compartida por todo el proceso"""
+    
+    def __init__(self, max_entries: int = CacheConfig.MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple, Tuple[float, Tuple[str, ...], Any]]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def make_key(method: str, args: Tuple, kwargs: Dict[str, Any]) -> Tuple:
+        """Construye una clave hashable a partir del método y sus argumentos"""
+        def freeze(value):
+            if isinstance(value, dict):
+                return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+            if isinstance(value, (list, tuple, set)):
+                return tuple(freeze(v) for v in value)
+            return value
+        return (method, freeze(args), freeze(kwargs))
+    
+    @staticmethod
+    def ttl_for(tables: Tuple[str, ...]) -> float:
+        """TTL de una consulta: el menor de las tablas que lee"""
+        return min(CacheConfig.TABLE_TTL.get(t, CacheConfig.DEFAULT_TTL) for t in tables)
+    
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        """Retorna (encontrado, valor); las entradas vencidas cuentan como fallo"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, _, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, copy.deepcopy(value)
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+    
+    def set(self, key: Tuple, tables: Tuple[str, ...], value: Any, ttl: Optional[float] = None) -> None:
+        """Almacena un resultado etiquetado con las tablas de las que depende (ttl: segundos, por defecto el de las tablas)"""
+        with self._lock:
+            vida = self.ttl_for(tables) if ttl is None else min(ttl, self.ttl_for(tables))
+            self._entries[key] = (time.monotonic() + vida, tables, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, *tables: str) -> int:
+        """Elimina las entradas que dependen de alguna de las tablas indicadas"""
+        with self._lock:
+            afectadas = [k for k, (_, deps, _) in self._entries.items() if set(deps) & set(tables)]
+            for k in afectadas:
+                del self._entries[k]
+            self.invalidations += len(afectadas)
+            return len(afectadas)
+    
+    def clear(self) -> None:
+        """Vacía la caché"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de uso de la caché"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+# Caché global del proceso
+query_cache = QueryCache()
+
+def cached(*tables: str, ttl: Optional[float] = None) -> Callable:
+    """
+    Decorador read-through: cachea el resultado de una lectura que depende de `tables`.
+    Admite métodos síncronos y asíncronos; ambas variantes del cliente comparten la caché.
+    `ttl` acorta la vida de las entradas cuando el resultado depende también del reloj.
+    Llamar con `usar_cache=False` lee directamente de la base (sin leer ni guardar en caché).
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                if not kwargs.pop('usar_cache', True) or not CacheConfig.ENABLED:
+                    return await func(self, *args, **kwargs)
+                key = QueryCache.make_key(func.__name__, args, kwargs)
+                found, value = query_cache.get(key)
+                if found:
+                    return value
+                result = await func(self, *args, **kwargs)
+                query_cache.set(key, tables, result, ttl)
+                return result
+            return async_wrapper
+        
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not kwargs.pop('usar_cache', True) or not CacheConfig.ENABLED:
+                return func(self, *args, **kwargs)
+            key = QueryCache.make_key(func.__name__, args, kwargs)
+            found, value = query_cache.get(key)
+            if found:
+                return value
+            result = func(self, *args, **kwargs)
+            query_cache.set(key, tables, result, ttl)
+            return result
+        return wrapper
+    return decorator
+
+def invalidates(*tables: str) -> Callable:
+    """Decorador para escrituras: invalida las lecturas cacheadas de `tables`"""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                try:
+                    return await func(self, *args, **kwargs)
+                finally:
+                    query_cache.invalidate(*tables)
+            return async_wrapper
+        
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                # También tras un error: la escritura pudo aplicarse parcialmente
+                query_cache.invalidate(*tables)
+        return wrapper
+    return decorator
+
+# Perfil de ProjectionConfig ('selector', 'chart', 'full') o lista explícita de columnas
+Campos = Union[str, Sequence[str]]
+
+def proyeccion(tabla: str, campos: Campos = 'full') -> str:
+    """
+    Resuelve la lista de columnas de un select
+    
+    Args:
+        tabla: Tabla consultada
+        campos: Nombre de perfil ('selector', 'chart', 'full'), lista de
+            columnas o cadena de columnas de PostgREST
+            
+    Returns:
+        Cadena de columnas para select()
+    """
+    if isinstance(campos, str):
+        perfiles = ProjectionConfig.PROFILES.get(tabla, {'full': '*'})
+        return perfiles.get(campos, campos)
+    return ', '.join(campos)
+
+def fecha_iso(valor: Union[date, datetime, str]) -> str:
+    """Convierte una fecha (o cadena ISO) al formato de los filtros de PostgREST"""
+    return valor if isinstance(valor, str) else valor.isoformat()
+
+def limite_hasta(valor: Union[date, datetime, str]) -> Tuple[bool, str]:
+    """
+    Límite superior inclusivo de un filtro de fechas
+    
+    Una fecha sin hora (date o cadena 'AAAA-MM-DD') incluye todo ese día, así
+    que se compara de forma estricta con el día siguiente; un datetime (o
+    cadena con hora) se compara con <=.
+    
+    Returns:
+        Tupla (comparación estricta, valor ISO del límite)
+    """
+    if isinstance(valor, str) and len(valor) == 10:
+        try:
+            valor = date.fromisoformat(valor)
+        except ValueError:
+            pass  # La base de datos informa del valor no válido
+    if isinstance(valor, date) and not isinstance(valor, datetime):
+        return True, (valor + timedelta(days=1)).isoformat()
+    return False, fecha_iso(valor)
+
+def valor_filtro(valor: Any) -> str:
+    """Entrecomilla un valor para usarlo dentro de un filtro or=(...) de PostgREST"""
+    texto = str(valor).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{texto}"'
+
+def patron_prefijo(prefijo: str) -> str:
+    """Patrón ILIKE 'prefijo%' con los comodines del texto escapados"""
+    texto = prefijo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{texto}%"
+
+def load_supabase_credentials() -> Tuple[str, str]:
+    """
+    Obtiene URL y service key de Supabase
+    
+    Returns:
+        Tupla (url, key)
+    """
+    # Intentar leer de Streamlit secrets primero (para Streamlit Cloud)
+    # Si no existe, usar variables de entorno (para desarrollo local)
+    url = None
+    key = None
+    
+    try:
+        import streamlit as st
+        url = st.secrets.get("SUPABASE_URL")
+        key = st.secrets.get("SUPABASE_SERVICE_KEY") or st.secrets.get("SUPABASE_KEY")
+        logger.info("✅ Usando secrets de Streamlit Cloud para Supabase")
+    except:
+        # Fallback a variables de entorno locales
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
+        logger.info("✅ Usando variables de entorno locales para Supabase")
+    
+    if not url or not key:
+        raise ValueError("SUPABASE_URL y SUPABASE_SERVICE_KEY deben estar configurados en .env")
+    
+    return url, key
+
 class SupabaseClient:
     """Cliente singleton para interactuar con Supabase"""
     
@@ -30,25 +260,7 @@ class SupabaseClient:
     def _initialize_client(self):
         """Inicializa el cliente de Supabase"""
         try:
-            # Intentar leer de Streamlit secrets primero (para Streamlit Cloud)
-            # Si no existe, usar variables de entorno (para desarrollo local)
-            url = None
-            key = None
-            
-            try:
-                import streamlit as st
-                url = st.secrets.get("SUPABASE_URL")
-                key = st.secrets.get("SUPABASE_SERVICE_KEY") or st.secrets.get("SUPABASE_KEY")
-                logger.info("✅ Usando secrets de Streamlit Cloud para Supabase")
-            except:
-                # Fallback a variables de entorno locales
-                url = os.getenv("SUPABASE_URL")
-                key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
-                logger.info("✅ Usando variables de entorno locales para Supabase")
-            
-            if not url or not key:
-                raise ValueError("SUPABASE_URL y SUPABASE_SERVICE_KEY deben estar configurados en .env")
-            
+            url, key = load_supabase_credentials()
             self._client = create_client(url, key)
             logger.info("Cliente de Supabase inicializado correctamente con service_role key")
         except Exception as e:
@@ -66,6 +278,7 @@ class SupabaseClient:
     # OPERACIONES CRUD - PACIENTES
     # =====================================================
     
+    @invalidates('pacientes')
     def crear_paciente(self, datos: Dict[str, Any]) -> Dict[str, Any]:
         """Crea un nuevo paciente"""
         try:
@@ -76,27 +289,120 @@ class SupabaseClient:
             logger.error(f"Error al crear paciente: {e}")
             raise
     
-    def obtener_paciente(self, paciente_id: str) -> Optional[Dict[str, Any]]:
+    @invalidates('pacientes')
+    def crear_pacientes(self, pacientes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Crea varios pacientes en una sola petición (INSERT de varias filas)
+        
+        Args:
+            pacientes: Filas de pacientes
+            
+        Returns:
+            Pacientes creados
+        """
+        try:
+            if not pacientes:
+                return []
+            
+            response = self.client.table('pacientes').insert(pacientes).execute()
+            logger.info(f"{len(pacientes)} pacientes creados en lote")
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al crear pacientes en lote: {e}")
+            raise
+    
+    @cached('pacientes')
+    def obtener_paciente(self, paciente_id: str, campos: Campos = 'full') -> Optional[Dict[str, Any]]:
         """Obtiene un paciente por ID"""
         try:
-            response = self.client.table('pacientes').select('*').eq('id', paciente_id).execute()
+            response = self.client.table('pacientes').select(proyeccion('pacientes', campos)).eq('id', paciente_id).execute()
             return response.data[0] if response.data else None
         except Exception as e:
             logger.error(f"Error al obtener paciente: {e}")
             raise
     
-    def listar_pacientes(self, activos_solo: bool = True) -> List[Dict[str, Any]]:
-        """Lista todos los pacientes"""
+    @cached('pacientes')
+    def listar_pacientes(
+        self,
+        activos_solo: bool = True,
+        campos: Campos = 'full',
+        limite: Optional[int] = None,
+        despues_de: Optional[Tuple[str, str]] = None,
+        prefijo: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Lista pacientes ordenados por (nombre_completo, id)
+        
+        Args:
+            activos_solo: Solo pacientes activos
+            campos: Proyección de columnas (debe incluir id y nombre_completo si se pagina)
+            limite: Tamaño de página (None para todos)
+            despues_de: Cursor (nombre_completo, id) del último paciente de la página anterior
+            prefijo: Filtrar por nombres que empiezan por este texto (sin distinguir mayúsculas)
+            
+        Returns:
+            Lista de pacientes
+        """
         try:
-            query = self.client.table('pacientes').select('*')
+            query = self.client.table('pacientes').select(proyeccion('pacientes', campos))
             if activos_solo:
                 query = query.eq('activo', True)
-            response = query.order('nombre_completo').execute()
+            if prefijo:
+                query = query.ilike('nombre_completo', patron_prefijo(prefijo))
+            if despues_de:
+                nombre, paciente_id = despues_de
+                query = query.or_(
+                    f"nombre_completo.gt.{valor_filtro(nombre)},"
+                    f"and(nombre_completo.eq.{valor_filtro(nombre)},id.gt.{paciente_id})"
+                )
+            query = query.order('nombre_completo').order('id')
+            if limite:
+                query = query.limit(limite)
+            response = query.execute()
             return response.data
         except Exception as e:
             logger.error(f"Error al listar pacientes: {e}")
             raise
     
+    @cached('pacientes')
+    def buscar_pacientes(self, texto: str, limite: int = 20, activos_solo: bool = True) -> List[Dict[str, Any]]:
+        """
+        Busca pacientes por nombre con la función buscar_pacientes (índice trigram)
+        
+        Args:
+            texto: Texto a buscar (subcadena o nombre aproximado)
+            limite: Número máximo de resultados
+            activos_solo: Solo pacientes activos
+            
+        Returns:
+            Pacientes (id, nombre_completo, tipo_em, edss_basal, similitud)
+            ordenados por relevancia
+        """
+        try:
+            response = self.client.rpc('buscar_pacientes', {
+                'p_texto': texto,
+                'p_limite': limite,
+                'p_activos_solo': activos_solo
+            }).execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al buscar pacientes: {e}")
+            raise
+    
+    @cached('pacientes')
+    def contar_pacientes(self, activos_solo: bool = True) -> int:
+        """Cuenta pacientes sin descargar las filas (count=exact, head)"""
+        try:
+            query = self.client.table('pacientes').select('id', count='exact', head=True)
+            if activos_solo:
+                query = query.eq('activo', True)
+            response = query.execute()
+            return response.count or 0
+        except Exception as e:
+            logger.error(f"Error al contar pacientes: {e}")
+            raise
+    
+    @invalidates('pacientes')
     def actualizar_paciente(self, paciente_id: str, datos: Dict[str, Any]) -> Dict[str, Any]:
         """Actualiza un paciente"""
         try:
@@ -111,50 +417,69 @@ class SupabaseClient:
     # OPERACIONES CRUD - CITAS
     # =====================================================
     
+    @invalidates('citas')
     def crear_cita(self, datos: Dict[str, Any]) -> Dict[str, Any]:
-        """Crea una nueva cita"""
+        """Crea una nueva cita (el número de visita lo asigna crear_cita_numerada en la base de datos)"""
         try:
-            # Obtener el siguiente número de visita
-            paciente_id = datos.get('paciente_id')
-            response = self.client.table('citas')\
-                .select('numero_visita')\
-                .eq('paciente_id', paciente_id)\
-                .order('numero_visita', desc=True)\
-                .limit(1)\
-                .execute()
-            
-            ultimo_numero = response.data[0]['numero_visita'] if response.data else 0
-            datos['numero_visita'] = ultimo_numero + 1
-            
-            response = self.client.table('citas').insert(datos).execute()
-            logger.info(f"Cita creada para paciente {paciente_id}, visita #{datos['numero_visita']}")
-            return response.data[0] if response.data else {}
+            # Numeración y alta en una sola llamada (evita duplicados con reservas simultáneas)
+            response = self.client.rpc('crear_cita_numerada', {'p_datos': datos}).execute()
+            cita = response.data if isinstance(response.data, dict) else (response.data[0] if response.data else {})
+            logger.info(f"Cita creada para paciente {datos.get('paciente_id')}, visita #{cita.get('numero_visita')}")
+            return cita
         except Exception as e:
             logger.error(f"Error al crear cita: {e}")
             raise
     
-    def obtener_cita(self, cita_id: str) -> Optional[Dict[str, Any]]:
+    @cached('citas')
+    def obtener_cita(self, cita_id: str, campos: Campos = 'full') -> Optional[Dict[str, Any]]:
         """Obtiene una cita por ID"""
         try:
-            response = self.client.table('citas').select('*').eq('id', cita_id).execute()
+            response = self.client.table('citas').select(proyeccion('citas', campos)).eq('id', cita_id).execute()
             return response.data[0] if response.data else None
         except Exception as e:
             logger.error(f"Error al obtener cita: {e}")
             raise
     
-    def listar_citas_paciente(self, paciente_id: str) -> List[Dict[str, Any]]:
-        """Lista todas las citas de un paciente"""
+    @cached('citas')
+    def listar_citas_paciente(
+        self,
+        paciente_id: str,
+        campos: Campos = 'full',
+        limite: Optional[int] = None,
+        despues_de: Optional[Tuple[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Lista las citas de un paciente, de la más reciente a la más antigua
+        
+        Args:
+            paciente_id: ID del paciente
+            campos: Proyección de columnas (debe incluir id y fecha_cita si se pagina)
+            limite: Tamaño de página (None para todas)
+            despues_de: Cursor (fecha_cita, id) de la última cita de la página anterior
+            
+        Returns:
+            Lista de citas
+        """
         try:
-            response = self.client.table('citas')\
-                .select('*')\
-                .eq('paciente_id', paciente_id)\
-                .order('fecha_cita', desc=True)\
-                .execute()
+            query = self.client.table('citas')\
+                .select(proyeccion('citas', campos))\
+                .eq('paciente_id', paciente_id)
+            if despues_de:
+                fecha, cita_id = despues_de
+                query = query.or_(
+                    f"fecha_cita.lt.{valor_filtro(fecha)},"
+                    f"and(fecha_cita.eq.{valor_filtro(fecha)},id.lt.{cita_id})"
+                )
+            query = query.order('fecha_cita', desc=True).order('id', desc=True)
+            if limite:
+                query = query.limit(limite)
+            response = query.execute()
             return response.data
         except Exception as e:
             logger.error(f"Error al listar citas: {e}")
             raise
     
+    @invalidates('citas')
     def actualizar_cita(self, cita_id: str, datos: Dict[str, Any]) -> Dict[str, Any]:
         """Actualiza una cita"""
         try:
@@ -165,14 +490,42 @@ class SupabaseClient:
             logger.error(f"Error al actualizar cita: {e}")
             raise
     
-    def obtener_citas_pendientes(self, dias_adelante: int = 2) -> List[Dict[str, Any]]:
+    def listar_citas_completadas(self, despues_de: Optional[str] = None, limite: int = 500) -> List[Dict[str, Any]]:
+        """
+        Lista citas completadas ordenadas por id, por bloques (paginación por clave)
+        
+        No usa la caché: está pensado para recorridos completos de la cohorte.
+        
+        Args:
+            despues_de: Último id de cita del bloque anterior (None para empezar)
+            limite: Tamaño máximo del bloque
+            
+        Returns:
+            Lista de citas con fecha_diagnostico y edss_basal del paciente embebidos
+        """
+        try:
+            query = self.client.table('citas')\
+                .select('id, paciente_id, fecha_cita, numero_visita, pacientes(fecha_diagnostico, edss_basal)')\
+                .eq('estado', 'completada')
+            
+            if despues_de:
+                query = query.gt('id', despues_de)
+            
+            response = query.order('id').limit(limite).execute()
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al listar citas completadas: {e}")
+            raise
+    
+    @cached('citas', 'pacientes', ttl=CacheConfig.RELATIVE_WINDOW_TTL)
+    def obtener_citas_pendientes(self, dias_adelante: int = 2, campos: Campos = 'full') -> List[Dict[str, Any]]:
         """Obtiene citas pendientes en los próximos N días"""
         try:
             from datetime import timedelta
             fecha_limite = (datetime.now() + timedelta(days=dias_adelante)).isoformat()
             
             response = self.client.table('citas')\
-                .select('*, pacientes(*)')\
+                .select(f"{proyeccion('citas', campos)}, pacientes({proyeccion('pacientes', campos)})")\
                 .eq('estado', 'pendiente')\
                 .lte('fecha_cita', fecha_limite)\
                 .execute()
@@ -181,10 +534,28 @@ class SupabaseClient:
             logger.error(f"Error al obtener citas pendientes: {e}")
             raise
     
+    @cached('citas', ttl=CacheConfig.RELATIVE_WINDOW_TTL)
+    def contar_citas_pendientes(self, dias_adelante: int = 2) -> int:
+        """Cuenta las citas pendientes en los próximos N días sin descargar las filas"""
+        try:
+            from datetime import timedelta
+            fecha_limite = (datetime.now() + timedelta(days=dias_adelante)).isoformat()
+            
+            response = self.client.table('citas')\
+                .select('id', count='exact', head=True)\
+                .eq('estado', 'pendiente')\
+                .lte('fecha_cita', fecha_limite)\
+                .execute()
+            return response.count or 0
+        except Exception as e:
+            logger.error(f"Error al contar citas pendientes: {e}")
+            raise
+    
     # =====================================================
     # OPERACIONES CRUD - INDICADORES
     # =====================================================
     
+    @invalidates('indicadores_cita')
     def guardar_indicador(self, datos: Dict[str, Any]) -> Dict[str, Any]:
         """Guarda un indicador clínico"""
         try:
@@ -199,11 +570,74 @@ class SupabaseClient:
             logger.error(f"Error al guardar indicador: {e}")
             raise
     
-    def obtener_indicadores_cita(self, cita_id: str) -> List[Dict[str, Any]]:
+    @invalidates('indicadores_cita')
+    def guardar_indicadores(self, indicadores: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Guarda varios indicadores en una sola petición (upsert por cita_id, indicador_tipo)
+        
+        Args:
+            indicadores: Filas de indicadores_cita
+            
+        Returns:
+            Filas guardadas
+        """
+        try:
+            if not indicadores:
+                return []
+            
+            response = self.client.table('indicadores_cita').upsert(
+                indicadores,
+                on_conflict='cita_id,indicador_tipo'
+            ).execute()
+            logger.info(f"{len(indicadores)} indicadores guardados en lote")
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al guardar indicadores en lote: {e}")
+            raise
+    
+    @invalidates('indicadores_cita', 'citas')
+    def guardar_indicadores_cita(
+        self,
+        cita_id: str,
+        indicadores: List[Dict[str, Any]],
+        completar_cita: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Guarda los indicadores de una cita y la marca como completada en una sola transacción
+        
+        Usa la función guardar_indicadores_cita de functions.sql: si cualquier
+        fila falla no queda guardado ningún indicador ni cambia el estado de la cita.
+        
+        Args:
+            cita_id: ID de la cita
+            indicadores: Filas de indicadores (el cita_id de cada fila se ignora)
+            completar_cita: Si se marca la cita como 'completada'
+            
+        Returns:
+            Indicadores guardados
+        """
+        try:
+            filas = [
+                {k: v for k, v in ind.items() if k != 'cita_id'}
+                for ind in indicadores
+            ]
+            response = self.client.rpc('guardar_indicadores_cita', {
+                'p_cita_id': cita_id,
+                'p_indicadores': filas,
+                'p_completar_cita': completar_cita
+            }).execute()
+            logger.info(f"{len(filas)} indicadores guardados para cita {cita_id}")
+            return response.data
+        except Exception as e:
+            logger.error(f"Error al guardar indicadores de la cita: {e}")
+            raise
+    
+    @cached('indicadores_cita')
+    def obtener_indicadores_cita(self, cita_id: str, campos: Campos = 'full') -> List[Dict[str, Any]]:
         """Obtiene todos los indicadores de una cita"""
         try:
             response = self.client.table('indicadores_cita')\
-                .select('*')\
+                .select(proyeccion('indicadores_cita', campos))\
                 .eq('cita_id', cita_id)\
                 .execute()
             return response.data
@@ -211,6 +645,49 @@ class SupabaseClient:
             logger.error(f"Error al obtener indicadores: {e}")
             raise
     
+    def _seleccionar_por_ids(self, tabla: str, columnas: str, campo: str, ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        SELECT ... WHERE campo IN (ids) completo, sin depender de max-rows ni del largo de la URL
+        
+        Trocea ids en bloques de DatabaseConfig.IN_CHUNK_SIZE y pagina cada bloque
+        (orden por id) hasta leer el total que informa count=exact.
+        
+        Raises:
+            RuntimeError: Si el servidor devuelve menos filas de las que cuenta
+        """
+        filas: List[Dict[str, Any]] = []
+        for inicio in range(0, len(ids), DatabaseConfig.IN_CHUNK_SIZE):
+            bloque = ids[inicio:inicio + DatabaseConfig.IN_CHUNK_SIZE]
+            leidas = 0
+            while True:
+                response = self.client.table(tabla)\
+                    .select(columnas, count='exact')\
+                    .in_(campo, bloque)\
+                    .order('id')\
+                    .range(leidas, leidas + DatabaseConfig.MAX_ROWS_PER_REQUEST - 1)\
+                    .execute()
+                filas.extend(response.data)
+                leidas += len(response.data)
+                if response.count is None or leidas >= response.count:
+                    break
+                if not response.data:
+                    raise RuntimeError(f"Lectura incompleta de {tabla}: {leidas} de {response.count} filas")
+        return filas
+    
+    @cached('indicadores_cita')
+    def obtener_indicadores_citas(self, cita_ids: List[str], campos: Campos = 'full') -> Dict[str, List[Dict[str, Any]]]:
+        """Obtiene los indicadores de varias citas, agrupados por cita_id (en bloques de DatabaseConfig.IN_CHUNK_SIZE citas)"""
+        try:
+            agrupados: Dict[str, List[Dict[str, Any]]] = {cita_id: [] for cita_id in cita_ids}
+            
+            for ind in self._seleccionar_por_ids('indicadores_cita', proyeccion('indicadores_cita', campos), 'cita_id', list(cita_ids)):
+                agrupados.setdefault(ind['cita_id'], []).append(ind)
+            return agrupados
+        except Exception as e:
+            logger.error(f"Error al obtener indicadores de citas: {e}")
+            raise
+    
+    @invalidates('indicadores_cita')
     def eliminar_indicadores_cita(self, cita_id: str) -> bool:
         """Elimina todos los indicadores de una cita (útil para recalcular desde cero)"""
         try:
@@ -225,31 +702,86 @@ class SupabaseClient:
             raise
 
     
-    def obtener_historial_indicadores(self, paciente_id: str, tipo_indicador: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Obtiene historial de indicadores de un paciente"""
+    @cached('indicadores_cita', 'citas')
+    def obtener_historial_indicadores(
+        self,
+        paciente_id: str,
+        tipo_indicador: Optional[str] = None,
+        campos: Campos = 'full',
+        desde: Optional[Union[date, datetime, str]] = None,
+        hasta: Optional[Union[date, datetime, str]] = None,
+        limite: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Obtiene historial de indicadores de un paciente, ordenado por fecha_cita ascendente
+        
+        Args:
+            paciente_id: ID del paciente
+            tipo_indicador: Filtrar por tipo de indicador
+            campos: Proyección de columnas de indicadores_cita
+            desde: Fecha de cita mínima (inclusive)
+            hasta: Fecha de cita máxima (inclusive)
+            limite: Devolver solo los N puntos más recientes
+            
+        Returns:
+            Indicadores con la cita embebida en 'citas'
+        """
         try:
             query = self.client.table('indicadores_cita')\
-                .select('*, citas!inner(fecha_cita, paciente_id, id)')\
+                .select(f"{proyeccion('indicadores_cita', campos)}, citas!inner(fecha_cita, paciente_id, id)")\
                 .eq('citas.paciente_id', paciente_id)
             
             if tipo_indicador:
                 query = query.eq('indicador_tipo', tipo_indicador)
+            if desde:
+                query = query.gte('citas.fecha_cita', fecha_iso(desde))
+            if hasta:
+                estricto, limite_fecha = limite_hasta(hasta)
+                query = query.lt('citas.fecha_cita', limite_fecha) if estricto \
+                    else query.lte('citas.fecha_cita', limite_fecha)
             
-            response = query.execute()
+            # Ordenar en el servidor por la fecha de la cita embebida; con límite
+            # se piden los más recientes y se devuelven en orden ascendente
+            query = query.order('citas(fecha_cita)', desc=bool(limite))
+            if limite:
+                query = query.limit(limite)
             
-            # Ordenar manualmente por fecha_cita después de obtener los datos
-            if response.data:
-                response.data.sort(key=lambda x: x.get('citas', {}).get('fecha_cita', ''))
+            response = query.execute()
+            if limite:
+                response.data.reverse()
             
             return response.data
         except Exception as e:
             logger.error(f"Error al obtener historial de indicadores: {e}")
             raise
     
+    @cached('indicadores_cita', 'citas')
+    def obtener_dashboard_paciente(self, paciente_id: str) -> Dict[str, Any]:
+        """
+        Obtiene los datos del dashboard de un paciente en una sola llamada
+        
+        Args:
+            paciente_id: ID del paciente
+            
+        Returns:
+            Diccionario con citas_completadas (ordenadas por fecha), series
+            ({tipo: [{fecha_cita, valor, estado}]}) y ultima_visita
+            (cita_id, numero_visita, fecha_cita, indicadores)
+        """
+        try:
+            response = self.client.rpc('obtener_dashboard_paciente', {
+                'p_paciente_id': paciente_id
+            }).execute()
+            return response.data or {}
+        except Exception as e:
+            logger.error(f"Error al obtener dashboard del paciente: {e}")
+            raise
+    
     # =====================================================
     # OPERACIONES CRUD - DIAGNÓSTICOS IA
     # =====================================================
     
+    @invalidates('diagnosticos_ia')
     def guardar_diagnostico_ia(self, datos: Dict[str, Any]) -> Dict[str, Any]:
         """Guarda un diagnóstico de IA"""
         try:
@@ -260,11 +792,12 @@ class SupabaseClient:
             logger.error(f"Error al guardar diagnóstico IA: {e}")
             raise
     
-    def obtener_diagnostico_ia(self, cita_id: str) -> Optional[Dict[str, Any]]:
+    @cached('diagnosticos_ia')
+    def obtener_diagnostico_ia(self, cita_id: str, campos: Campos = 'full') -> Optional[Dict[str, Any]]:
         """Obtiene el diagnóstico IA de una cita"""
         try:
             response = self.client.table('diagnosticos_ia')\
-                .select('*')\
+                .select(proyeccion('diagnosticos_ia', campos))\
                 .eq('cita_id', cita_id)\
                 .execute()
             return response.data[0] if response.data else None
@@ -276,6 +809,7 @@ class SupabaseClient:
     # OPERACIONES - MÉTRICAS IA
     # =====================================================
     
+    @cached('diagnosticos_ia')
     def calcular_metricas_ia(self, fecha_inicio: Optional[date] = None, fecha_fin: Optional[date] = None) -> Dict[str, Any]:
         """Calcula métricas de precisión de las IAs"""
         try:
@@ -292,6 +826,27 @@ class SupabaseClient:
             logger.error(f"Error al calcular métricas IA: {e}")
             raise
     
+    @cached('pacientes', 'citas', 'diagnosticos_ia', ttl=CacheConfig.RELATIVE_WINDOW_TTL)
+    def obtener_estadisticas_inicio(self, dias_adelante: int = 30) -> Dict[str, int]:
+        """
+        Obtiene las estadísticas de la página principal en una sola llamada
+        
+        Args:
+            dias_adelante: Ventana de días para contar citas próximas
+            
+        Returns:
+            Diccionario con pacientes_activos, citas_proximas y total_consultas_ia
+        """
+        try:
+            response = self.client.rpc('obtener_estadisticas_inicio', {
+                'p_dias_adelante': dias_adelante
+            }).execute()
+            return response.data[0] if response.data else {}
+        except Exception as e:
+            logger.error(f"Error al obtener estadísticas de inicio: {e}")
+            raise
+    
+    @invalidates('metricas_ia')
     def guardar_metricas_ia(self, datos: Dict[str, Any]) -> Dict[str, Any]:
         """Guarda métricas de IA calculadas"""
         try:
@@ -302,11 +857,12 @@ class SupabaseClient:
             logger.error(f"Error al guardar métricas IA: {e}")
             raise
     
-    def obtener_historial_metricas_ia(self, limite: int = 30) -> List[Dict[str, Any]]:
+    @cached('metricas_ia')
+    def obtener_historial_metricas_ia(self, limite: int = 30, campos: Campos = 'full') -> List[Dict[str, Any]]:
         """Obtiene historial de métricas de IA"""
         try:
             response = self.client.table('metricas_ia')\
-                .select('*')\
+                .select(proyeccion('metricas_ia', campos))\
                 .order('fecha_calculo', desc=True)\
                 .limit(limite)\
                 .execute()
@@ -314,6 +870,159 @@ class SupabaseClient:
         except Exception as e:
             logger.error(f"Error al obtener auditoría: {e}")
             raise
-
-# Instancia global del cliente
-db = SupabaseClient()
+    
+    # =====================================================
+    # LECTURA POR BLOQUES (TABLAS COMPLETAS)
+    # =====================================================
+    
+    def _iter_tabla(
+        self,
+        tabla: str,
+        campos: Campos,
+        filtros: Dict[str, Any],
+        bloque: int
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorre una tabla por bloques ordenados por id (paginación por clave)
+        
+        Solo hay un bloque en memoria a la vez y no usa la caché. Termina con la
+        primera página vacía, así que un tope de filas de PostgREST menor que
+        `bloque` no corta el recorrido.
+        
+        Args:
+            tabla: Tabla a recorrer
+            campos: Proyección de columnas (debe incluir id)
+            filtros: Igualdades columna -> valor
+            bloque: Filas por petición
+        
+        Yields:
+            Listas de hasta `bloque` filas
+        """
+        despues_de = None
+        while True:
+            query = self.client.table(tabla).select(proyeccion(tabla, campos))
+            for columna, valor in filtros.items():
+                query = query.eq(columna, valor)
+            if despues_de:
+                query = query.gt('id', despues_de)
+            
+            filas = query.order('id').limit(bloque).execute().data
+            if not filas:
+                return
+            yield filas
+            despues_de = filas[-1]['id']
+    
+    def iter_pacientes(
+        self,
+        activos_solo: bool = True,
+        campos: Campos = 'full',
+        bloque: int = DatabaseConfig.STREAM_CHUNK_SIZE
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorre todos los pacientes por bloques, con memoria acotada
+        
+        Args:
+            activos_solo: Solo pacientes activos
+            campos: Proyección de columnas (debe incluir id)
+            bloque: Filas por bloque
+        
+        Yields:
+            Listas de pacientes ordenados por id
+        """
+        try:
+            filtros = {'activo': True} if activos_solo else {}
+            yield from self._iter_tabla('pacientes', campos, filtros, bloque)
+        except Exception as e:
+            logger.error(f"Error al recorrer pacientes: {e}")
+            raise
+    
+    def iter_citas(
+        self,
+        estado: Optional[str] = None,
+        paciente_id: Optional[str] = None,
+        campos: Campos = 'full',
+        bloque: int = DatabaseConfig.STREAM_CHUNK_SIZE
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorre todas las citas por bloques, con memoria acotada
+        
+        Args:
+            estado: Filtrar por estado ('pendiente', 'completada', 'cancelada')
+            paciente_id: Filtrar por paciente
+            campos: Proyección de columnas (debe incluir id)
+            bloque: Filas por bloque
+        
+        Yields:
+            Listas de citas ordenadas por id
+        """
+        try:
+            filtros = {}
+            if estado:
+                filtros['estado'] = estado
+            if paciente_id:
+                filtros['paciente_id'] = paciente_id
+            yield from self._iter_tabla('citas', campos, filtros, bloque)
+        except Exception as e:
+            logger.error(f"Error al recorrer citas: {e}")
+            raise
+    
+    def iter_indicadores(
+        self,
+        indicador_tipo: Optional[str] = None,
+        campos: Campos = 'full',
+        bloque: int = DatabaseConfig.STREAM_CHUNK_SIZE
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorre todos los indicadores por bloques, con memoria acotada
+        
+        Args:
+            indicador_tipo: Filtrar por tipo de indicador
+            campos: Proyección de columnas de indicadores_cita (debe incluir id)
+            bloque: Filas por bloque
+        
+        Yields:
+            Listas de indicadores ordenados por id
+        """
+        try:
+            filtros = {'indicador_tipo': indicador_tipo} if indicador_tipo else {}
+            yield from self._iter_tabla('indicadores_cita', campos, filtros, bloque)
+        except Exception as e:
+            logger.error(f"Error al recorrer indicadores: {e}")
+            raise
+    
+    def iter_diagnosticos_ia(
+        self,
+        ia_seleccionada: Optional[str] = None,
+        campos: Campos = 'full',
+        bloque: int = DatabaseConfig.STREAM_CHUNK_SIZE
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Recorre todos los diagnósticos de IA por bloques, con memoria acotada
+        
+        Args:
+            ia_seleccionada: Filtrar por IA seleccionada ('deepseek', 'copilot', 'medico')
+            campos: Proyección de columnas de diagnosticos_ia (debe incluir id)
+            bloque: Filas por bloque
+            
+        Yields:
+            Listas de diagnósticos ordenados por id
+        """
+        try:
+            filtros = {'ia_seleccionada': ia_seleccionada} if ia_seleccionada else {}
+            yield from self._iter_tabla('diagnosticos_ia', campos, filtros, bloque)
+        except Exception as e:
+            logger.error(f"Error al recorrer diagnósticos IA: {e}")
+            raise
+    
+    # =====================================================
+    # CACHÉ
+    # =====================================================
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Retorna los contadores de la caché de lecturas (hits, misses, evictions...)"""
+        return query_cache.stats()
+    
+    def limpiar_cache(self) -> None:
+        """Vacía la caché de lecturas"""
+        query_cache.clear()
+        logger.info("Caché de consultas vaciada")
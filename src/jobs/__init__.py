@@ -0,0 +1,21 @@
+"""
+Procesos por lotes sobre la cohorte
+
+Los módulos se importan bajo demanda (PEP 562): se ejecutan con `python -m
+src.jobs.<módulo>` y no deben estar ya cargados al importar el paquete.
+"""
+from importlib import import_module
+
+_EXPORTACIONES = {
+    'IndicatorRecomputeJob': '.recompute_indicators',
+    'ParquetExportJob': '.export_parquet',
+    'PatientImportJob': '.import_patients',
+}
+
+__all__ = list(_EXPORTACIONES)
+
+
+def __getattr__(nombre: str):
+    if nombre not in _EXPORTACIONES:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    return getattr(import_module(_EXPORTACIONES[nombre], __name__), nombre)
@@ -0,0 +1,441 @@
+"""
+Exportación de la cohorte clínica a Parquet particionado
+
+Recorre pacientes, citas, indicadores_cita y diagnosticos_ia con los lectores por
+bloques de db (iter_pacientes, iter_citas, ...) y escribe cada tabla en un
+directorio con particiones estilo Hive, por ejemplo:
+
+    indicadores_cita/indicador_tipo=ARR/part-0.parquet
+
+Cada bloque se convierte a Arrow en cuanto llega; las filas se acumulan por
+partición hasta JobConfig.EXPORT_ROW_GROUP_SIZE y se escriben como un grupo de
+filas con un ParquetWriter abierto por partición. La memoria depende del tamaño
+de grupo, no del tamaño de la cohorte.
+
+Columnas con tipo: EDSS y valores como Decimal, estados y tipos como
+diccionario, fechas como date32 y marcas de tiempo como timestamp UTC. Los
+JSONB se guardan como texto JSON. nombre_completo solo se exporta con
+--incluir-identificadores.
+
+Requiere pyarrow (pip install pyarrow).
+
+Uso:
+    python -m src.jobs.export_parquet [--salida DIR] [--tablas indicadores_cita ...] [--incluir-identificadores]
+    python -m src.jobs.export_parquet --benchmark 10000000
+"""
+import argparse
+import json
+import random
+import shutil
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from config import DatabaseConfig, EstadoIndicador, JobConfig, JustificationMessages, TipoIndicador
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow solo es necesario para exportar
+    pa = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Columnas exportadas por tabla: (nombre, tipo lógico)
+COLUMNAS: Dict[str, List[Tuple[str, str]]] = {
+    'pacientes': [
+        ('id', 'uuid'), ('nombre_completo', 'texto'), ('edad', 'int16'), ('genero', 'categoria'),
+        ('tipo_em', 'categoria'), ('edss_basal', 'decimal(3,1)'), ('tratamiento_actual', 'categoria'),
+        ('fecha_diagnostico', 'fecha'), ('historial_medico', 'json'), ('medico_asignado_id', 'uuid'),
+        ('activo', 'bool'), ('created_at', 'marca'), ('updated_at', 'marca')
+    ],
+    'citas': [
+        ('id', 'uuid'), ('paciente_id', 'uuid'), ('fecha_cita', 'marca'), ('numero_visita', 'int16'),
+        ('estado', 'categoria'), ('notas_medicas', 'texto'), ('created_at', 'marca'), ('updated_at', 'marca')
+    ],
+    'indicadores_cita': [
+        ('id', 'uuid'), ('cita_id', 'uuid'), ('indicador_tipo', 'categoria'), ('valor_calculado', 'decimal(10,2)'),
+        ('estado', 'categoria'), ('justificacion_texto', 'texto'), ('variables_entrada', 'json'),
+        ('created_at', 'marca')
+    ],
+    'diagnosticos_ia': [
+        ('id', 'uuid'), ('cita_id', 'uuid'), ('diagnostico_deepseek', 'texto'),
+        ('confianza_deepseek', 'decimal(3,1)'), ('diagnostico_copilot', 'texto'),
+        ('confianza_copilot', 'decimal(3,1)'), ('ia_seleccionada', 'categoria'),
+        ('diagnostico_medico_override', 'texto'), ('justificacion_medico', 'texto'), ('created_at', 'marca')
+    ]
+}
+
+# Identificadores directos del paciente (fuera de la exportación salvo que se pidan)
+IDENTIFICADORES = {'pacientes': ['nombre_completo']}
+
+def _tipo_arrow(tipo: str, origen: bool = False) -> Any:
+    """
+    Tipo de Arrow de una columna
+    
+    Args:
+        tipo: Tipo lógico de COLUMNAS
+        origen: Tipo de los valores tal como llegan de la base de datos
+            (texto ISO, números en coma flotante) en lugar del tipo final
+    
+    Returns:
+        pyarrow.DataType
+    """
+    if tipo.startswith('decimal'):
+        precision, escala = (int(x) for x in tipo[len('decimal('):-1].split(','))
+        return pa.float64() if origen else pa.decimal128(precision, escala)
+    if tipo in ('int16', 'int32'):
+        return pa.int64() if origen else getattr(pa, tipo)()
+    if tipo == 'bool':
+        return pa.bool_()
+    if origen:
+        return pa.string()
+    return {
+        'fecha': pa.date32(),
+        'marca': pa.timestamp('us', tz='UTC'),
+        'categoria': pa.dictionary(pa.int32(), pa.string())
+    }.get(tipo, pa.string())
+
+def filas_a_tabla(filas: List[Dict[str, Any]], columnas: List[Tuple[str, str]]) -> 'pa.Table':
+    """
+    Convierte filas con formato de PostgREST a una tabla de Arrow con tipo
+    
+    Args:
+        filas: Filas de un bloque (dict columna -> valor JSON)
+        columnas: Columnas a exportar y su tipo lógico
+    
+    Returns:
+        Tabla de Arrow con las columnas en el orden de `columnas`
+    """
+    arrays = []
+    for nombre, tipo in columnas:
+        valores = [fila.get(nombre) for fila in filas]
+        if tipo == 'json':
+            valores = [v if v is None or isinstance(v, str) else json.dumps(v, ensure_ascii=False) for v in valores]
+        arrays.append(pa.array(valores, type=_tipo_arrow(tipo, origen=True)).cast(_tipo_arrow(tipo)))
+    return pa.Table.from_arrays(arrays, names=[nombre for nombre, _ in columnas])
+
+def pico_rss_mb() -> Optional[float]:
+    """Memoria residente máxima del proceso en MB (None si no está disponible)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB y macOS en bytes
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+class PartitionedParquetWriter:
+    """
+    Escritor incremental de una tabla en particiones estilo Hive
+    
+    Mantiene un ParquetWriter abierto y un búfer de tablas de Arrow por valor de
+    la columna de partición; el búfer se vuelca como un grupo de filas al
+    llegar a `row_group_size`.
+    """
+    
+    def __init__(
+        self,
+        directorio: Path,
+        columna_particion: str,
+        row_group_size: int = JobConfig.EXPORT_ROW_GROUP_SIZE,
+        compression: str = JobConfig.EXPORT_COMPRESSION
+    ):
+        self.directorio = Path(directorio)
+        self.columna_particion = columna_particion
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self._escritores: Dict[str, Any] = {}
+        self._buferes: Dict[str, List[Any]] = {}
+        self.filas: Dict[str, int] = {}
+    
+    def write(self, tabla: 'pa.Table') -> None:
+        """Reparte un bloque entre sus particiones (la columna de partición no se guarda en el fichero)"""
+        columna = tabla.column(self.columna_particion).cast(pa.string())
+        for valor in pc.unique(columna).to_pylist():
+            mascara = pc.is_null(columna) if valor is None else pc.equal(columna, valor)
+            parte = tabla.filter(mascara).drop_columns([self.columna_particion])
+            clave = '__HIVE_DEFAULT_PARTITION__' if valor is None else valor
+            
+            bufer = self._buferes.setdefault(clave, [])
+            bufer.append(parte)
+            self.filas[clave] = self.filas.get(clave, 0) + parte.num_rows
+            if sum(t.num_rows for t in bufer) >= self.row_group_size:
+                self._flush(clave)
+    
+    def _flush(self, clave: str) -> None:
+        """Escribe el búfer de una partición como uno o varios grupos de filas"""
+        bufer = self._buferes.pop(clave, [])
+        if not bufer:
+            return
+        tabla = pa.concat_tables(bufer)
+        
+        escritor = self._escritores.get(clave)
+        if escritor is None:
+            destino = self.directorio / f"{self.columna_particion}={clave}"
+            destino.mkdir(parents=True, exist_ok=True)
+            escritor = pq.ParquetWriter(destino / 'part-0.parquet', tabla.schema, compression=self.compression)
+            self._escritores[clave] = escritor
+        escritor.write_table(tabla, row_group_size=self.row_group_size)
+    
+    def close(self) -> Dict[str, int]:
+        """
+        Vuelca los búferes pendientes y cierra los ficheros
+        
+        Returns:
+            Filas escritas por valor de partición
+        """
+        for clave in list(self._buferes):
+            self._flush(clave)
+        for escritor in self._escritores.values():
+            escritor.close()
+        self._escritores.clear()
+        return dict(self.filas)
+
+class ParquetExportJob:
+    """
+    Exportación por bloques de las tablas clínicas a Parquet particionado
+    """
+    
+    TABLAS = ['pacientes', 'citas', 'indicadores_cita', 'diagnosticos_ia']
+    
+    def __init__(
+        self,
+        output_dir: str = JobConfig.EXPORT_OUTPUT_DIR,
+        chunk_size: int = DatabaseConfig.STREAM_CHUNK_SIZE,
+        row_group_size: int = JobConfig.EXPORT_ROW_GROUP_SIZE,
+        compression: str = JobConfig.EXPORT_COMPRESSION,
+        incluir_identificadores: bool = False
+    ):
+        if pa is None:
+            raise ImportError("La exportación a Parquet requiere pyarrow (pip install pyarrow)")
+        self.output_dir = Path(output_dir)
+        self.chunk_size = chunk_size
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.incluir_identificadores = incluir_identificadores
+    
+    def columnas(self, tabla: str) -> List[Tuple[str, str]]:
+        """Columnas exportadas de una tabla (sin identificadores directos salvo que se pidan)"""
+        excluidas = set() if self.incluir_identificadores else set(IDENTIFICADORES.get(tabla, []))
+        return [(nombre, tipo) for nombre, tipo in COLUMNAS[tabla] if nombre not in excluidas]
+    
+    def read_table(self, tabla: str) -> Iterator[List[Dict[str, Any]]]:
+        """Lee una tabla completa por bloques con los lectores iter_* de db"""
+        # Importación diferida: --benchmark no necesita credenciales de la base
+        from src.database import db
+        
+        campos = [nombre for nombre, _ in self.columnas(tabla)]
+        lectores = {
+            'pacientes': lambda: db.iter_pacientes(activos_solo=False, campos=campos, bloque=self.chunk_size),
+            'citas': lambda: db.iter_citas(campos=campos, bloque=self.chunk_size),
+            'indicadores_cita': lambda: db.iter_indicadores(campos=campos, bloque=self.chunk_size),
+            'diagnosticos_ia': lambda: db.iter_diagnosticos_ia(campos=campos, bloque=self.chunk_size)
+        }
+        return lectores[tabla]()
+    
+    def export_table(self, tabla: str, bloques: Iterable[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Escribe una tabla a partir de sus bloques de filas
+        
+        Se escribe en un directorio temporal que sustituye al anterior solo si
+        la exportación termina, de modo que un fallo no deja datos a medias.
+        
+        Args:
+            tabla: Nombre de la tabla (clave de COLUMNAS)
+            bloques: Iterable de listas de filas con formato de PostgREST
+        
+        Returns:
+            Estadísticas: filas, particiones, segundos, filas_s, mb y pico_rss_mb
+        """
+        destino = self.output_dir / tabla
+        temporal = self.output_dir / f".{tabla}.tmp"
+        if temporal.exists():
+            shutil.rmtree(temporal)
+        
+        columnas = self.columnas(tabla)
+        escritor = PartitionedParquetWriter(
+            temporal,
+            JobConfig.EXPORT_PARTITIONS[tabla],
+            row_group_size=self.row_group_size,
+            compression=self.compression
+        )
+        
+        inicio = time.perf_counter()
+        total = 0
+        try:
+            for filas in bloques:
+                escritor.write(filas_a_tabla(filas, columnas))
+                total += len(filas)
+        finally:
+            particiones = escritor.close()
+        
+        if destino.exists():
+            shutil.rmtree(destino)
+        temporal.rename(destino)
+        
+        duracion = time.perf_counter() - inicio
+        estadisticas = {
+            'filas': total,
+            'particiones': particiones,
+            'segundos': round(duracion, 2),
+            'filas_s': round(total / duracion) if duracion else 0,
+            'mb': round(sum(f.stat().st_size for f in destino.rglob('*.parquet')) / 1024 / 1024, 2),
+            'pico_rss_mb': pico_rss_mb()
+        }
+        logger.info(
+            f"{tabla}: {total} filas en {duracion:.1f}s ({estadisticas['filas_s']} filas/s), "
+            f"{len(particiones)} particiones, {estadisticas['mb']} MB"
+        )
+        return estadisticas
+    
+    def run(self, tablas: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Exporta las tablas indicadas (todas por defecto) y escribe manifest.json
+        
+        Returns:
+            Estadísticas por tabla
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        resultado = {}
+        for tabla in tablas or self.TABLAS:
+            resultado[tabla] = self.export_table(tabla, self.read_table(tabla))
+        
+        manifiesto = {
+            'exportado': datetime.now(timezone.utc).isoformat(),
+            'identificadores': self.incluir_identificadores,
+            'tablas': {
+                tabla: {
+                    'particion': JobConfig.EXPORT_PARTITIONS[tabla],
+                    'columnas': dict(self.columnas(tabla)),
+                    **estadisticas
+                }
+                for tabla, estadisticas in resultado.items()
+            }
+        }
+        with open(self.output_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+        
+        return resultado
+
+# =====================================================
+# BENCHMARK
+# =====================================================
+
+def indicadores_sinteticos(total: int, bloque: int, seed: int = JobConfig.COHORT_SEED) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Genera filas de indicadores_cita con el formato de PostgREST, sin base de datos
+    
+    Args:
+        total: Número de filas
+        bloque: Filas por bloque
+        seed: Semilla del generador
+    
+    Yields:
+        Bloques de filas (cinco indicadores por cita)
+    """
+    rng = random.Random(seed)
+    tipos = [t.value for t in TipoIndicador]
+    estados = [e.value for e in EstadoIndicador]
+    justificaciones = {
+        tipo: {estado: getattr(JustificationMessages, clave).get(estado, '') for estado in estados}
+        for tipo, clave in zip(tipos, ['ARR', 'T1_GD', 'T2_NUEVAS', 'CDP12', 'NEDA3'])
+    }
+    origen = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    # Valores aleatorios precalculados: el benchmark debe medir la exportación, no random
+    aleatorios = [(rng.randrange(len(estados)), round(rng.random() * 3, 2), rng.randrange(4)) for _ in range(4099)]
+    
+    for inicio in range(0, total, bloque):
+        filas = []
+        for i in range(inicio, min(total, inicio + bloque)):
+            cita = i // len(tipos)
+            tipo = tipos[i % len(tipos)]
+            estado, valor, recaidas = aleatorios[i % len(aleatorios)]
+            filas.append({
+                'id': '%08x-0000-4000-8000-%012x' % (seed, i + 1),
+                'cita_id': '%08x-0000-4000-9000-%012x' % (seed, cita + 1),
+                'indicador_tipo': tipo,
+                'valor_calculado': valor,
+                'estado': estados[estado],
+                'justificacion_texto': justificaciones[tipo][estados[estado]],
+                'variables_entrada': {'recaidas': recaidas, 'edss_actual': (cita % 20) / 2},
+                'created_at': (origen + timedelta(minutes=cita)).isoformat()
+            })
+        yield filas
+
+def benchmark(total: int, output_dir: str, chunk_size: int = DatabaseConfig.STREAM_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Mide filas/s y memoria máxima exportando `total` indicadores sintéticos
+    
+    El tiempo de generación de las filas se mide aparte y se descuenta en
+    filas_s_exportacion (conversión a Arrow, particionado y escritura).
+    """
+    generacion = 0.0
+    
+    def bloques_medidos() -> Iterator[List[Dict[str, Any]]]:
+        nonlocal generacion
+        bloques = indicadores_sinteticos(total, chunk_size)
+        while True:
+            inicio = time.perf_counter()
+            filas = next(bloques, None)
+            generacion += time.perf_counter() - inicio
+            if filas is None:
+                return
+            yield filas
+    
+    job = ParquetExportJob(output_dir=output_dir, chunk_size=chunk_size)
+    job.output_dir.mkdir(parents=True, exist_ok=True)
+    estadisticas = job.export_table('indicadores_cita', bloques_medidos())
+    
+    exportacion = estadisticas['segundos'] - generacion
+    estadisticas['segundos_generacion'] = round(generacion, 2)
+    estadisticas['filas_s_exportacion'] = round(total / exportacion) if exportacion > 0 else 0
+    logger.info(
+        f"Benchmark: {estadisticas['filas']} indicadores, {estadisticas['filas_s']} filas/s "
+        f"({estadisticas['filas_s_exportacion']} filas/s sin generación), "
+        f"pico RSS {estadisticas['pico_rss_mb']} MB, {estadisticas['mb']} MB en disco"
+    )
+    return estadisticas
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Exporta la cohorte clínica a Parquet particionado")
+    parser.add_argument('--salida', default=JobConfig.EXPORT_OUTPUT_DIR, help="Directorio de salida")
+    parser.add_argument('--tablas', nargs='+', choices=ParquetExportJob.TABLAS, help="Tablas a exportar (todas por defecto)")
+    parser.add_argument('--bloque', type=int, default=DatabaseConfig.STREAM_CHUNK_SIZE, help="Filas por lectura")
+    parser.add_argument('--grupo', type=int, default=JobConfig.EXPORT_ROW_GROUP_SIZE, help="Filas por grupo de Parquet")
+    parser.add_argument('--incluir-identificadores', action='store_true', help="Exportar también nombre_completo")
+    parser.add_argument('--benchmark', type=int, metavar='N', help="Exportar N indicadores sintéticos y medir filas/s y memoria")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.benchmark:
+            print(json.dumps(benchmark(args.benchmark, args.salida, args.bloque), indent=2))
+            return 0
+        
+        job = ParquetExportJob(
+            output_dir=args.salida,
+            chunk_size=args.bloque,
+            row_group_size=args.grupo,
+            incluir_identificadores=args.incluir_identificadores
+        )
+        job.run(args.tablas)
+        return 0
+    except Exception as e:
+        logger.error(f"Error en la exportación a Parquet: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,417 @@
+"""
+Importación masiva de pacientes desde CSV o Excel
+
+Lee el fichero fila a fila (csv.DictReader u openpyxl en modo read_only), valida
+cada bloque de JobConfig.IMPORT_BATCH_SIZE filas con el modelo Patient (un solo
+TypeAdapter por bloque, ver validar_lote_con_errores) y guarda
+las válidas con una sola operación por bloque:
+
+- DB_BACKEND=postgres: COPY FROM STDIN (db.copiar_filas)
+- Supabase: un INSERT de varias filas por petición (db.crear_pacientes)
+
+Una fila inválida no detiene el bloque: su error se anota con el número de fila
+del fichero y se escribe en un CSV de errores al terminar. Si la base de datos
+rechaza un bloque, ese bloque se reintenta fila a fila para localizar las filas
+culpables.
+
+Cabeceras admitidas: los campos de Patient (nombre_completo, edad, genero,
+tipo_em, edss_basal, tratamiento_actual, fecha_diagnostico, medico_asignado_id,
+activo) sin distinguir mayúsculas ni tildes, algunos alias (nombre, sexo, edss,
+tratamiento...) y 'antecedentes', que se guarda en historial_medico como en el
+formulario de alta. Fechas en ISO o DD/MM/AAAA; EDSS con coma o punto decimal.
+
+Excel requiere openpyxl (pip install openpyxl).
+
+Uso:
+    python -m src.jobs.import_patients pacientes.csv [--bloque 500] [--simular] [--errores errores.csv]
+"""
+import argparse
+import codecs
+import csv
+import io
+import json
+import re
+import sys
+import time
+import unicodedata
+from datetime import date, datetime
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from loguru import logger
+
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from config import JobConfig
+from src.database import db, PostgresClient
+from src.models.patient import Patient, validar_lote_con_errores
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl solo es necesario para importar Excel
+    openpyxl = None
+
+# Columnas de pacientes que se importan (id y marcas de tiempo las pone la base de datos)
+CAMPOS = [
+    'nombre_completo', 'edad', 'genero', 'tipo_em', 'edss_basal', 'tratamiento_actual',
+    'fecha_diagnostico', 'historial_medico', 'medico_asignado_id', 'activo'
+]
+
+# Cabeceras alternativas (ya normalizadas) -> campo de Patient
+ALIAS = {
+    'nombre': 'nombre_completo',
+    'paciente': 'nombre_completo',
+    'sexo': 'genero',
+    'tipo': 'tipo_em',
+    'tipo_de_em': 'tipo_em',
+    'edss': 'edss_basal',
+    'tratamiento': 'tratamiento_actual',
+    'dmt': 'tratamiento_actual',
+    'fecha_de_diagnostico': 'fecha_diagnostico',
+    'medico': 'medico_asignado_id',
+    'antecedentes_clinicos': 'antecedentes'
+}
+
+FECHA_DMA = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+
+BOOLEANOS = {'si': True, 'sí': True, 's': True, 'no': False, 'n': False}
+
+Progreso = Callable[[Dict[str, Any]], None]
+
+# =====================================================
+# LECTURA
+# =====================================================
+
+def normalizar_cabecera(cabecera: Any) -> str:
+    """'Fecha de Diagnóstico ' -> 'fecha_de_diagnostico' (y aplica ALIAS)"""
+    texto = unicodedata.normalize('NFKD', str(cabecera or '')).encode('ascii', 'ignore').decode()
+    texto = re.sub(r'[\s\-]+', '_', texto.strip().lower())
+    return ALIAS.get(texto, texto)
+
+
+def _abrir(origen: Union[str, Path, IO[bytes]]) -> IO[bytes]:
+    """Abre una ruta en binario o devuelve el objeto de fichero recibido (p. ej. un UploadedFile de Streamlit)"""
+    return open(origen, 'rb') if isinstance(origen, (str, Path)) else origen
+
+
+def leer_csv(origen: Union[str, Path, IO[bytes]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Lee un CSV fila a fila detectando el separador (',' o ';')
+    
+    Args:
+        origen: Ruta o fichero binario
+    
+    Yields:
+        Tuplas (número de fila en el fichero, fila con cabeceras normalizadas)
+    """
+    fichero = _abrir(origen)
+    muestra = fichero.read(8192)
+    fichero.seek(0)
+    try:
+        # Los CSV guardados con Excel en Windows suelen venir en cp1252
+        codecs.getincrementaldecoder('utf-8')().decode(muestra)
+        codificacion = 'utf-8-sig'
+    except UnicodeDecodeError:
+        codificacion = 'cp1252'
+    
+    texto = io.TextIOWrapper(fichero, encoding=codificacion, newline='')
+    try:
+        try:
+            dialecto = csv.Sniffer().sniff(texto.read(8192), delimiters=',;\t')
+        except csv.Error:
+            dialecto = csv.excel
+        texto.seek(0)
+        
+        lector = csv.DictReader(texto, dialect=dialecto)
+        lector.fieldnames = [normalizar_cabecera(c) for c in lector.fieldnames or []]
+        for fila in lector:
+            yield lector.line_num, fila
+    finally:
+        if isinstance(origen, (str, Path)):
+            texto.close()
+        else:
+            texto.detach()  # El fichero recibido sigue abierto para quien lo pasó
+
+
+def leer_excel(origen: Union[str, Path, IO[bytes]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Lee la primera hoja de un Excel fila a fila (openpyxl en modo read_only)
+    
+    Args:
+        origen: Ruta o fichero binario
+    
+    Yields:
+        Tuplas (número de fila en la hoja, fila con cabeceras normalizadas)
+    """
+    if openpyxl is None:
+        raise ImportError("La importación desde Excel requiere openpyxl (pip install openpyxl)")
+    
+    libro = openpyxl.load_workbook(_abrir(origen), read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        cabeceras = [normalizar_cabecera(c) for c in next(filas, ())]
+        for numero, valores in enumerate(filas, start=2):
+            if all(v is None for v in valores):
+                continue
+            yield numero, dict(zip(cabeceras, valores))
+    finally:
+        libro.close()
+
+
+def leer_filas(origen: Union[str, Path, IO[bytes]], nombre: Optional[str] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Lee un CSV o un Excel según la extensión de nombre (o de la ruta)
+    
+    Args:
+        origen: Ruta o fichero binario
+        nombre: Nombre del fichero cuando origen no es una ruta
+    
+    Yields:
+        Tuplas (número de fila, fila con cabeceras normalizadas)
+    """
+    nombre = nombre or getattr(origen, 'name', None) or str(origen)
+    if Path(nombre).suffix.lower() in ('.xlsx', '.xlsm'):
+        return leer_excel(origen)
+    return leer_csv(origen)
+
+# =====================================================
+# LIMPIEZA Y VALIDACIÓN
+# =====================================================
+
+def limpiar_fila(fila: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convierte una fila del fichero en los datos de entrada de Patient
+    
+    Descarta columnas desconocidas, convierte celdas vacías en None, acepta
+    coma decimal en el EDSS, fechas DD/MM/AAAA y 'sí'/'no' en activo, y guarda
+    'antecedentes' en historial_medico como hace el formulario de alta.
+    """
+    valores = {
+        clave: (valor.strip() or None) if isinstance(valor, str) else valor
+        for clave, valor in fila.items()
+        if clave
+    }
+    datos = {campo: valores[campo] for campo in CAMPOS if valores.get(campo) is not None}
+    
+    if isinstance(datos.get('edss_basal'), str):
+        datos['edss_basal'] = datos['edss_basal'].replace(',', '.')
+    
+    fecha = datos.get('fecha_diagnostico')
+    if isinstance(fecha, datetime):
+        datos['fecha_diagnostico'] = fecha.date()
+    elif isinstance(fecha, str) and FECHA_DMA.fullmatch(fecha):
+        dia, mes, anio = FECHA_DMA.fullmatch(fecha).groups()
+        try:
+            datos['fecha_diagnostico'] = date(int(anio), int(mes), int(dia))
+        except ValueError:
+            pass  # Patient informa del error con el valor original
+    
+    if isinstance(datos.get('activo'), str):
+        datos['activo'] = BOOLEANOS.get(datos['activo'].lower(), datos['activo'])
+    
+    if isinstance(datos.get('tipo_em'), str):
+        datos['tipo_em'] = datos['tipo_em'].upper()
+    
+    if isinstance(datos.get('historial_medico'), str):
+        try:
+            datos['historial_medico'] = json.loads(datos['historial_medico'])
+        except ValueError:
+            datos['historial_medico'] = {'antecedentes': datos['historial_medico']}
+    if 'historial_medico' not in datos:
+        datos['historial_medico'] = {'antecedentes': valores.get('antecedentes') or ""}
+    
+    return datos
+
+
+def _mensajes(errores: List[Dict[str, Any]]) -> List[str]:
+    """Errores de Pydantic como 'campo: mensaje'"""
+    return [
+        f"{'.'.join(str(parte) for parte in detalle['loc']) or 'fila'}: {detalle['msg']}"
+        for detalle in errores
+    ]
+
+
+def validar_filas(filas: List[Tuple[int, Dict[str, Any]]]) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Valida un bloque de filas con Patient sin detenerse en las inválidas
+    
+    Args:
+        filas: Tuplas (número de fila, fila leída)
+    
+    Returns:
+        Tupla (filas válidas como (número de fila, datos listos para insertar),
+        errores como {'fila', 'errores'})
+    """
+    pacientes, errores = validar_lote_con_errores(Patient, [limpiar_fila(fila) for _, fila in filas])
+    
+    validas = [
+        (numero, paciente.model_dump(mode='json', include=set(CAMPOS)))
+        for (numero, _), paciente in zip(filas, pacientes)
+        if paciente is not None
+    ]
+    return validas, [
+        {'fila': filas[indice][0], 'errores': _mensajes(detalles)}
+        for indice, detalles in sorted(errores.items())
+    ]
+
+# =====================================================
+# IMPORTACIÓN
+# =====================================================
+
+class PatientImportJob:
+    """
+    Importación por bloques de pacientes con validación fila a fila
+    """
+    
+    def __init__(
+        self,
+        batch_size: int = JobConfig.IMPORT_BATCH_SIZE,
+        use_copy: bool = JobConfig.IMPORT_USE_COPY,
+        dry_run: bool = False,
+        progreso: Optional[Progreso] = None
+    ):
+        self.batch_size = batch_size
+        self.use_copy = use_copy and isinstance(db, PostgresClient)
+        self.dry_run = dry_run
+        self.progreso = progreso
+        self.errores: List[Dict[str, Any]] = []
+    
+    def insert_batch(self, validas: List[Tuple[int, Dict[str, Any]]]) -> int:
+        """
+        Guarda las filas válidas de un bloque con una sola operación
+        
+        Si la base de datos rechaza el bloque (p. ej. un medico_asignado_id que no
+        existe), se reintenta fila a fila y las filas rechazadas pasan a errores.
+        
+        Returns:
+            Número de pacientes guardados
+        """
+        if not validas or self.dry_run:
+            return 0
+        
+        filas = [datos for _, datos in validas]
+        try:
+            if self.use_copy:
+                return db.copiar_filas('pacientes', CAMPOS, ([datos[c] for c in CAMPOS] for datos in filas))
+            return len(db.crear_pacientes(filas))
+        except Exception as e:
+            logger.warning(f"Bloque rechazado ({e}); reintentando fila a fila")
+        
+        guardadas = 0
+        for numero, datos in validas:
+            try:
+                db.crear_paciente(datos)
+                guardadas += 1
+            except Exception as e:
+                self.errores.append({'fila': numero, 'errores': [f"base de datos: {str(e).splitlines()[0]}"]})
+        return guardadas
+    
+    def run(self, origen: Union[str, Path, IO[bytes]], nombre: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Importa todos los pacientes del fichero
+        
+        Args:
+            origen: Ruta o fichero binario (CSV o Excel)
+            nombre: Nombre del fichero cuando origen no es una ruta
+        
+        Returns:
+            Resumen: filas leídas, válidas, guardadas, con errores, segundos y filas/s
+        """
+        self.errores = []
+        estado = {'leidas': 0, 'validas': 0, 'guardadas': 0, 'errores': 0, 'segundos': 0.0, 'filas_s': 0.0}
+        inicio = time.perf_counter()
+        
+        bloque: List[Tuple[int, Dict[str, Any]]] = []
+        bloques = 0
+        filas = leer_filas(origen, nombre)
+        while True:
+            fila = next(filas, None)
+            if fila is not None:
+                bloque.append(fila)
+                if len(bloque) < self.batch_size:
+                    continue
+            if not bloque:
+                break
+            
+            validas, errores = validar_filas(bloque)
+            self.errores.extend(errores)
+            guardadas = self.insert_batch(validas)
+            bloques += 1
+            
+            estado['leidas'] += len(bloque)
+            estado['validas'] += len(validas)
+            estado['guardadas'] += guardadas
+            estado['errores'] = len(self.errores)
+            estado['segundos'] = time.perf_counter() - inicio
+            estado['filas_s'] = estado['leidas'] / estado['segundos'] if estado['segundos'] else 0.0
+            
+            logger.info(
+                f"Bloque {bloques}: {estado['leidas']} filas leídas, {estado['guardadas']} pacientes "
+                f"guardados, {estado['errores']} con errores ({estado['filas_s']:.0f} filas/s)"
+            )
+            if self.progreso:
+                self.progreso(dict(estado))
+            
+            bloque = []
+            if fila is None:
+                break
+        
+        logger.info(
+            f"Importación {'simulada' if self.dry_run else 'completada'}: {estado['leidas']} filas, "
+            f"{estado['guardadas']} pacientes guardados, {estado['errores']} con errores "
+            f"en {estado['segundos']:.2f}s ({estado['filas_s']:.0f} filas/s, "
+            f"{'COPY' if self.use_copy else 'INSERT de varias filas'})"
+        )
+        return estado
+    
+    def errors_csv(self) -> str:
+        """Errores de la última importación como CSV (fila, errores), ordenados por fila"""
+        salida = io.StringIO()
+        escritor = csv.writer(salida)
+        escritor.writerow(['fila', 'errores'])
+        for error in sorted(self.errores, key=lambda e: e['fila']):
+            escritor.writerow([error['fila'], '; '.join(error['errores'])])
+        return salida.getvalue()
+    
+    def save_errors(self, ruta: Union[str, Path] = JobConfig.IMPORT_ERRORS_PATH) -> Optional[Path]:
+        """Escribe los errores de la última importación en un CSV; None si no hubo"""
+        if not self.errores:
+            return None
+        
+        ruta = Path(ruta)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        with open(ruta, 'w', encoding='utf-8', newline='') as f:
+            f.write(self.errors_csv())
+        logger.info(f"{len(self.errores)} filas con errores escritas en {ruta}")
+        return ruta
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Importa pacientes desde un CSV o un Excel")
+    parser.add_argument('archivo', help="Fichero .csv o .xlsx con una fila por paciente")
+    parser.add_argument('--bloque', type=int, default=JobConfig.IMPORT_BATCH_SIZE, help="Filas por bloque")
+    parser.add_argument('--sin-copy', action='store_true', help="Usar INSERT de varias filas también con DB_BACKEND=postgres")
+    parser.add_argument('--simular', action='store_true', help="Validar sin guardar")
+    parser.add_argument('--errores', default=JobConfig.IMPORT_ERRORS_PATH, help="CSV donde escribir las filas con errores")
+    args = parser.parse_args(argv)
+    
+    job = PatientImportJob(
+        batch_size=args.bloque,
+        use_copy=not args.sin_copy,
+        dry_run=args.simular
+    )
+    
+    try:
+        resumen = job.run(args.archivo)
+        job.save_errors(args.errores)
+        print(json.dumps(resumen, indent=2))
+        return 0 if not resumen['errores'] else 2
+    except Exception as e:
+        logger.error(f"Error en la importación de pacientes: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Recálculo de indicadores clínicos para toda la cohorte
+
+Cuando cambian los rangos de IndicatorRanges o los umbrales CDP-12 de
+SystemConstants, los indicadores guardados en indicadores_cita quedan
+desactualizados. Este proceso recorre todas las citas completadas por bloques,
+recalcula los cinco indicadores a partir de sus variables_entrada con
+BatchIndicatorCalculator y los vuelve a guardar con un único upsert por bloque.
+
+El progreso se guarda en un fichero de checkpoint tras cada bloque, de modo que
+una ejecución interrumpida continúa desde la última cita procesada.
+
+Uso:
+    python -m src.jobs.recompute_indicators [--bloque 500] [--reiniciar] [--simular]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from loguru import logger
+
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from config import JobConfig
+from src.calculators import BatchIndicatorCalculator
+from src.database import db
+
+class IndicatorRecomputeJob:
+    """
+    Proceso reanudable de recálculo de indicadores por bloques de citas
+    """
+    
+    def __init__(
+        self,
+        chunk_size: int = JobConfig.RECOMPUTE_CHUNK_SIZE,
+        checkpoint_path: str = JobConfig.RECOMPUTE_CHECKPOINT_PATH,
+        dry_run: bool = False
+    ):
+        self.chunk_size = chunk_size
+        self.checkpoint_path = Path(checkpoint_path)
+        self.dry_run = dry_run
+    
+    # =====================================================
+    # CHECKPOINT
+    # =====================================================
+    
+    def load_checkpoint(self) -> Dict[str, Any]:
+        """Lee el checkpoint de una ejecución anterior (o uno vacío; siempre vacío al simular)"""
+        if self.checkpoint_path.exists() and not self.dry_run:
+            try:
+                with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"Checkpoint ilegible, se empieza desde el principio: {e}")
+        
+        return {
+            'ultima_cita_id': None,
+            'citas_procesadas': 0,
+            'citas_omitidas': 0,
+            'indicadores_guardados': 0,
+            'estados_cambiados': 0,
+            'segundos': 0.0
+        }
+    
+    def save_checkpoint(self, estado: Dict[str, Any]) -> None:
+        """Guarda el checkpoint de forma atómica (fichero temporal + rename)"""
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        estado['actualizado'] = datetime.now().isoformat()
+        
+        temporal = self.checkpoint_path.with_suffix('.tmp')
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(estado, f, indent=2)
+        os.replace(temporal, self.checkpoint_path)
+    
+    def reset(self) -> None:
+        """Elimina el checkpoint para recalcular toda la cohorte"""
+        if self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
+            logger.info(f"Checkpoint eliminado: {self.checkpoint_path}")
+    
+    # =====================================================
+    # CÁLCULO POR BLOQUE
+    # =====================================================
+    
+    @staticmethod
+    def _build_visits(
+        citas: List[Dict[str, Any]],
+        indicadores_por_cita: Dict[str, List[Dict[str, Any]]]
+    ) -> Tuple[pd.DataFrame, Dict[Tuple[str, str], str]]:
+        """
+        Reconstruye las variables de entrada de cada cita a partir de los indicadores guardados
+        
+        Las citas sin ningún indicador (completadas sin pasar por la página de
+        indicadores) se omiten. Una cita con solo parte de los indicadores de
+        entrada (ARR, T1_Gd, T2_nuevas y CDP12) indica una lectura incompleta y
+        detiene el proceso, para que el checkpoint no avance sobre citas que no
+        se han recalculado.
+        
+        Returns:
+            Tupla (DataFrame de visitas indexado por cita_id, estados anteriores
+            por (cita_id, indicador_tipo))
+        
+        Raises:
+            ValueError: Si a alguna cita le faltan indicadores de entrada
+        """
+        filas = []
+        estados_previos: Dict[Tuple[str, str], str] = {}
+        
+        for cita in citas:
+            indicadores = {
+                ind['indicador_tipo']: ind
+                for ind in indicadores_por_cita.get(cita['id'], [])
+            }
+            if not indicadores:
+                continue
+            
+            faltantes = {'ARR', 'T1_Gd', 'T2_nuevas', 'CDP12'} - indicadores.keys()
+            if faltantes:
+                raise ValueError(
+                    f"La cita {cita['id']} no tiene los indicadores {sorted(faltantes)}; "
+                    f"lectura incompleta de indicadores_cita"
+                )
+            
+            for tipo, ind in indicadores.items():
+                estados_previos[(cita['id'], tipo)] = ind.get('estado')
+            
+            paciente = cita.get('pacientes') or {}
+            arr_vars = indicadores['ARR'].get('variables_entrada') or {}
+            t1_vars = indicadores['T1_Gd'].get('variables_entrada') or {}
+            t2_vars = indicadores['T2_nuevas'].get('variables_entrada') or {}
+            cdp_vars = indicadores['CDP12'].get('variables_entrada') or {}
+            
+            filas.append({
+                'cita_id': cita['id'],
+                'recaidas': int(arr_vars.get('recaidas', 0)),
+                'fecha_inicio': paciente.get('fecha_diagnostico'),
+                'fecha_fin': cita['fecha_cita'],
+                'lesiones_t1_gd': int(t1_vars.get('lesiones_t1_gd', 0)),
+                'lesiones_t2_actuales': int(t2_vars.get('lesiones_t2_actuales', 0)),
+                'lesiones_t2_previas': int(t2_vars.get('lesiones_t2_previas', 0)),
+                'edss_basal': float(cdp_vars.get('edss_basal', paciente.get('edss_basal', 0))),
+                'edss_actual': float(cdp_vars.get('edss_actual', 0))
+            })
+        
+        visitas = pd.DataFrame(filas, columns=[
+            'cita_id', 'recaidas', 'fecha_inicio', 'fecha_fin', 'lesiones_t1_gd',
+            'lesiones_t2_actuales', 'lesiones_t2_previas', 'edss_basal', 'edss_actual'
+        ])
+        return visitas.set_index('cita_id'), estados_previos
+    
+    def process_chunk(self, citas: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Recalcula y guarda los indicadores de un bloque de citas
+        
+        Args:
+            citas: Citas completadas (con el paciente embebido)
+        
+        Returns:
+            Contadores del bloque: procesadas, omitidas, guardados y cambiados
+        """
+        # Sin caché: se recalcula sobre lo que hay ahora en la base
+        indicadores_por_cita = db.obtener_indicadores_citas([c['id'] for c in citas], usar_cache=False)
+        visitas, estados_previos = self._build_visits(citas, indicadores_por_cita)
+        
+        filas: List[Dict[str, Any]] = []
+        if not visitas.empty:
+            resultados = BatchIndicatorCalculator.calculate_all(visitas)
+            filas = BatchIndicatorCalculator.to_rows(visitas, resultados)
+        
+        cambiados = sum(
+            1 for fila in filas
+            if estados_previos.get((fila['cita_id'], fila['indicador_tipo'])) != fila['estado']
+        )
+        
+        if filas and not self.dry_run:
+            db.guardar_indicadores(filas)
+        
+        return {
+            'procesadas': len(visitas),
+            'omitidas': len(citas) - len(visitas),
+            'guardados': 0 if self.dry_run else len(filas),
+            'cambiados': cambiados
+        }
+    
+    # =====================================================
+    # EJECUCIÓN
+    # =====================================================
+    
+    def run(self, max_chunks: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Ejecuta el recálculo desde el último checkpoint hasta agotar las citas completadas
+        
+        Args:
+            max_chunks: Número máximo de bloques a procesar en esta ejecución
+        
+        Returns:
+            Estado final (el mismo contenido que el checkpoint)
+        """
+        estado = self.load_checkpoint()
+        if estado['ultima_cita_id']:
+            logger.info(
+                f"Reanudando recálculo tras la cita {estado['ultima_cita_id']} "
+                f"({estado['citas_procesadas']} citas ya procesadas)"
+            )
+        
+        bloques = 0
+        while max_chunks is None or bloques < max_chunks:
+            inicio = time.perf_counter()
+            
+            citas = db.listar_citas_completadas(
+                despues_de=estado['ultima_cita_id'],
+                limite=self.chunk_size
+            )
+            # Solo una página vacía indica el final: PostgREST limita cada
+            # respuesta a max-rows filas aunque el bloque sea mayor
+            if not citas:
+                break
+            
+            contadores = self.process_chunk(citas)
+            duracion = time.perf_counter() - inicio
+            
+            estado['ultima_cita_id'] = citas[-1]['id']
+            estado['citas_procesadas'] += contadores['procesadas']
+            estado['citas_omitidas'] += contadores['omitidas']
+            estado['indicadores_guardados'] += contadores['guardados']
+            estado['estados_cambiados'] += contadores['cambiados']
+            estado['segundos'] += duracion
+            if not self.dry_run:
+                self.save_checkpoint(estado)
+            bloques += 1
+            
+            logger.info(
+                f"Bloque {bloques}: {contadores['procesadas']} citas en {duracion:.2f}s "
+                f"({len(citas) / duracion if duracion else 0:.0f} citas/s), "
+                f"{contadores['cambiados']} estados cambiados, {contadores['omitidas']} omitidas"
+            )
+        
+        total = estado['citas_procesadas'] + estado['citas_omitidas']
+        ritmo = total / estado['segundos'] if estado['segundos'] else 0
+        logger.info(
+            f"Recálculo {'simulado' if self.dry_run else 'completado'}: "
+            f"{estado['citas_procesadas']} citas, {estado['indicadores_guardados']} indicadores guardados, "
+            f"{estado['estados_cambiados']} estados cambiados, {estado['citas_omitidas']} omitidas "
+            f"({ritmo:.0f} citas/s)"
+        )
+        return estado
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Recalcula los indicadores clínicos de todas las citas completadas")
+    parser.add_argument('--bloque', type=int, default=JobConfig.RECOMPUTE_CHUNK_SIZE, help="Citas por bloque")
+    parser.add_argument('--checkpoint', default=JobConfig.RECOMPUTE_CHECKPOINT_PATH, help="Fichero de checkpoint")
+    parser.add_argument('--max-bloques', type=int, default=None, help="Detener tras N bloques")
+    parser.add_argument('--reiniciar', action='store_true', help="Ignorar el checkpoint y empezar desde el principio")
+    parser.add_argument('--simular', action='store_true', help="Calcular sin guardar (informa de cuántos estados cambiarían)")
+    args = parser.parse_args(argv)
+    
+    job = IndicatorRecomputeJob(
+        chunk_size=args.bloque,
+        checkpoint_path=args.checkpoint,
+        dry_run=args.simular
+    )
+    if args.reiniciar:
+        job.reset()
+    
+    try:
+        job.run(max_chunks=args.max_bloques)
+        return 0
+    except KeyboardInterrupt:
+        logger.warning("Recálculo interrumpido; se reanudará desde el último checkpoint")
+        return 130
+    except Exception as e:
+        logger.error(f"Error en el recálculo de indicadores: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,9 @@ from .patient import (
     AIDiagnostic,
     AIMetrics,
     ReferenceDocument,
-    IndicatorInputData
+    IndicatorInputData,
+    validar_lote,
+    validar_lote_con_errores
 )
 
 __all__ = [
@@ -16,5 +18,7 @@ __all__ = [
     'AIDiagnostic',
     'AIMetrics',
     'ReferenceDocument',
-    'IndicatorInputData'
+    'IndicatorInputData',
+    'validar_lote',
+    'validar_lote_con_errores'
 ]
@@ -1,12 +1,22 @@
 """
 Modelos Pydantic para validación de datos
+
+Para validar muchas filas a la vez (importaciones, cohortes, recálculos) usa
+validar_lote, que valida la lista entera con un TypeAdapter en una sola
+llamada a pydantic-core en lugar de crear los modelos uno a uno.
 """
-from pydantic import BaseModel, Field, validator
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, TypeAdapter, ValidationError, field_validator
+from typing import Annotated, Optional, Dict, Any, List, Sequence, Tuple, Type, TypeVar, Union
+from functools import lru_cache
 from datetime import datetime, date
 from decimal import Decimal
 from config import TipoEM, EstadoCita, TipoIndicador, EstadoIndicador, IASeleccionada
 
+# Serialización JSON (model_dump(mode='json')): Decimal como número y
+# datetime con isoformat(), igual que los antiguos json_encoders
+DecimalFloat = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used='json')]
+FechaHoraISO = Annotated[datetime, PlainSerializer(datetime.isoformat, return_type=str, when_used='json')]
+
 # =====================================================
 # MODELO: Paciente
 # =====================================================
@@ -18,36 +28,32 @@ class Patient(BaseModel):
     edad: int = Field(..., gt=0, lt=120)
     genero: str = Field(..., min_length=1, max_length=50)
     tipo_em: TipoEM
-    edss_basal: Decimal = Field(..., ge=0, le=10)
+    edss_basal: DecimalFloat = Field(..., ge=0, le=10)
     tratamiento_actual: Optional[str] = Field(None, max_length=255)
     fecha_diagnostico: date
     historial_medico: Optional[Dict[str, Any]] = Field(default_factory=dict)
     medico_asignado_id: Optional[str] = None
     activo: bool = True
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    created_at: Optional[FechaHoraISO] = None
+    updated_at: Optional[FechaHoraISO] = None
+    
+    model_config = ConfigDict(use_enum_values=True)
     
-    @validator('edss_basal')
+    @field_validator('edss_basal')
+    @classmethod
     def validar_edss(cls, v):
         """Valida que EDSS sea múltiplo de 0.5"""
         if float(v) % 0.5 != 0:
             raise ValueError('EDSS debe ser múltiplo de 0.5')
         return v
     
-    @validator('fecha_diagnostico')
+    @field_validator('fecha_diagnostico')
+    @classmethod
     def validar_fecha_diagnostico(cls, v):
         """Valida que la fecha de diagnóstico no sea futura"""
         if v > date.today():
             raise ValueError('La fecha de diagnóstico no puede ser futura')
         return v
-    
-    class Config:
-        use_enum_values = True
-        json_encoders = {
-            Decimal: lambda v: float(v),
-            date: lambda v: v.isoformat(),
-            datetime: lambda v: v.isoformat()
-        }
 
 # =====================================================
 # MODELO: Cita
@@ -57,18 +63,14 @@ class Appointment(BaseModel):
     """Modelo de cita"""
     id: Optional[str] = None
     paciente_id: str
-    fecha_cita: datetime
+    fecha_cita: FechaHoraISO
     numero_visita: Optional[int] = None
     estado: EstadoCita = EstadoCita.PENDIENTE
     notas_medicas: Optional[str] = None
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    created_at: Optional[FechaHoraISO] = None
+    updated_at: Optional[FechaHoraISO] = None
     
-    class Config:
-        use_enum_values = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(use_enum_values=True)
 
 # =====================================================
 # MODELO: Indicador Clínico
@@ -79,18 +81,13 @@ class ClinicalIndicator(BaseModel):
     id: Optional[str] = None
     cita_id: str
     indicador_tipo: TipoIndicador
-    valor_calculado: Optional[Decimal] = None
+    valor_calculado: Optional[DecimalFloat] = None
     estado: EstadoIndicador
     justificacion_texto: str
     variables_entrada: Dict[str, Any] = Field(default_factory=dict)
-    created_at: Optional[datetime] = None
+    created_at: Optional[FechaHoraISO] = None
     
-    class Config:
-        use_enum_values = True
-        json_encoders = {
-            Decimal: lambda v: float(v) if v is not None else None,
-            datetime: lambda v: v.isoformat()
-        }
+    model_config = ConfigDict(use_enum_values=True)
 
 # =====================================================
 # MODELO: Diagnóstico IA
@@ -101,27 +98,23 @@ class AIDiagnostic(BaseModel):
     id: Optional[str] = None
     cita_id: str
     diagnostico_deepseek: Optional[str] = None
-    confianza_deepseek: Optional[Decimal] = Field(None, ge=0, le=10)
+    confianza_deepseek: Optional[DecimalFloat] = Field(None, ge=0, le=10)
     diagnostico_copilot: Optional[str] = None
-    confianza_copilot: Optional[Decimal] = Field(None, ge=0, le=10)
+    confianza_copilot: Optional[DecimalFloat] = Field(None, ge=0, le=10)
     ia_seleccionada: IASeleccionada
     diagnostico_medico_override: Optional[str] = None
     justificacion_medico: Optional[str] = None
-    created_at: Optional[datetime] = None
+    created_at: Optional[FechaHoraISO] = None
+    
+    model_config = ConfigDict(use_enum_values=True)
     
-    @validator('confianza_deepseek', 'confianza_copilot')
+    @field_validator('confianza_deepseek', 'confianza_copilot')
+    @classmethod
     def validar_confianza(cls, v):
         """Valida que la confianza esté entre 0 y 10"""
         if v is not None and (v < 0 or v > 10):
             raise ValueError('La confianza debe estar entre 0 y 10')
         return v
-    
-    class Config:
-        use_enum_values = True
-        json_encoders = {
-            Decimal: lambda v: float(v) if v is not None else None,
-            datetime: lambda v: v.isoformat()
-        }
 
 # =====================================================
 # MODELO: Métricas IA
@@ -135,16 +128,9 @@ class AIMetrics(BaseModel):
     selecciones_deepseek: int = 0
     selecciones_copilot: int = 0
     selecciones_medico_override: int = 0
-    accuracy_deepseek: Optional[Decimal] = None
-    accuracy_copilot: Optional[Decimal] = None
-    created_at: Optional[datetime] = None
-    
-    class Config:
-        json_encoders = {
-            Decimal: lambda v: float(v) if v is not None else None,
-            date: lambda v: v.isoformat(),
-            datetime: lambda v: v.isoformat()
-        }
+    accuracy_deepseek: Optional[DecimalFloat] = None
+    accuracy_copilot: Optional[DecimalFloat] = None
+    created_at: Optional[FechaHoraISO] = None
 
 # =====================================================
 # MODELO: Documento de Referencia
@@ -157,13 +143,8 @@ class ReferenceDocument(BaseModel):
     contenido_extraido: str
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
     activo: bool = True
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
+    created_at: Optional[FechaHoraISO] = None
+    updated_at: Optional[FechaHoraISO] = None
 
 # =====================================================
 # MODELOS DE ENTRADA PARA FORMULARIOS
@@ -180,17 +161,79 @@ class IndicatorInputData(BaseModel):
     lesiones_t2_previas: Optional[int] = Field(None, ge=0)
     
     # Para EDSS
-    edss_actual: Optional[Decimal] = Field(None, ge=0, le=10)
-    edss_basal: Optional[Decimal] = Field(None, ge=0, le=10)
+    edss_actual: Optional[DecimalFloat] = Field(None, ge=0, le=10)
+    edss_basal: Optional[DecimalFloat] = Field(None, ge=0, le=10)
     
-    @validator('edss_actual', 'edss_basal')
+    @field_validator('edss_actual', 'edss_basal')
+    @classmethod
     def validar_edss(cls, v):
         """Valida que EDSS sea múltiplo de 0.5"""
         if v is not None and float(v) % 0.5 != 0:
             raise ValueError('EDSS debe ser múltiplo de 0.5')
         return v
+
+# =====================================================
+# VALIDACIÓN POR LOTES
+# =====================================================
+
+Modelo = TypeVar('Modelo', bound=BaseModel)
+
+@lru_cache(maxsize=None)
+def adaptador_lista(modelo: Type[Modelo]) -> TypeAdapter:
+    """TypeAdapter(List[modelo]), construido una sola vez por modelo"""
+    return TypeAdapter(List[modelo])
+
+@lru_cache(maxsize=None)
+def _adaptador_tolerante(modelo: Type[Modelo]) -> TypeAdapter:
+    """Como adaptador_lista, pero las filas inválidas se devuelven sin validar en lugar de fallar el lote"""
+    return TypeAdapter(List[Annotated[Union[modelo, Any], Field(union_mode='left_to_right')]])
+
+def validar_lote(modelo: Type[Modelo], filas: Sequence[Dict[str, Any]]) -> List[Modelo]:
+    """
+    Valida todas las filas con una sola llamada a pydantic-core
+    
+    Args:
+        modelo: Clase del modelo (Patient, ClinicalIndicator, ...)
+        filas: Diccionarios de entrada
+    
+    Returns:
+        Instancias validadas, en el mismo orden
+    
+    Raises:
+        ValidationError: Si alguna fila no es válida (el primer elemento de
+        'loc' de cada error es el índice de la fila)
+    """
+    return adaptador_lista(modelo).validate_python(filas)
+
+def validar_lote_con_errores(
+    modelo: Type[Modelo],
+    filas: Sequence[Dict[str, Any]]
+) -> Tuple[List[Optional[Modelo]], Dict[int, List[Dict[str, Any]]]]:
+    """
+    Valida todas las filas sin detenerse en las inválidas
+    
+    El lote se valida en una sola pasada; solo las filas que no son válidas se
+    vuelven a validar una a una para obtener sus errores.
+    
+    Args:
+        modelo: Clase del modelo
+        filas: Diccionarios de entrada
+    
+    Returns:
+        Tupla (instancias en el mismo orden, con None en las filas inválidas;
+        errores de Pydantic por índice de fila)
+    """
+    instancias: List[Optional[Modelo]] = []
+    errores: Dict[int, List[Dict[str, Any]]] = {}
     
-    class Config:
-        json_encoders = {
-            Decimal: lambda v: float(v) if v is not None else None
-        }
+    for indice, resultado in enumerate(_adaptador_tolerante(modelo).validate_python(filas)):
+        if isinstance(resultado, modelo):
+            instancias.append(resultado)
+            continue
+        
+        instancias.append(None)
+        try:
+            modelo.model_validate(resultado)
+        except ValidationError as e:
+            errores[indice] = e.errors()
+    return instancias, errores
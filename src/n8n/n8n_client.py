@@ -6,6 +6,8 @@ import httpx
 from typing import Dict, Any, Optional
 from loguru import logger
 from dotenv import load_dotenv
+from config import AIConfig
+from src.utils import ai_response_cache
 
 load_dotenv()
 
@@ -33,12 +35,35 @@ class N8NClient:
         # Retorna True si al menos la URL de consulta IA está configurada
         return bool(self.ai_webhook_url)
     
-    async def consultar_ias(self, prompt: str) -> Optional[Dict[str, Any]]:
+    def _cache_key(self, prompt: str) -> str:
+        """
+        Clave de caché: el workflow consulta ambos modelos con la configuración de AIConfig,
+        así que entran todos sus parámetros de generación y el webhook que lo ejecuta
+        """
+        return ai_response_cache.make_key(
+            prompt,
+            f"n8n:{AIConfig.DEEPSEEK_MODEL}+{AIConfig.COPILOT_MODEL}",
+            AIConfig.DEEPSEEK_TEMPERATURE,
+            copilot_temperature=AIConfig.COPILOT_TEMPERATURE,
+            deepseek_max_tokens=AIConfig.DEEPSEEK_MAX_TOKENS,
+            copilot_max_tokens=AIConfig.COPILOT_MAX_TOKENS,
+            webhook=self.ai_webhook_url
+        )
+    
+    @staticmethod
+    def _is_complete_response(data: Any) -> bool:
+        """Solo se cachean respuestas con el formato esperado por la UI"""
+        if not isinstance(data, dict):
+            return False
+        return ('deepseek_response' in data and 'copilot_response' in data) or data.get('status') == 'success'
+    
+    async def consultar_ias(self, prompt: str, usar_cache: bool = True) -> Optional[Dict[str, Any]]:
         """
         Consulta a DeepSeek y Copilot via n8n
         
         Args:
             prompt: Prompt médico para las IAs
+            usar_cache: Si es False se ignora la caché de respuestas
             
         Returns:
             Dict con respuestas de ambas IAs o None si hay error
@@ -46,6 +71,13 @@ class N8NClient:
         if not self.ai_webhook_url:
             logger.warning("N8N_AI_WEBHOOK no configurado")
             return None
+        
+        clave = self._cache_key(prompt)
+        if AIConfig.RESPONSE_CACHE_ENABLED and usar_cache:
+            cacheada = ai_response_cache.get(clave)
+            if cacheada is not None:
+                logger.info("✅ Respuesta de n8n obtenida de la caché")
+                return cacheada
             
         try:
             logger.info(f"Enviando consulta a n8n webhook: {self.ai_webhook_url}")
@@ -68,6 +100,8 @@ class N8NClient:
                     logger.info(f"✅ Consulta IA exitosa via n8n")
                     logger.debug(f"Estructura de respuesta: {list(data.keys()) if isinstance(data, dict) else type(data)}")
                     logger.debug(f"Respuesta completa: {data}")
+                    if AIConfig.RESPONSE_CACHE_ENABLED and self._is_complete_response(data):
+                        ai_response_cache.set(clave, data)
                     return data
                 except Exception as json_error:
                     logger.error(f"Error al parsear JSON de n8n: {json_error}")
@@ -1,5 +1,14 @@
 """
 Utilidades del sistema
 """
+from .async_runner import run_async, iterate_async, register_shutdown, shutdown
+from .response_cache import AIResponseCache, ai_response_cache
 
-__all__ = []
+__all__ = [
+    'run_async',
+    'iterate_async',
+    'register_shutdown',
+    'shutdown',
+    'AIResponseCache',
+    'ai_response_cache'
+]
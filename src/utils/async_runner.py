@@ -0,0 +1,98 @@
+"""
+Event loop persistente para ejecutar corrutinas desde código síncrono (Streamlit)
+"""
+import asyncio
+import atexit
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Iterator, List, Optional
+from loguru import logger
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+_shutdown_hooks: List[Callable[[], Awaitable[Any]]] = []
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Retorna el event loop de fondo, creándolo si es necesario
+    
+    Un único loop por proceso permite que los clientes HTTP y de base de datos
+    reutilicen sus conexiones entre reruns de Streamlit.
+    """
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="async-runner", daemon=True)
+            _thread.start()
+            logger.info("Event loop de fondo iniciado")
+        return _loop
+
+def run_async(coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+    """
+    Ejecuta una corrutina en el event loop de fondo y espera su resultado
+    
+    Args:
+        coro: Corrutina a ejecutar
+        timeout: Tiempo máximo de espera en segundos (None = sin límite)
+        
+    Returns:
+        Resultado de la corrutina
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    return future.result(timeout)
+
+def iterate_async(agen: AsyncIterator[Any]) -> Iterator[Any]:
+    """
+    Consume un generador asíncrono desde código síncrono
+    
+    Cada elemento se obtiene en el event loop de fondo, lo que permite a
+    Streamlit pintar resultados parciales (p.ej. tokens en streaming).
+    
+    Args:
+        agen: Generador asíncrono a consumir
+        
+    Yields:
+        Elementos del generador en orden
+    """
+    async def _next():
+        return await agen.__anext__()
+    
+    async def _close():
+        await agen.aclose()
+    
+    loop = get_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(_next(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        asyncio.run_coroutine_threadsafe(_close(), loop).result()
+
+def register_shutdown(hook: Callable[[], Awaitable[Any]]) -> None:
+    """Registra una corrutina a ejecutar en el loop de fondo al terminar el proceso"""
+    _shutdown_hooks.append(hook)
+
+def shutdown() -> None:
+    """Ejecuta los hooks de cierre y detiene el event loop de fondo"""
+    global _loop, _thread
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop, _thread = None, None
+    if loop is None or loop.is_closed():
+        return
+    
+    for hook in _shutdown_hooks:
+        try:
+            asyncio.run_coroutine_threadsafe(hook(), loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Error en hook de cierre: {e}")
+    
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join(timeout=5)
+    loop.close()
+
+atexit.register(shutdown)
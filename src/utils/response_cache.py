@@ -0,0 +1,149 @@
+"""
+Caché en disco de respuestas de IA direccionada por contenido
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from loguru import logger
+from config import AIConfig
+
+class AIResponseCache:
+    """
+    Caché SQLite de respuestas de IA
+    
+    La clave es el hash SHA-256 del prompt, el modelo y los parámetros de
+    generación, por lo que un prompt idéntico devuelve la respuesta guardada.
+    Cuando el tamaño total supera el límite se eliminan las entradas usadas
+    hace más tiempo.
+    """
+    
+    def __init__(
+        self,
+        path: str = AIConfig.RESPONSE_CACHE_PATH,
+        max_bytes: int = AIConfig.RESPONSE_CACHE_MAX_BYTES
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Abre (una sola vez) la base de datos SQLite de la caché"""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS respuestas (
+                    clave TEXT PRIMARY KEY,
+                    valor TEXT NOT NULL,
+                    tamano INTEGER NOT NULL,
+                    creado REAL NOT NULL,
+                    ultimo_acceso REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_respuestas_acceso ON respuestas(ultimo_acceso)"
+            )
+            self._conn.commit()
+        return self._conn
+    
+    @staticmethod
+    def make_key(prompt: str, model: str, temperature: float, **params: Any) -> str:
+        """
+        Calcula la clave de caché
+        
+        Args:
+            prompt: Prompt completo enviado
+            model: Modelo (o ruta de orquestación) que genera la respuesta
+            temperature: Temperatura de generación
+            **params: Otros parámetros que afectan a la respuesta (max_tokens...)
+            
+        Returns:
+            Hash hexadecimal SHA-256
+        """
+        material = json.dumps(
+            {'prompt': prompt, 'model': model, 'temperature': temperature, **params},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna la respuesta cacheada o None"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT valor FROM respuestas WHERE clave = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE respuestas SET ultimo_acceso = ? WHERE clave = ?",
+                    (time.time(), key)
+                )
+                conn.commit()
+            return json.loads(row[0])
+        except Exception as e:
+            # La caché nunca debe impedir una consulta
+            logger.warning(f"Error al leer caché de respuestas IA: {e}")
+            return None
+    
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Guarda una respuesta y aplica el límite de tamaño"""
+        try:
+            valor = json.dumps(value, default=str, ensure_ascii=False)
+            ahora = time.time()
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO respuestas (clave, valor, tamano, creado, ultimo_acceso) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, valor, len(valor.encode('utf-8')), ahora, ahora)
+                )
+                self._evict(conn)
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"Error al escribir caché de respuestas IA: {e}")
+    
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Elimina las entradas menos recientes hasta respetar max_bytes"""
+        total = conn.execute("SELECT COALESCE(SUM(tamano), 0) FROM respuestas").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        exceso = total - self.max_bytes
+        eliminadas = 0
+        for clave, tamano in conn.execute(
+            "SELECT clave, tamano FROM respuestas ORDER BY ultimo_acceso ASC"
+        ).fetchall():
+            if exceso <= 0:
+                break
+            conn.execute("DELETE FROM respuestas WHERE clave = ?", (clave,))
+            exceso -= tamano
+            eliminadas += 1
+        logger.info(f"Caché de respuestas IA: {eliminadas} entradas eliminadas por tamaño")
+    
+    def clear(self) -> None:
+        """Vacía la caché"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM respuestas")
+            conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Número de entradas y tamaño ocupado"""
+        with self._lock:
+            conn = self._connect()
+            entradas, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM respuestas"
+            ).fetchone()
+        return {'entries': entradas, 'bytes': total, 'max_bytes': self.max_bytes}
+
+# Instancia global
+ai_response_cache = AIResponseCache()
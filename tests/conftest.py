@@ -0,0 +1,60 @@
+"""
+Configuración común de las pruebas
+
+Las pruebas que necesitan Postgres se ejecutan contra la base indicada en
+TEST_DATABASE_URL (con init_database.sql, functions.sql y las migraciones
+aplicadas) y se omiten si la variable no está definida.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from loguru import logger
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+
+@pytest.fixture(autouse=True, scope='session')
+def silenciar_logs():
+    """Desactiva los logs de la aplicación: las rutas escalares registran cada cálculo"""
+    logger.disable('src')
+    yield
+    logger.enable('src')
+
+
+@pytest.fixture(scope='session')
+def dsn() -> str:
+    """DSN de la base de pruebas; omite la prueba si no hay ninguna configurada"""
+    valor = os.getenv('TEST_DATABASE_URL')
+    if not valor:
+        pytest.skip("TEST_DATABASE_URL no definida: se omiten las pruebas con Postgres")
+    return valor
+
+
+@pytest.fixture(scope='session')
+def pg(dsn):
+    """Cliente global `db` con el backend postgres apuntando a la base de pruebas"""
+    from config import DatabaseConfig
+    os.environ[DatabaseConfig.BACKEND_ENV] = 'postgres'
+    os.environ[DatabaseConfig.DSN_ENV] = dsn
+    from src.database import db, PostgresClient
+    assert isinstance(db, PostgresClient), "src.database ya estaba importado con otro backend"
+    return db
+
+
+@pytest.fixture
+def paciente(pg):
+    """Paciente de prueba; se elimina al terminar junto con sus citas (ON DELETE CASCADE)"""
+    creado = pg.crear_paciente({
+        'nombre_completo': 'Paciente Prueba Pytest',
+        'edad': 40,
+        'genero': 'Femenino',
+        'tipo_em': 'EMRR',
+        'edss_basal': 2.0,
+        'fecha_diagnostico': '2018-03-01'
+    })
+    yield creado
+    with pg.transaccion('pacientes', 'citas') as cursor:
+        cursor.execute("DELETE FROM pacientes WHERE id = %s", [creado['id']])
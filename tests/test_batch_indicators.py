@@ -0,0 +1,139 @@
+"""
+Paridad de BatchIndicatorCalculator con IndicatorCalculator
+
+Compara fila a fila valores, estados y justificaciones de los cinco
+indicadores sobre visitas aleatorias y sobre casos construidos en empates de
+redondeo del ARR (x.xx5), que la ruta vectorizada recalcula con Decimal.
+Incluye el benchmark de 100k visitas de calculate_all.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from src.calculators import BatchIndicatorCalculator, IndicatorCalculator
+
+INICIO = datetime(2015, 1, 1, tzinfo=timezone.utc)
+SEGUNDOS_ANO = 365.25 * 24 * 60 * 60
+# Períodos de hasta 100 años: por encima de 2**53 µs el float pierde precisión
+MAX_PERIODO_US = 100 * SEGUNDOS_ANO * 1e6
+
+
+def generar_visitas(n: int, semilla: int = 7) -> pd.DataFrame:
+    """Visitas aleatorias con el formato de entrada de calculate_all"""
+    rng = np.random.default_rng(semilla)
+    inicios = [INICIO + timedelta(days=int(d)) for d in rng.integers(0, 3650, n)]
+    duraciones = rng.integers(0, 10 * 365 * 24 * 3600, n)
+    # Algunas visitas el mismo instante que el inicio (años-paciente = 0)
+    duraciones[rng.random(n) < 0.01] = 0
+    edss_basal = rng.integers(0, 20, n) * 0.5
+    edss_actual = np.clip(edss_basal + rng.integers(-4, 5, n) * 0.5, 0, 10)
+    t2_previas = rng.integers(0, 30, n)
+    
+    return pd.DataFrame({
+        'recaidas': rng.poisson(0.4, n),
+        'fecha_inicio': [i.isoformat() for i in inicios],
+        'fecha_fin': [(i + timedelta(seconds=int(s))).isoformat() for i, s in zip(inicios, duraciones)],
+        'lesiones_t1_gd': rng.poisson(0.3, n),
+        'lesiones_t2_actuales': t2_previas + rng.integers(-2, 4, n),
+        'lesiones_t2_previas': t2_previas,
+        'edss_basal': edss_basal,
+        'edss_actual': edss_actual
+    }, index=pd.Index([f'cita-{i}' for i in range(n)], name='cita_id'))
+
+
+def visitas_empate_arr() -> pd.DataFrame:
+    """Visitas cuyo ARR bruto cae en (o a un microsegundo de) un empate x.xx5"""
+    filas = []
+    for recaidas in range(1, 13):
+        for milesimas in range(5, 1000, 10):
+            objetivo = milesimas / 1000
+            microsegundos = round(recaidas / objetivo * SEGUNDOS_ANO * 1e6)
+            if microsegundos > MAX_PERIODO_US:
+                continue
+            for ajuste in (-1, 0, 1):
+                fin = INICIO + timedelta(microseconds=microsegundos + ajuste)
+                filas.append({
+                    'recaidas': recaidas,
+                    'fecha_inicio': INICIO.isoformat(),
+                    'fecha_fin': fin.isoformat()
+                })
+    return pd.DataFrame(filas)
+
+
+def calcular_escalar(visitas: pd.DataFrame) -> pd.DataFrame:
+    """Mismos indicadores que calculate_all con la calculadora escalar"""
+    filas = []
+    for v in visitas.itertuples(index=False):
+        recaidas = int(v.recaidas)
+        t1 = int(v.lesiones_t1_gd)
+        arr, arr_estado, arr_just = IndicatorCalculator.calculate_arr(
+            recaidas, datetime.fromisoformat(v.fecha_inicio), datetime.fromisoformat(v.fecha_fin)
+        )
+        t1_estado, t1_just = IndicatorCalculator.classify_t1_gd(t1)
+        t2, t2_estado, t2_just = IndicatorCalculator.calculate_t2_difference(
+            int(v.lesiones_t2_actuales), int(v.lesiones_t2_previas)
+        )
+        delta, progresion, cdp_estado, cdp_just = IndicatorCalculator.evaluate_cdp12(
+            Decimal(str(v.edss_basal)), Decimal(str(v.edss_actual))
+        )
+        neda, neda_estado, neda_just, _ = IndicatorCalculator.evaluate_neda3(
+            recaidas == 0, t1 == 0 and t2 <= 0, not progresion
+        )
+        filas.append({
+            'ARR_valor': float(arr), 'ARR_estado': arr_estado.value, 'ARR_justificacion': arr_just,
+            'T1_Gd_valor': float(t1), 'T1_Gd_estado': t1_estado.value, 'T1_Gd_justificacion': t1_just,
+            'T2_nuevas_valor': float(t2), 'T2_nuevas_estado': t2_estado.value, 'T2_nuevas_justificacion': t2_just,
+            'CDP12_valor': float(delta), 'CDP12_progresion': progresion,
+            'CDP12_estado': cdp_estado.value, 'CDP12_justificacion': cdp_just,
+            'NEDA3_valor': float(neda), 'NEDA3_estado': neda_estado.value, 'NEDA3_justificacion': neda_just
+        })
+    return pd.DataFrame(filas, index=visitas.index)
+
+
+def assert_paridad(lote: pd.DataFrame, escalar: pd.DataFrame) -> None:
+    """Falla mostrando las primeras filas que difieren en cada columna"""
+    assert list(lote.columns) == list(escalar.columns)
+    for columna in escalar.columns:
+        distintas = lote[columna].to_numpy() != escalar[columna].to_numpy()
+        assert not distintas.any(), (
+            f"{columna}: {int(distintas.sum())} filas difieren, p. ej.\n"
+            f"{pd.DataFrame({'lote': lote[columna], 'escalar': escalar[columna]})[distintas].head()}"
+        )
+
+
+def test_paridad_visitas_aleatorias():
+    visitas = generar_visitas(20_000)
+    assert_paridad(BatchIndicatorCalculator.calculate_all(visitas), calcular_escalar(visitas))
+
+
+def test_paridad_arr_en_empates_de_redondeo():
+    visitas = visitas_empate_arr()
+    arr, estados, justificaciones = BatchIndicatorCalculator.calculate_arr(
+        visitas['recaidas'], visitas['fecha_inicio'], visitas['fecha_fin']
+    )
+    
+    for i, v in enumerate(visitas.itertuples(index=False)):
+        esperado, estado, justificacion = IndicatorCalculator.calculate_arr(
+            v.recaidas, datetime.fromisoformat(v.fecha_inicio), datetime.fromisoformat(v.fecha_fin)
+        )
+        assert (arr[i], estados[i], justificaciones[i]) == (float(esperado), estado.value, justificacion), v
+
+
+def test_benchmark_100k_visitas():
+    visitas = generar_visitas(100_000, semilla=11)
+    
+    inicio = time.perf_counter()
+    resultados = BatchIndicatorCalculator.calculate_all(visitas)
+    segundos_lote = time.perf_counter() - inicio
+    
+    muestra = visitas.iloc[:5_000]
+    inicio = time.perf_counter()
+    escalar = calcular_escalar(muestra)
+    segundos_escalar = (time.perf_counter() - inicio) * len(visitas) / len(muestra)
+    
+    assert len(resultados) == len(visitas)
+    assert_paridad(resultados.iloc[:len(muestra)], escalar)
+    assert segundos_lote < segundos_escalar
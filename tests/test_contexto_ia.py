@@ -0,0 +1,55 @@
+"""
+Contexto de la consulta IA con DB_BACKEND=postgres (requiere TEST_DATABASE_URL)
+
+prepare_context (asíncrono) debe leer del mismo backend que el cliente
+síncrono, sin credenciales de Supabase, y devolver el mismo contexto que
+_prepare_context_sync.
+"""
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def cita_con_historial(pg, paciente):
+    """Tres citas completadas con indicadores; devuelve la última"""
+    citas = []
+    for i in range(3):
+        cita = pg.crear_cita({'paciente_id': paciente['id'], 'fecha_cita': f'2024-0{i + 1}-15T10:00:00+00:00'})
+        pg.guardar_indicadores_cita(cita['id'], [
+            {
+                'indicador_tipo': 'CDP12',
+                'valor_calculado': 0.5,
+                'estado': 'alerta',
+                'justificacion_texto': 'prueba',
+                'variables_entrada': {'edss_basal': 2.0, 'edss_actual': 2.0 + 0.5 * i}
+            }
+        ])
+        citas.append(cita)
+    return paciente, citas[-1]
+
+
+def test_async_db_sigue_al_backend(pg):
+    from src.database import async_db, AsyncPostgresClient
+    assert isinstance(async_db, AsyncPostgresClient)
+
+
+def test_prepare_context_lee_de_postgres(pg, cita_con_historial, monkeypatch):
+    from src.ai import DualAIConsultation
+    from src.database import query_cache
+    
+    # Cualquier intento de usar PostgREST falla la prueba
+    monkeypatch.delenv('SUPABASE_URL', raising=False)
+    monkeypatch.delenv('SUPABASE_SERVICE_KEY', raising=False)
+    
+    paciente, cita = cita_con_historial
+    consulta = DualAIConsultation()
+    
+    query_cache.clear()
+    asincrono = asyncio.run(consulta.prepare_context(paciente['id'], cita['id']))
+    query_cache.clear()
+    sincrono = consulta._prepare_context_sync(paciente['id'], cita['id'])
+    
+    assert asincrono == sincrono
+    assert len(asincrono['historial_citas']) == 2
+    assert str(asincrono['edss_actual']) == '3.0'
@@ -0,0 +1,28 @@
+"""
+Numeración concurrente de visitas con crear_cita_numerada (requiere TEST_DATABASE_URL)
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import DatabaseConfig
+
+RESERVAS = 2 * DatabaseConfig.POOL_MAX_CONNECTIONS
+
+
+def test_reservas_simultaneas_numeran_sin_huecos(pg, paciente):
+    barrera = threading.Barrier(RESERVAS)
+    
+    def reservar(i: int):
+        barrera.wait()
+        return pg.crear_cita({
+            'paciente_id': paciente['id'],
+            'fecha_cita': f'2030-01-{i + 1:02d}T10:00:00+00:00'
+        })
+    
+    # Cualquier violación de UNIQUE(paciente_id, numero_visita) se relanza aquí
+    with ThreadPoolExecutor(max_workers=RESERVAS) as pool:
+        citas = list(pool.map(reservar, range(RESERVAS)))
+    
+    assert sorted(c['numero_visita'] for c in citas) == list(range(1, RESERVAS + 1))
+    guardadas = pg.listar_citas_paciente(paciente['id'], usar_cache=False)
+    assert sorted(c['numero_visita'] for c in guardadas) == list(range(1, RESERVAS + 1))
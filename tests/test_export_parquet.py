@@ -0,0 +1,61 @@
+"""
+Exportación a Parquet particionado (src/jobs/export_parquet.py)
+
+El benchmark con indicadores sintéticos no necesita base de datos ni
+credenciales; la exportación de las tablas reales requiere TEST_DATABASE_URL.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.parquet as pq
+
+from config import JobConfig
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_benchmark_sin_credenciales(tmp_path):
+    entorno = {
+        clave: valor for clave, valor in os.environ.items()
+        if not clave.startswith('SUPABASE_') and clave not in ('DATABASE_URL', 'DB_BACKEND')
+    }
+    proceso = subprocess.run(
+        [sys.executable, '-m', 'src.jobs.export_parquet', '--benchmark', '10000', '--salida', str(tmp_path)],
+        cwd=ROOT, env=entorno, capture_output=True, text=True, timeout=120
+    )
+    assert proceso.returncode == 0, proceso.stderr
+    assert 'RuntimeWarning' not in proceso.stderr
+    
+    estadisticas = json.loads(proceso.stdout)
+    assert estadisticas['filas'] == 10000
+    assert estadisticas['particiones'] == {t: 2000 for t in ('ARR', 'T1_Gd', 'T2_nuevas', 'CDP12', 'NEDA3')}
+    
+    tabla = pq.read_table(tmp_path / 'indicadores_cita')
+    assert tabla.num_rows == 10000
+    assert pa.types.is_decimal(tabla.schema.field('valor_calculado').type)
+
+
+def test_exportacion_coincide_con_la_base(pg, tmp_path):
+    from src.jobs.export_parquet import ParquetExportJob
+    
+    resultado = ParquetExportJob(output_dir=str(tmp_path), chunk_size=500).run()
+    manifiesto = json.loads((tmp_path / 'manifest.json').read_text(encoding='utf-8'))
+    
+    with pg.conexion() as conn, conn.cursor() as cursor:
+        for tabla in ParquetExportJob.TABLAS:
+            cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+            total = cursor.fetchone()[0]
+            
+            assert resultado[tabla]['filas'] == manifiesto['tablas'][tabla]['filas'] == total
+            assert manifiesto['tablas'][tabla]['particion'] == JobConfig.EXPORT_PARTITIONS[tabla]
+            if total:
+                assert pq.read_table(tmp_path / tabla).num_rows == total
+    
+    # Sin identificadores directos salvo que se pidan
+    assert 'nombre_completo' not in manifiesto['tablas']['pacientes']['columnas']
@@ -0,0 +1,38 @@
+"""
+Filtro por fechas de obtener_historial_indicadores (requiere TEST_DATABASE_URL)
+
+`hasta` es inclusivo: una fecha sin hora incluye las citas de todo ese día.
+"""
+from datetime import date, datetime
+
+import pytest
+
+
+@pytest.fixture
+def cita_por_la_tarde(pg, paciente):
+    """Cita del paciente de prueba el 10/05/2024 a las 15:30 con un indicador ARR"""
+    with pg.transaccion('citas', 'indicadores_cita') as cursor:
+        cursor.execute(
+            "INSERT INTO citas (paciente_id, fecha_cita, numero_visita, estado) "
+            "VALUES (%s, '2024-05-10 15:30', 1, 'completada') RETURNING id",
+            [paciente['id']]
+        )
+        cursor.execute(
+            "INSERT INTO indicadores_cita (cita_id, indicador_tipo, estado, justificacion_texto) "
+            "VALUES (%s, 'ARR', 'normal', 'prueba')",
+            [cursor.fetchone()[0]]
+        )
+    return paciente
+
+
+@pytest.mark.parametrize('hasta, incluida', [
+    (date(2024, 5, 10), True),
+    ('2024-05-10', True),
+    (date(2024, 5, 9), False),
+    (datetime(2024, 5, 10, 12, 0), False),
+    (datetime(2024, 5, 10, 15, 30), True)
+])
+def test_hasta_incluye_el_dia_completo(pg, cita_por_la_tarde, hasta, incluida):
+    historial = pg.obtener_historial_indicadores(cita_por_la_tarde['id'], hasta=hasta, usar_cache=False)
+
+    assert len(historial) == (1 if incluida else 0)
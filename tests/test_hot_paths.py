@@ -0,0 +1,54 @@
+"""
+Pruebas del ejecutor de benchmarks de rutas críticas (src/benchmarks/hot_paths.py)
+
+Solo el caso de recurso no disponible se omite; la comparación con la línea
+base nunca se da por buena sin línea base.
+"""
+import json
+
+import pytest
+
+from src.benchmarks.hot_paths import HotPathBenchmarks, RecursoNoDisponible, main, measure, save_baseline
+
+
+class BenchmarksDePrueba(HotPathBenchmarks):
+    NOMBRES = ['disponible', 'sin_recurso']
+
+    def bench_disponible(self):
+        return {'disponible': measure(lambda: None, repeticiones=1, calentamiento=0)}
+
+    def bench_sin_recurso(self):
+        raise RecursoNoDisponible("base de datos sin configurar")
+
+    def bench_roto(self):
+        raise KeyError('columna')
+
+
+def resultado(mediana_s: float) -> dict:
+    return {'mediana_s': mediana_s, 'p95_s': mediana_s, 'min_s': mediana_s, 'operaciones': 1, 'ops_s': 1 / mediana_s}
+
+
+def test_omite_solo_recursos_no_disponibles():
+    benchmarks = BenchmarksDePrueba()
+    assert list(benchmarks.run()) == ['disponible']
+
+    with pytest.raises(KeyError):
+        benchmarks.run(['disponible', 'roto'])
+
+
+@pytest.mark.parametrize('base_s, codigo', [(None, 2), (0.1, 0), (0.05, 1)])
+def test_codigo_de_salida_segun_linea_base(monkeypatch, tmp_path, base_s, codigo):
+    ruta = tmp_path / 'linea_base.json'
+    if base_s is not None:
+        save_baseline({'calculadora_lote': resultado(base_s)}, ruta)
+    monkeypatch.setattr(HotPathBenchmarks, 'run', lambda self, nombres=None: {'calculadora_lote': resultado(0.1)})
+
+    assert main(['--linea-base', str(ruta), '--repeticiones', '1']) == codigo
+
+
+def test_guardar_linea_base(monkeypatch, tmp_path):
+    ruta = tmp_path / 'linea_base.json'
+    monkeypatch.setattr(HotPathBenchmarks, 'run', lambda self, nombres=None: {'calculadora_lote': resultado(0.1)})
+
+    assert main(['--linea-base', str(ruta), '--guardar-linea-base']) == 0
+    assert json.loads(ruta.read_text(encoding='utf-8'))['resultados']['calculadora_lote']['mediana_s'] == 0.1
@@ -0,0 +1,132 @@
+"""
+Importación masiva de pacientes contra Postgres (requiere TEST_DATABASE_URL)
+
+El CSV de prueba viene como lo guarda Excel en Windows (cp1252, separador ';',
+cabeceras con tildes y alias, coma decimal y fechas DD/MM/AAAA) e incluye filas
+que rechaza Patient y filas que solo rechaza la base de datos. El .xlsx usa
+celdas con tipo (números, fechas y booleanos) y una fila vacía intermedia.
+"""
+import io
+import uuid
+from datetime import datetime
+from typing import List, Set, Tuple
+
+import pytest
+
+FILAS = 1_000
+BLOQUE = 200
+
+
+def csv_pacientes(marca: str) -> Tuple[bytes, Set[int], Set[int]]:
+    """
+    CSV de FILAS pacientes marcados con tratamiento_actual = marca
+    
+    Returns:
+        Tupla (contenido, líneas que rechaza Patient, líneas que rechaza la base)
+    """
+    lineas: List[str] = ["Nombre;Edad;Sexo;Tipo EM;EDSS;Tratamiento;Fecha de Diagnóstico;Médico"]
+    invalidas, rechazadas = set(), set()
+    for i in range(FILAS):
+        linea = i + 2
+        edad, tipo, medico = 30 + i % 50, 'emrr', ''
+        if i % 97 == 0:
+            edad, tipo = 0, 'XX'
+            invalidas.add(linea)
+        elif i % 301 == 5:
+            medico = 'no-es-un-uuid'
+            rechazadas.add(linea)
+        lineas.append(f"José Núñez {i};{edad};Masculino;{tipo};2,5;{marca};01/02/2019;{medico}")
+    return ("\r\n".join(lineas) + "\r\n").encode('cp1252'), invalidas, rechazadas
+
+
+def xlsx_pacientes(marca: str) -> bytes:
+    """
+    Excel con tres pacientes marcados con tratamiento_actual = marca
+    
+    La fila 3 está vacía y la fila 5 tiene una edad que rechaza Patient.
+    """
+    openpyxl = pytest.importorskip('openpyxl')
+    
+    libro = openpyxl.Workbook()
+    hoja = libro.active
+    hoja.append(["Nombre", "Edad", "Sexo", "Tipo EM", "EDSS", "Tratamiento", "Fecha de Diagnóstico", "Activo"])
+    hoja.append(["Ana Ibáñez", 41, "Femenino", "EMRR", 3.5, marca, datetime(2015, 6, 30), True])
+    hoja.append([None] * 8)
+    hoja.append(["Luis Peña", 55, "Masculino", "EMSP", 6, marca, datetime(2009, 1, 12), False])
+    hoja.append(["Sin Edad", 0, "Masculino", "EMRR", 2, marca, datetime(2020, 3, 1), True])
+    
+    contenido = io.BytesIO()
+    libro.save(contenido)
+    return contenido.getvalue()
+
+
+@pytest.fixture
+def marca(pg):
+    """Marca única de los pacientes importados; se eliminan al terminar"""
+    valor = f"prueba-importacion-{uuid.uuid4().hex[:8]}"
+    yield valor
+    with pg.transaccion('pacientes') as cursor:
+        cursor.execute("DELETE FROM pacientes WHERE tratamiento_actual = %s", [valor])
+
+
+def pacientes_marcados(pg, marca: str) -> List[Tuple[str, float, str]]:
+    with pg.conexion() as conn, conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT nombre_completo, edss_basal::float, fecha_diagnostico::text "
+            "FROM pacientes WHERE tratamiento_actual = %s",
+            [marca]
+        )
+        return cursor.fetchall()
+
+
+def test_importacion_desde_excel(pg, marca):
+    from src.jobs.import_patients import PatientImportJob
+    
+    job = PatientImportJob(batch_size=BLOQUE)
+    resumen = job.run(io.BytesIO(xlsx_pacientes(marca)), 'pacientes.xlsx')
+    
+    assert resumen['leidas'] == 3
+    assert resumen['guardadas'] == 2
+    assert [e['fila'] for e in job.errores] == [5]
+    assert sorted(pacientes_marcados(pg, marca)) == [
+        ('Ana Ibáñez', 3.5, '2015-06-30'),
+        ('Luis Peña', 6.0, '2009-01-12')
+    ]
+
+
+@pytest.mark.parametrize('use_copy', [True, False], ids=['copy', 'insert'])
+def test_importacion_guarda_validas_y_anota_errores_por_linea(pg, marca, use_copy):
+    from src.jobs.import_patients import PatientImportJob
+    
+    contenido, invalidas, rechazadas = csv_pacientes(marca)
+    job = PatientImportJob(batch_size=BLOQUE, use_copy=use_copy)
+    assert job.use_copy == use_copy
+    
+    resumen = job.run(io.BytesIO(contenido), 'pacientes.csv')
+    
+    errores = {e['fila']: e['errores'] for e in job.errores}
+    assert set(errores) == invalidas | rechazadas
+    assert all(any(m.startswith('edad') for m in errores[l]) for l in invalidas)
+    assert all(errores[l][0].startswith('base de datos') for l in rechazadas)
+    
+    assert resumen['leidas'] == FILAS
+    assert resumen['guardadas'] == FILAS - len(invalidas) - len(rechazadas)
+    
+    guardados = pacientes_marcados(pg, marca)
+    assert len(guardados) == resumen['guardadas']
+    assert ('José Núñez 1', 2.5, '2019-02-01') in guardados
+    
+    # El CSV de errores sale ordenado por línea
+    lineas_csv = job.errors_csv().splitlines()[1:]
+    assert [int(l.split(',')[0]) for l in lineas_csv] == sorted(invalidas | rechazadas)
+
+
+def test_simulacion_no_guarda(pg, marca):
+    from src.jobs.import_patients import PatientImportJob
+    
+    contenido, invalidas, _ = csv_pacientes(marca)
+    resumen = PatientImportJob(batch_size=BLOQUE, dry_run=True).run(io.BytesIO(contenido), 'pacientes.csv')
+    
+    assert resumen['guardadas'] == 0
+    assert resumen['validas'] == FILAS - len(invalidas)
+    assert pacientes_marcados(pg, marca) == []
@@ -0,0 +1,89 @@
+"""
+Lectores por bloques iter_* de PostgresClient (requiere TEST_DATABASE_URL)
+
+Se cargan CITAS citas con sus cinco indicadores para un paciente de prueba y se
+comprueba que los lectores devuelven todas las filas en bloques acotados y
+ordenados por id, que la memoria de un recorrido depende del bloque y no del
+total, y que cerrar un generador a medias devuelve la conexión al pool.
+"""
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from config import DatabaseConfig
+
+CITAS = 3_000
+BLOQUE = 500
+
+
+@pytest.fixture
+def citas_con_indicadores(pg, paciente):
+    """CITAS citas completadas del paciente de prueba con sus cinco indicadores"""
+    with pg.transaccion('citas', 'indicadores_cita') as cursor:
+        cursor.execute(
+            "INSERT INTO citas (paciente_id, fecha_cita, numero_visita, estado) "
+            "SELECT %s, NOW() - v * INTERVAL '1 day', v, 'completada' FROM generate_series(1, %s) v",
+            [paciente['id'], CITAS]
+        )
+        cursor.execute(
+            "INSERT INTO indicadores_cita (cita_id, indicador_tipo, estado, justificacion_texto) "
+            "SELECT c.id, t::indicador_tipo, 'normal', 'prueba' FROM citas c "
+            "CROSS JOIN unnest(ARRAY['ARR', 'T1_Gd', 'T2_nuevas', 'CDP12', 'NEDA3']) t "
+            "WHERE c.paciente_id = %s",
+            [paciente['id']]
+        )
+    return paciente
+
+
+def total_filas(pg, tabla: str) -> int:
+    with pg.conexion() as conn, conn.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+        return cursor.fetchone()[0]
+
+
+def test_iter_citas_devuelve_todas_en_bloques_ordenados(pg, citas_con_indicadores):
+    bloques = list(pg.iter_citas(paciente_id=citas_con_indicadores['id'], campos=['id'], bloque=BLOQUE))
+    ids = [c['id'] for bloque in bloques for c in bloque]
+    
+    assert len(ids) == CITAS
+    assert all(0 < len(bloque) <= BLOQUE for bloque in bloques)
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+
+
+def test_iter_indicadores_y_pacientes_recorren_toda_la_tabla(pg, citas_con_indicadores):
+    indicadores = sum(len(b) for b in pg.iter_indicadores(campos=['id'], bloque=BLOQUE))
+    pacientes = sum(len(b) for b in pg.iter_pacientes(activos_solo=False, campos=['id'], bloque=BLOQUE))
+    
+    assert indicadores == total_filas(pg, 'indicadores_cita') >= 5 * CITAS
+    assert pacientes == total_filas(pg, 'pacientes')
+
+
+def test_memoria_acotada_por_el_bloque(pg, citas_con_indicadores):
+    def pico(acumular: bool) -> int:
+        tracemalloc.start()
+        try:
+            filas = []
+            for bloque in pg.iter_indicadores(bloque=BLOQUE):
+                if acumular:
+                    filas.extend(bloque)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    
+    en_bloques, todo = pico(acumular=False), pico(acumular=True)
+    assert en_bloques * 4 < todo
+
+
+def test_cerrar_generador_devuelve_la_conexion(pg, citas_con_indicadores):
+    for _ in range(DatabaseConfig.POOL_MAX_CONNECTIONS + 2):
+        lector = pg.iter_citas(paciente_id=citas_con_indicadores['id'], bloque=10)
+        next(lector)
+        lector.close()
+    
+    # Si alguna conexión no hubiera vuelto al pool, esta lectura esperaría indefinidamente
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        assert pool.submit(total_filas, pg, 'citas').result(timeout=10) >= CITAS
+    finally:
+        pool.shutdown(wait=False)
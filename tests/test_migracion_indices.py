@@ -0,0 +1,124 @@
+"""
+Planes de las consultas paginadas con los índices de la migración 002 (requiere TEST_DATABASE_URL)
+
+Dentro de una transacción que se revierte al final se cargan PACIENTES
+pacientes sintéticos con VISITAS citas cada uno (volumen de una consulta real,
+para que el planificador no prefiera un recorrido secuencial por ser la tabla
+pequeña), se aplica la migración (que termina con ANALYZE) y se comprueba el
+índice que elige el planificador para cada consulta.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Set
+
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+
+MIGRACION = Path(__file__).parent.parent / 'database' / 'migrations' / '002_indices_compuestos.sql'
+PACIENTES = 5_000
+VISITAS = 30
+MARCA = 'prueba-migracion-002'
+
+ID = str(uuid.uuid4())
+PACIENTE = f"(SELECT id FROM pacientes WHERE tratamiento_actual = '{MARCA}' AND nombre_completo = 'Paciente 000001')"
+# Ventana por defecto de obtener_citas_pendientes (dias_adelante=2)
+LIMITE_PENDIENTES = (datetime.now(timezone.utc) + timedelta(days=2)).isoformat()
+
+# Una cita pendiente por paciente en los próximos dos meses; el resto,
+# completadas o canceladas cada 120 días hacia atrás
+CARGA = f"""
+INSERT INTO pacientes (nombre_completo, edad, genero, tipo_em, edss_basal, fecha_diagnostico, activo, tratamiento_actual)
+SELECT 'Paciente ' || lpad(i::text, 6, '0'), 30 + i % 40, 'Femenino', 'EMRR', 2.0,
+       DATE '2015-01-01' + i % 1000, i % 10 <> 0, '{MARCA}'
+FROM generate_series(1, {PACIENTES}) i;
+
+INSERT INTO citas (paciente_id, fecha_cita, numero_visita, estado)
+SELECT p.id,
+       CASE WHEN v = {VISITAS} THEN NOW() + (random() * 60) * INTERVAL '1 day'
+            ELSE NOW() - ({VISITAS} - v) * INTERVAL '120 days' END,
+       v,
+       CASE WHEN v = {VISITAS} THEN 'pendiente' WHEN v % 7 = 0 THEN 'cancelada' ELSE 'completada' END
+FROM pacientes p CROSS JOIN generate_series(1, {VISITAS}) v
+WHERE p.tratamiento_actual = '{MARCA}';
+"""
+
+CONSULTAS = {
+    'historial': (
+        f"SELECT * FROM citas c WHERE c.paciente_id = {PACIENTE} "
+        "ORDER BY c.fecha_cita DESC, c.id DESC LIMIT 20",
+        [],
+        'idx_citas_paciente_fecha'
+    ),
+    'historial_cursor': (
+        f"SELECT * FROM citas c WHERE c.paciente_id = {PACIENTE} "
+        "AND (c.fecha_cita, c.id) < (%s::timestamptz, %s::uuid) "
+        "ORDER BY c.fecha_cita DESC, c.id DESC LIMIT 20",
+        ['2022-01-01T00:00:00+00:00', ID],
+        'idx_citas_paciente_fecha'
+    ),
+    'pendientes': (
+        "SELECT * FROM citas c WHERE c.estado = 'pendiente' AND c.fecha_cita <= %s",
+        [LIMITE_PENDIENTES],
+        'idx_citas_pendientes_fecha'
+    ),
+    'completadas': (
+        "SELECT c.id FROM citas c WHERE c.estado = 'completada' AND c.id > %s ORDER BY c.id LIMIT 500",
+        [ID],
+        'idx_citas_completadas_id'
+    ),
+    'selector_pacientes': (
+        "SELECT p.id, p.nombre_completo FROM pacientes p WHERE p.activo = TRUE "
+        "ORDER BY p.nombre_completo, p.id LIMIT 21",
+        [],
+        'idx_pacientes_activos_nombre'
+    ),
+    'selector_pacientes_cursor': (
+        "SELECT p.id, p.nombre_completo FROM pacientes p WHERE p.activo = TRUE "
+        "AND (p.nombre_completo, p.id) > (%s, %s::uuid) "
+        "ORDER BY p.nombre_completo, p.id LIMIT 21",
+        ['Paciente 010000', ID],
+        'idx_pacientes_activos_nombre'
+    ),
+}
+
+
+def indices_del_plan(nodo: Dict[str, Any]) -> Iterator[str]:
+    """Nombres de los índices usados en un plan de EXPLAIN (FORMAT JSON)"""
+    if 'Index Name' in nodo:
+        yield nodo['Index Name']
+    for hijo in nodo.get('Plans', []):
+        yield from indices_del_plan(hijo)
+
+
+@pytest.fixture(scope='module')
+def cursor(dsn):
+    """Cursor con datos sintéticos y la migración 002 en una transacción que se revierte al final"""
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(CARGA)
+            cur.execute(MIGRACION.read_text(encoding='utf-8'))
+            yield cur
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+@pytest.mark.parametrize('nombre', CONSULTAS)
+def test_consulta_usa_indice_de_la_migracion(cursor, nombre):
+    sentencia, parametros, indice = CONSULTAS[nombre]
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sentencia}", parametros)
+    plan = cursor.fetchone()[0][0]['Plan']
+    
+    usados: Set[str] = set(indices_del_plan(plan))
+    assert indice in usados, f"{nombre}: se esperaba {indice}, el plan usa {sorted(usados) or 'ningún índice'}"
+
+
+def test_migracion_elimina_indices_redundantes(cursor):
+    cursor.execute(
+        "SELECT indexname FROM pg_indexes WHERE indexname IN "
+        "('idx_citas_paciente', 'idx_indicadores_cita', 'idx_citas_estado', 'idx_pacientes_nombre')"
+    )
+    assert cursor.fetchall() == []